@@ -0,0 +1,124 @@
+## asyncio Interface for the MOTIMOVE 8 Control Interface
+## Parameter updates, periodic message emission and transport writes inside one event loop, without threads
+
+import asyncio
+
+from MM_Message_Builder import MM_Message_Builder
+
+
+class MM_Async_Writer(object):
+
+    # Writes messages to a MM_Transport without blocking the event loop
+    # Transports with a file descriptor (serial, pty, pipe) are only written once the descriptor is writable
+    def __init__(self, transport):
+
+        self.__transport = transport
+        self.__fd = transport.fileno() if hasattr(transport, 'fileno') else None
+
+    # Waits until the transport can take the message and writes it
+    async def write(self, message):
+
+        if self.__fd is not None:
+            await self.__writable()
+
+        self.__transport.write(message)
+
+    # Writes all coalesced messages of the transport
+    async def flush(self):
+
+        if self.__fd is not None:
+            await self.__writable()
+
+        self.__transport.flush()
+
+    async def __writable(self):
+
+        loop = asyncio.get_running_loop()
+        writable = loop.create_future()
+
+        loop.add_writer(self.__fd, writable.set_result, None)
+        try:
+            await writable
+        finally:
+            loop.remove_writer(self.__fd)
+
+    def getTransport(self):
+        return self.__transport
+
+
+class MM_Async_Builder(object):
+
+    # Methods of the builder which change the stimulation parameters and are therefore awaited
+    UPDATES = ['set' + name for name in MM_Message_Builder.TRANSACTION_PARAMETERS] + \
+              ['setRampCounter', 'setPreset', 'setEnvelope', 'apply']
+
+    # Awaitable front end of a MM_Message_Builder, e.g. await builder.setActiveChannels([...])
+    # All parameter setters of the builder and apply() are available as coroutines (see UPDATES), all other methods,
+    # e.g. setRecorder(), are called directly
+    # The builder itself stays usable from other processes, e.g. by a MM_Stimulation_Scheduler
+    def __init__(self, builder=None):
+
+        self.__builder = builder if builder is not None else MM_Message_Builder()
+        self.__running = False
+        self.__statistics = {'messages': 0, 'missed': 0, 'periode': 0.0, 'jitterMax': 0.0}
+
+    def __getattr__(self, name):
+
+        method = getattr(self.__builder, name)
+
+        if name not in MM_Async_Builder.UPDATES:
+            return method
+
+        # the setters only hold the write lock of the builder for a few microseconds
+        async def update(*args, **kwargs):
+            method(*args, **kwargs)
+            await asyncio.sleep(0)
+
+        return update
+
+    def getBuilder(self):
+        return self.__builder
+
+    # Sends the messages of the builder via writer (MM_Async_Writer) at the stimulation periode of the active mode
+    # Same timing as MM_Stimulation_Scheduler: absolute deadlines on the monotonic loop clock, periode T or T_BOOST
+    # of every message, passed deadlines are skipped. Runs until stop() is called or the given number of messages is sent
+    async def emit(self, writer, messages=None):
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        sent = 0
+        self.__running = True
+
+        try:
+            while self.__running and (messages is None or sent < messages):
+
+                delay = deadline - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                jitter = loop.time() - deadline
+
+                message = self.__builder.getMessageView()
+                await writer.write(message)
+                sent += 1
+
+                periode = message[MM_Message_Builder.POS_PERIODE] / 1000.0
+                missed = int(jitter // periode) if periode > 0 else 0
+                deadline += (missed + 1) * periode
+
+                self.__statistics['messages'] += 1
+                self.__statistics['missed'] += missed
+                self.__statistics['periode'] = periode
+                self.__statistics['jitterMax'] = max(self.__statistics['jitterMax'], jitter)
+
+        finally:
+            self.__running = False
+            await writer.flush()
+
+    # Stops emit() after the current message
+    def stop(self):
+        self.__running = False
+
+    # Returns messages sent, missed deadlines, periode of the last message in [s] and maximal jitter in [s]
+    def getStatistics(self):
+        return dict(self.__statistics)
@@ -0,0 +1,265 @@
+## Benchmark for the MOTIMOVE 8 Message Builder
+## Usage: python MM_Benchmark.py [path/to/reference/MM_Message_Builder.py] [--json results.json] [--frames N]
+## Measures the latency of getMessage() in several stimulation states, the throughput of the setters,
+## both again while a second process keeps calling setters, and the memory footprint of one builder instance.
+## The latency of the sensor input pipeline is measured with a synthetic sensor, if the builder supports apply().
+## If a reference implementation is given, both are measured and reported side by side.
+## With --json all results are written as JSON, so that different versions can be compared.
+
+import argparse
+import contextlib
+import gc
+import importlib.util
+import io
+import json
+import os
+import platform
+import sys
+import time
+from multiprocessing import Event, Process
+
+import numpy as np
+
+from MM_Message_Builder import MM_Message_Builder
+from MM_Sensor import MM_Linear_Controller, MM_Sensor_Buffer, MM_Sensor_Pipeline, MM_Synthetic_Sensor
+
+
+# Loads the MM_Message_Builder class from the given file
+def loadBuilder(path):
+
+    spec = importlib.util.spec_from_file_location('MM_Message_Builder_reference', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module.MM_Message_Builder
+
+
+# Returns the resident set size of this process in [bytes], None if not available
+def getRSS():
+
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+# Returns a builder with all channels active at 50 Hz (100 Hz during BOOST)
+def createBuilder(builder_class, ramping, boost=False, active=True):
+
+    builder = builder_class()
+    builder.setStimFrequency(50)
+    builder.setStimFrequency_BOOST(100)
+    builder.setMaxAmplitudes([100, 100, 100, 100, 100, 100, 100, 100])
+    builder.setRampingOnorOff(1 if ramping else 0)
+    builder.setBOOST_Mode(1 if boost else 0)
+    builder.setActiveChannels([active] * 8)
+
+    return builder
+
+
+# Returns latency statistics in [µs] of single calls
+def summarize(durations):
+
+    durations = np.asarray(durations) * 1e6
+
+    return {'mean': float(durations.mean()),
+            'median': float(np.median(durations)),
+            'p99': float(np.percentile(durations, 99)),
+            'max': float(durations.max())}
+
+
+# Measures getMessage() call by call
+# toggle .. the channels are switched on and off every toggle messages, so that they keep ramping (outside of the measurement)
+def measureLatency(builder_class, frames, ramping, boost=False, active=True, toggle=None, builder=None):
+
+    if builder is None:
+        builder = createBuilder(builder_class, ramping, boost, active)
+
+    durations = np.empty(frames)
+    state = active
+
+    # the builder may print the channel amplitudes, which must not end up in the measurement
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        for i in range(0, 100):
+            builder.getMessage()
+
+        for i in range(0, frames):
+
+            if toggle is not None and i % toggle == 0:
+                state = not state
+                builder.setActiveChannels([state] * 8)
+
+            # the printed output is discarded regularly, so that it doesn't grow during the measurement
+            if i % 1000 == 0:
+                output.seek(0)
+                output.truncate()
+
+            start = time.perf_counter()
+            builder.getMessage()
+            durations[i] = time.perf_counter() - start
+
+    return summarize(durations)
+
+
+# Returns the calls per second of the given setter
+def measureSetter(builder_class, name, arguments, calls, builder=None):
+
+    if builder is None:
+        builder = createBuilder(builder_class, True)
+
+    setter = getattr(builder, name)
+
+    start = time.perf_counter()
+    for i in range(0, calls):
+        setter(list(arguments[i % len(arguments)]))
+    stop = time.perf_counter()
+
+    return calls / (stop - start)
+
+
+SETTER_ARGUMENTS = {
+    'setPhasewidths': [[100, 200, 300, 400, 500, 600, 700, 800], [800, 700, 600, 500, 400, 300, 200, 100]],
+    'setMaxAmplitudes': [[10, 20, 30, 40, 50, 60, 70, 80], [80, 70, 60, 50, 40, 30, 20, 10]],
+    'setActiveChannels': [[True, False, True, False, True, False, True, False], [False, True, False, True, False, True, False, True]],
+}
+
+
+# Second process, calls setters of the shared builder until stopped
+def hammerSetters(builder, stop):
+
+    i = 0
+    while not stop.is_set():
+        for name, arguments in SETTER_ARGUMENTS.items():
+            getattr(builder, name)(list(arguments[i % 2]))
+        i += 1
+
+
+# Measures getMessage() and the setters while another process keeps calling setters of the same builder
+def measureContention(builder_class, frames, calls):
+
+    builder = createBuilder(builder_class, True)
+    stop = Event()
+    process = Process(target=hammerSetters, args=(builder, stop), daemon=True)
+    process.start()
+
+    try:
+        results = {'getMessage() [us]': measureLatency(builder_class, frames, True, builder=builder)}
+        for name, arguments in SETTER_ARGUMENTS.items():
+            results[name + ' [calls/s]'] = measureSetter(builder_class, name, arguments, calls, builder=builder)
+    finally:
+        stop.set()
+        process.join()
+
+    return results
+
+
+# Returns the mean memory footprint of one builder instance in [bytes]
+def measureMemory(builder_class, instances):
+
+    gc.collect()
+    before = getRSS()
+    builders = [builder_class() for i in range(0, instances)]
+    after = getRSS()
+
+    if before is None or after is None:
+        return None
+
+    del builders
+    return (after - before) / instances
+
+
+# Measures the latency from a sensor sample to the applied parameters with a synthetic sensor in [µs]
+# Returns None if the builder has no apply()
+def measureSensorPipeline(builder_class, seconds=2.0, rate=1000.0):
+
+    if not hasattr(builder_class, 'apply'):
+        return None
+
+    builder = createBuilder(builder_class, True)
+    buffer = MM_Sensor_Buffer()
+    pipeline = MM_Sensor_Pipeline(buffer, builder, MM_Linear_Controller(threshold=0.5))
+    sensor = MM_Synthetic_Sensor(buffer, rate, frequency=2.0)
+
+    pipeline.start()
+    sensor.start()
+    time.sleep(seconds)
+    sensor.stop()
+    pipeline.stop()
+
+    statistics = pipeline.getStatistics()
+
+    return {'samples': statistics['samples'],
+            'lost': statistics['lost'],
+            'updates': statistics['updates'],
+            'latency mean [us]': statistics['latencyMean'] * 1e6,
+            'latency std [us]': statistics['latencyStd'] * 1e6,
+            'latency max [us]': statistics['latencyMax'] * 1e6}
+
+
+def runBenchmark(builder_class, frames=20000, calls=20000, instances=50):
+
+    latency = {
+        'ramping off, all channels active': measureLatency(builder_class, frames, False),
+        'ramping off, BOOST': measureLatency(builder_class, frames, False, boost=True),
+        'ramping on, all channels idle': measureLatency(builder_class, frames, True, active=False),
+        'ramping on, all channels active': measureLatency(builder_class, frames, True),
+        'ramping on, all channels ramping': measureLatency(builder_class, frames, True, toggle=10),
+        'ramping on, BOOST, all channels ramping': measureLatency(builder_class, frames, True, boost=True, toggle=10),
+    }
+
+    setters = {name + ' [calls/s]': measureSetter(builder_class, name, arguments, calls)
+               for name, arguments in SETTER_ARGUMENTS.items()}
+
+    return {'getMessage() [us]': latency,
+            'setters': setters,
+            'contention': measureContention(builder_class, frames, calls),
+            'sensor pipeline': measureSensorPipeline(builder_class),
+            'memory per builder [bytes]': measureMemory(builder_class, instances)}
+
+
+# Returns the results as flat list of (name, value) for printing
+def flatten(results, prefix=''):
+
+    lines = []
+    for name, value in results.items():
+        if isinstance(value, dict):
+            lines += flatten(value, prefix + name + ' / ')
+        else:
+            lines.append((prefix + name, value))
+
+    return lines
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmark for the MOTIMOVE 8 Message Builder')
+    parser.add_argument('reference', nargs='?', help='MM_Message_Builder.py of a reference version')
+    parser.add_argument('--json', help='file the results are written to as JSON')
+    parser.add_argument('--frames', type=int, default=20000, help='messages per latency measurement')
+    parser.add_argument('--calls', type=int, default=20000, help='calls per setter measurement')
+    arguments = parser.parse_args()
+
+    results = [('current', runBenchmark(MM_Message_Builder, arguments.frames, arguments.calls))]
+
+    if arguments.reference is not None:
+        results.append(('reference', runBenchmark(loadBuilder(arguments.reference), arguments.frames, arguments.calls)))
+
+    flat = [(label, dict(flatten(result))) for label, result in results]
+
+    for name, value in flatten(results[0][1]):
+        line = '%-75s' % name
+        for label, result in flat:
+            value = result.get(name)
+            line += '%12s: %-14s' % (label, 'n/a' if value is None else '%.1f' % value)
+        print(line)
+
+    if arguments.json is not None:
+        with open(arguments.json, 'w') as output:
+            json.dump({'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'python': sys.version.split()[0],
+                       'numpy': np.__version__,
+                       'platform': platform.platform(),
+                       'frames': arguments.frames,
+                       'calls': arguments.calls,
+                       'results': dict(results)}, output, indent=2)
@@ -0,0 +1,131 @@
+## Calibration Tables for the MOTIMOVE 8 Control Interface
+## Every stimulator compensates the requested amplitudes with its own lookup table, e.g. measured on the bench.
+## The tables of several stimulators are kept in one compact binary file with one record per serial number.
+
+import os
+
+import numpy as np
+
+
+class MM_Calibration(object):
+
+    # Number of requested amplitudes of a table, 0 up to 170 mA
+    AMPLITUDES = 171
+
+    # File layout: MAGIC followed by one record per stimulator
+    MAGIC = b'MM8CAL01'
+    RECORD_DTYPE = np.dtype([
+        ('serial', 'S16'),                  # ASCII serial number of the stimulator
+        ('table', 'u1', AMPLITUDES),        # amplitude sent for every requested amplitude in [mA]
+    ])
+
+    # Tables of the files loaded so far, path -> (modification time, size, {serial: table})
+    __files = {}
+
+    # table .. amplitude to send for every requested amplitude from 0 to 170 mA, e.g. MM_Message_Builder.AVAL_COMPENSATION
+    #          it must not fall, so that every sent amplitude can be decoded, a ValueError is raised otherwise
+    # serial .. serial number of the stimulator the table has been measured for, None for a default table
+    def __init__(self, table, serial=None):
+
+        table = np.asarray(table)
+
+        if table.shape != (MM_Calibration.AMPLITUDES,):
+            raise ValueError('a calibration table needs ' + str(MM_Calibration.AMPLITUDES) + ' amplitudes, not ' + str(table.size))
+
+        if (table < 0).any() or (table > 255).any() or (np.diff(table.astype(np.int64)) < 0).any():
+            raise ValueError('a calibration table has to rise monotonically from 0 to at most 255 mA')
+
+        self.__serial = serial
+        self.__table = table.astype(np.uint8)
+        self.__table.setflags(write=False)
+
+        # the first requested amplitude sending at least the recorded amplitude, amplitudes which are never sent
+        # are decoded to the next requested one. Where several requested amplitudes send the same amplitude (e.g. 10 and
+        # 11 mA of AVAL_COMPENSATION both send 10 mA), the smallest of them is decoded
+        self.__inverse = np.minimum(np.searchsorted(self.__table, np.arange(256), 'left'), MM_Calibration.AMPLITUDES - 1).astype(np.uint8)
+        self.__inverse.setflags(write=False)
+
+    # Returns the serial number of the stimulator, None for a default table
+    def getSerial(self):
+        return self.__serial
+
+    # Returns the lookup table (uint8, one element per requested amplitude), read-only
+    def getTable(self):
+        return self.__table
+
+    # Returns the inverse lookup table (uint8, one element per sent amplitude from 0 to 255), read-only
+    def getInverse(self):
+        return self.__inverse
+
+    # Returns the amplitudes to send for requested amplitudes in [mA] (array of any shape) in one lookup
+    def compensate(self, amplitudes):
+        return self.__table[np.asarray(amplitudes, dtype=np.int64)]
+
+    # Returns the requested amplitudes in [mA] of sent amplitudes, e.g. MM_Frame_Decoder.toColumns()['amplitudes']
+    def decode(self, amplitudes):
+        return self.__inverse[np.asarray(amplitudes, dtype=np.int64)]
+
+    # Returns the calibration of a stimulator from a calibration file, see save()
+    # The file is only read again after it has been changed, raises KeyError for unknown serial numbers
+    # and ValueError for a file with a table which falls
+    @staticmethod
+    def load(path, serial):
+
+        tables = MM_Calibration.__loadFile(path)
+        serial = str(serial)
+
+        if serial not in tables:
+            raise KeyError('no calibration for stimulator ' + str(serial) + ' in ' + str(path))
+
+        return tables[serial]
+
+    # Returns the serial numbers of all stimulators in a calibration file
+    @staticmethod
+    def getSerials(path):
+        return list(MM_Calibration.__loadFile(path).keys())
+
+    @staticmethod
+    def __loadFile(path):
+
+        path = os.path.abspath(path)
+        status = os.stat(path)
+
+        cached = MM_Calibration.__files.get(path)
+        if cached is not None and cached[0] == status.st_mtime_ns and cached[1] == status.st_size:
+            return cached[2]
+
+        with open(path, 'rb') as file:
+            data = file.read()
+
+        if data[:len(MM_Calibration.MAGIC)] != MM_Calibration.MAGIC or \
+                (len(data) - len(MM_Calibration.MAGIC)) % MM_Calibration.RECORD_DTYPE.itemsize != 0:
+            raise ValueError(str(path) + ' is not a calibration file')
+
+        records = np.frombuffer(data, dtype=MM_Calibration.RECORD_DTYPE, offset=len(MM_Calibration.MAGIC))
+        tables = {}
+        for record in records:
+            serial = record['serial'].decode('ascii')
+            tables[serial] = MM_Calibration(record['table'], serial)
+
+        MM_Calibration.__files[path] = (status.st_mtime_ns, status.st_size, tables)
+
+        return tables
+
+    # Writes the calibrations of several stimulators into one file, every calibration needs a serial number
+    @staticmethod
+    def save(path, calibrations):
+
+        records = np.zeros(len(calibrations), dtype=MM_Calibration.RECORD_DTYPE)
+
+        for i, calibration in enumerate(calibrations):
+
+            serial = calibration.getSerial()
+            if serial is None or len(str(serial).encode('ascii')) > MM_Calibration.RECORD_DTYPE['serial'].itemsize:
+                raise ValueError('every calibration needs a serial number of at most 16 characters, not ' + repr(serial))
+
+            records['serial'][i] = str(serial).encode('ascii')
+            records['table'][i] = calibration.getTable()
+
+        with open(path, 'wb') as file:
+            file.write(MM_Calibration.MAGIC)
+            file.write(records.tobytes())
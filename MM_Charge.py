@@ -0,0 +1,137 @@
+## Charge Accounting for the MOTIMOVE 8 Control Interface
+## Running per-channel charge of the pulses as they are sent, taken from the amplitudes, intensity and phasewidths of every message.
+## A channel with a frequency prescaler is only accounted on the messages it actually stimulates on.
+## The totals are updated in a small shared memory block at constant cost per message and read by other processes
+## without locking, e.g. to enforce charge limits during a session.
+
+import numpy as np
+
+from MM_Message_Builder import MM_Message_Builder
+from MM_Shared_State import MM_Shared_State, MM_SeqLock
+
+
+class MM_Charge_Account(object):
+
+    # Layout of the totals, all charges in [nC] (amplitude [mA] * intensity [%] / 100 * phasewidth [µs])
+    LAYOUT = [
+        ('sequence', 'i8', 1),
+        ('messages', 'i8', 1),          # messages accounted, they count the periodes of the prescalers
+        ('pulses', 'i8', 8),            # pulses sent per channel, a doublet counts as two pulses
+        ('charge', 'i8', 8),            # charge of one phase of a pulse of the last message, 0 if the channel didn't fire
+        ('peak', 'i8', 8),              # maximal charge of one phase of a pulse
+        ('cumulative', 'i8', 8),        # charge of one phase of all pulses
+        ('balanced', 'i8', 8),          # charge moved by both phases of all charge balanced pulses
+    ]
+
+    # pulses per message of every channel for every value of the doublet byte
+    PULSES = 1 + np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1, bitorder='little').astype(np.int64)
+
+    def __init__(self):
+
+        self.__state = MM_Shared_State(MM_Charge_Account.LAYOUT)
+        self.__seqlock = MM_SeqLock(self.__state, 'sequence', 'messages', 'balanced')
+        self.__mapState()
+
+    def __mapState(self):
+
+        self.__messages = self.__state.getField('messages')
+        self.__pulses = self.__state.getField('pulses')
+        self.__charge = self.__state.getField('charge')
+        self.__peak = self.__state.getField('peak')
+        self.__cumulative = self.__state.getField('cumulative')
+        self.__balanced = self.__state.getField('balanced')
+
+    def __getstate__(self):
+        return {'state': self.__state, 'seqlock': self.__seqlock}
+
+    def __setstate__(self, state):
+        self.__state = state['state']
+        self.__seqlock = state['seqlock']
+        self.__mapState()
+
+    # Returns the charge of one phase of a pulse in [nC] and the number of pulses of every channel, both arrays (messages, 8)
+    # messages .. uint8 array (messages, MSG_LENGTH), the amplitudes are scaled by the intensity of the message (rounded down)
+    # index .. number of the first message as counted by the builder (MM_Message_Builder.getMessageCounter()), a channel
+    #          with prescaler p only fires in the messages whose number is a multiple of p (see MM_Message_Builder.setPreScalers())
+    @staticmethod
+    def getPulses(messages, index=0):
+
+        amplitudes = messages[:, MM_Message_Builder.POS_AMPLITUDES:MM_Message_Builder.POS_AMPLITUDES + 8].astype(np.int64)
+        phasewidths = messages[:, MM_Message_Builder.POS_PHASEWIDTHS:MM_Message_Builder.POS_PHASEWIDTHS + 8]
+        intensity = messages[:, MM_Message_Builder.POS_INTENSITY, None].astype(np.int64)
+
+        # amplitude [mA] * intensity [%] / 100 * phasewidth [10 µs] * 10
+        charge = amplitudes * phasewidths * intensity // 10
+        prescalers = np.maximum(messages[:, MM_Message_Builder.POS_PRESCALERS:MM_Message_Builder.POS_PRESCALERS + 8], 1)
+        fires = (index + np.arange(len(messages)))[:, None] % prescalers == 0
+        pulses = MM_Charge_Account.PULSES[messages[:, MM_Message_Builder.POS_DOUBLETS]] * ((charge > 0) & fires)
+
+        return charge, pulses
+
+    # Adds the pulses of one message (uint8 array of MSG_LENGTH), only one process may write
+    # index .. number of the message for the prescalers, see getPulses(), by default the number of messages accounted so far
+    def add(self, message, index=None):
+
+        if index is None:
+            index = int(self.__messages[0])
+
+        charge, pulses = MM_Charge_Account.getPulses(np.asarray(message, dtype=np.uint8).reshape(1, MM_Message_Builder.MSG_LENGTH),
+                                                     index)
+
+        with self.__seqlock:
+            self.__messages[0] += 1
+            self.__pulses += pulses[0]
+            self.__charge[:] = charge[0] * (pulses[0] > 0)
+            np.maximum(self.__peak, charge[0] * (pulses[0] > 0), out=self.__peak)
+            self.__cumulative += charge[0] * pulses[0]
+            self.__balanced += 2 * charge[0] * pulses[0]
+
+    # Adds the pulses of consecutive messages (uint8 array (messages, MSG_LENGTH)) at once
+    # index .. number of the first message, see add()
+    def addMessages(self, messages, index=None):
+
+        if len(messages) == 0:
+            return
+
+        if index is None:
+            index = int(self.__messages[0])
+
+        charge, pulses = MM_Charge_Account.getPulses(messages, index)
+        delivered = (charge * pulses).sum(axis=0)
+
+        with self.__seqlock:
+            self.__messages[0] += len(messages)
+            self.__pulses += pulses.sum(axis=0)
+            self.__charge[:] = charge[-1] * (pulses[-1] > 0)
+            np.maximum(self.__peak, (charge * (pulses > 0)).max(axis=0), out=self.__peak)
+            self.__cumulative += delivered
+            self.__balanced += 2 * delivered
+
+    # Returns a consistent copy of all totals as dictionary of int and lists with one element per channel, never blocks the writer
+    def read(self):
+
+        values = MM_Shared_State(MM_Charge_Account.LAYOUT, shared=False)
+        self.__seqlock.read(values.getRegion('messages', 'balanced'))
+
+        totals = {name: values.getField(name).tolist() for name, dtype, count in MM_Charge_Account.LAYOUT if name != 'sequence'}
+        totals['messages'] = totals['messages'][0]
+
+        return totals
+
+    # Writes the totals into a CSV file with one row per channel, e.g. at the end of a session
+    def export(self, path):
+
+        totals = self.read()
+        names = [name for name, dtype, count in MM_Charge_Account.LAYOUT if count == 8]
+
+        with open(path, 'w') as file:
+            file.write('channel,' + ','.join(names) + '\n')
+            for channel in range(0, 8):
+                file.write('CH' + str(channel + 1) + ',' + ','.join(str(totals[name][channel]) for name in names) + '\n')
+            file.write('# messages,' + str(totals['messages']) + '\n')
+
+    # Sets all totals to zero
+    def reset(self):
+
+        with self.__seqlock:
+            self.__state.getRegion('messages', 'balanced')[:] = 0
@@ -0,0 +1,215 @@
+## Device Manager for several MOTIMOVE 8 stimulators, e.g. two units with 16 channels per rider
+## The parameters and ramping states of all devices are kept in one shared block, every field holds all devices.
+## Each device is set through its own MM_Message_Builder, the messages of all devices are generated in one pass.
+
+import time
+
+import numpy as np
+
+from MM_Calibration import MM_Calibration
+from MM_Message_Builder import MM_Message_Builder
+from MM_Ramp_Cache import MM_Ramp_Cache
+from MM_Ramp_Engine import MM_Ramp_Engine
+from MM_Shared_State import MM_Shared_State, MM_SeqLock
+
+
+class MM_Device_Manager(object):
+
+    # devices .. number of stimulators
+    # telemetryCapacity .. size of the telemetry ring buffer of every device builder
+    # calibrations .. one MM_Calibration per device, e.g. MM_Calibration.load(path, serial), None uses AVAL_COMPENSATION
+    def __init__(self, devices=2, telemetryCapacity=256, calibrations=None):
+
+        self.__devices = devices
+        self.__state = MM_Shared_State(MM_Message_Builder.getStateLayout(devices))
+        self.__seqlock = MM_SeqLock(self.__state, 'sequence', 'Ch_active', 'Frame')
+
+        # the builders initialise the parameters of their device
+        calibrations = [None] * devices if calibrations is None else list(calibrations)
+        self.__builders = [MM_Message_Builder(telemetryCapacity, self.__state, self.__seqlock, device, devices, calibrations[device])
+                           for device in range(0, devices)]
+
+        self.__mapState()
+
+    def __mapState(self):
+
+        devices = self.__devices
+
+        self.__Ch_active = self.__state.getField('Ch_active')
+        self.__A_max = self.__state.getField('A_max')
+        self.__Frame = self.__state.getField('Frame').reshape(devices, MM_Message_Builder.MSG_LENGTH)
+        self.__runtime = [self.__state.getField(name) for name, dtype, count in MM_Message_Builder.RUNTIME_LAYOUT
+                          if name.startswith('CH_') and not name.startswith('CH_envelope')]
+        self.__messageCounter = self.__state.getField('messageCounter')
+        self.__CH_rampFlag = self.__state.getField('CH_rampFlag')
+        self.__CH_oldState = self.__state.getField('CH_oldState')
+        self.__CH_newState = self.__state.getField('CH_newState')
+
+        # one engine for the channels of all devices, CH1 of every device finishes the downwards ramp at 0
+        # the engine calculates the requested amplitudes, every device compensates them with its own calibration afterwards
+        self.__rampEngine = MM_Ramp_Engine(*self.__runtime, ([True] + [False] * 7) * devices,
+                                           None, MM_Ramp_Cache(np.arange(MM_Calibration.AMPLITUDES)))
+        self.__tables = np.stack([builder.getCalibration().getTable() for builder in self.__builders])
+        self.__rows = np.arange(devices)[:, None]
+
+        # Process local snapshot of the parameters of all devices
+        self.__snapshot = MM_Shared_State(MM_Message_Builder.getParameterLayout(devices), shared=False)
+        self.__snapshotBytes = self.__snapshot.getRegion('Ch_active', 'Frame')
+        self.__snap_Ch_active = self.__snapshot.getField('Ch_active')
+        self.__snap_A_max = self.__snapshot.getField('A_max')
+        self.__snap_F = self.__snapshot.getField('F')
+        self.__snap_rampOnorOff = self.__snapshot.getField('rampOnorOff')
+        self.__snap_CH_rampup_time = self.__snapshot.getField('CH_rampup_time')
+        self.__snap_CH_rampdown_time = self.__snapshot.getField('CH_rampdown_time')
+        self.__snap_rampup_startvalue = self.__snapshot.getField('rampup_startvalue')
+        self.__snap_rampdown_endvalue = self.__snapshot.getField('rampdown_endvalue')
+        self.__snap_Ch_PreScaler = self.__snapshot.getField('Ch_PreScaler')
+        self.__snap_Frame = self.__snapshot.getField('Frame').reshape(devices, MM_Message_Builder.MSG_LENGTH)
+
+        # epoch of the parameters of the snapshot, the last messages are reused while they are unchanged and nothing is ramping
+        self.__epoch = -1
+        self.__steady = False
+
+    # Only the shared block, its lock and the builders are handed over to a new process, the views are rebuilt there
+    def __getstate__(self):
+        return {'devices': self.__devices, 'state': self.__state, 'seqlock': self.__seqlock, 'builders': self.__builders}
+
+    def __setstate__(self, state):
+        self.__devices = state['devices']
+        self.__state = state['state']
+        self.__seqlock = state['seqlock']
+        self.__builders = state['builders']
+        self.__mapState()
+
+    # Returns the number of devices
+    def getDevices(self):
+        return self.__devices
+
+    # Returns the MM_Message_Builder of the given device, its setters change the parameters of this device
+    # Its getMessage() is not meant to be mixed with the one of the manager, both advance the same ramps
+    # The telemetry, recorder and charge account of the builder receive the messages of its device generated by the manager
+    # Amplitude envelopes are not supported, setEnvelope() of the builder raises a ValueError
+    def getBuilder(self, device):
+        return self.__builders[device]
+
+    # Sets several parameters of all devices in one transaction, like MM_Message_Builder.apply()
+    # Expects one dictionary per device, None leaves a device unchanged
+    # The transaction of a builder covers the whole block, so a failing device restores all devices
+    def apply(self, parameters):
+
+        with self.__builders[0].transaction():
+            for builder, values in zip(self.__builders, parameters):
+                if values is not None:
+                    builder.apply(values)
+
+    # Generates the next message of every device, returns a uint8 array (devices, MSG_LENGTH)
+    def getMessage(self):
+        return self.getMessageView().copy()
+
+    # Generates the next message of every device without allocating a new buffer
+    # The returned array (devices, MSG_LENGTH) is only valid until the next call, copy it if it has to be kept
+    def getMessageView(self):
+
+        start = time.perf_counter()
+
+        # nothing has been set since the last messages and no channel is ramping, so the last messages are sent again
+        if not (self.__steady and self.__seqlock.getSequence() == self.__epoch):
+
+            # Torn-free copy of the parameters of all devices
+            self.__epoch = self.__seqlock.read(self.__snapshotBytes)
+            self.__buildMessages()
+
+        # the builders of the devices record their messages like their own getMessage()
+        duration = time.perf_counter() - start
+        for device, builder in enumerate(self.__builders):
+
+            frame = self.__snap_Frame[device]
+            builder.getTelemetry().write(start, duration, frame[MM_Message_Builder.POS_AMPLITUDES:MM_Message_Builder.POS_AMPLITUDES + 8],
+                                         self.__CH_rampFlag[device * 8:(device + 1) * 8])
+
+            if builder.getRecorder() is not None:
+                builder.getRecorder().append(frame)
+
+            if builder.getChargeAccount() is not None:
+                builder.getChargeAccount().add(frame, int(self.__messageCounter[device]))
+
+        self.__messageCounter += 1
+
+        return self.__snap_Frame
+
+    # Builds the messages of all devices from the snapshot
+    def __buildMessages(self):
+
+        # if no device is ramping, the message templates already hold the maximal amplitudes of all active channels
+        ramping = self.__snap_rampOnorOff == 1
+        if not ramping.any():
+            self.__steady = True
+            return
+
+        # the channels of devices with ramping switched off keep their ramping state, like with a single builder
+        channels = np.repeat(ramping, 8)
+
+        # without any switched or ramping channel the next messages only differ if a parameter is set meanwhile
+        self.__steady = not self.__CH_rampFlag[channels].any() and \
+            np.array_equal(self.__snap_Ch_active[channels], self.__CH_oldState[channels])
+
+        kept = None
+        if not ramping.all():
+            kept = [field[~channels].copy() for field in self.__runtime]
+
+        # advancing the ramping of all channels of all devices at once
+        amplitudes = self.__rampEngine.step(self.__snap_Ch_active, self.__snap_A_max, np.repeat(self.__snap_F, 8),
+                                            self.__snap_CH_rampup_time, self.__snap_CH_rampdown_time,
+                                            np.repeat(self.__snap_rampup_startvalue, 8), np.repeat(self.__snap_rampdown_endvalue, 8),
+                                            prescaler=None if (self.__snap_Ch_PreScaler == 1).all() else self.__snap_Ch_PreScaler)
+
+        if kept is not None:
+            for field, values in zip(self.__runtime, kept):
+                field[~channels] = values
+
+        # compensating the ramp values of all devices in one lookup
+        amplitudes = self.__tables[self.__rows, amplitudes.reshape(self.__devices, 8)]
+
+        # patching the compensated ramp values and the checksums into the messages of the ramping devices
+        frames = self.__snap_Frame
+        frames[ramping, MM_Message_Builder.POS_AMPLITUDES:MM_Message_Builder.POS_AMPLITUDES + 8] = amplitudes[ramping]
+        frames[:, MM_Message_Builder.POS_CHECKSUM] = frames[:, 1:MM_Message_Builder.POS_CHECKSUM].sum(axis=1, dtype=np.int64) & 0x7F
+
+        # channels which have been reactivated during ramping stay active for the next message
+        changed = (self.__snap_Ch_active != self.__CH_newState) & channels
+        if changed.any():
+            with self.__seqlock:
+                self.__Ch_active[changed] = self.__snap_Ch_active[changed]
+                self.__Frame[:, MM_Message_Builder.POS_AMPLITUDES:MM_Message_Builder.POS_AMPLITUDES + 8] = \
+                    self.__tables[self.__rows, self.__A_max.reshape(self.__devices, 8)] * self.__Ch_active.reshape(self.__devices, 8)
+                self.__Frame[:, MM_Message_Builder.POS_CHECKSUM] = \
+                    self.__Frame[:, 1:MM_Message_Builder.POS_CHECKSUM].sum(axis=1, dtype=np.int64) & 0x7F
+
+
+class MM_Device_Transport(object):
+
+    # Sends the messages of all devices of a MM_Device_Manager, one transport per device, e.g. one MM_Serial_Transport each
+    # Usage: MM_Stimulation_Scheduler(manager, MM_Device_Transport([transport1, transport2]))
+    def __init__(self, transports):
+        self.__transports = list(transports)
+
+    # Writes the message of every device to its transport, messages .. array (devices, MSG_LENGTH)
+    def write(self, messages):
+
+        for transport, message in zip(self.__transports, messages):
+            transport.write(message)
+
+    def flush(self):
+
+        for transport in self.__transports:
+            if hasattr(transport, 'flush'):
+                transport.flush()
+
+    # Returns the statistics of every transport
+    def getStatistics(self):
+        return [transport.getStatistics() for transport in self.__transports]
+
+    def close(self):
+
+        for transport in self.__transports:
+            transport.close()
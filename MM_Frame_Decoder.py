@@ -0,0 +1,135 @@
+## Frame Decoder for the MOTIMOVE 8 Control Interface
+## Parses recorded Pulse-by-Pulse messages back into their fields and verifies them, a whole capture at once
+
+import numpy as np
+
+from MM_Message_Builder import MM_Message_Builder
+
+
+class MM_Frame_Decoder(object):
+
+    # One Pulse-by-Pulse message, see MM_Message_Builder.POS_*
+    MESSAGE_DTYPE = np.dtype([
+        ('start', 'u1'),
+        ('length', 'u1'),
+        ('type', 'u1'),
+        ('pulseDelay', 'u1'),
+        ('periode', 'u1'),              # [ms]
+        ('intensity', 'u1'),            # [%]
+        ('amplitudes', 'u1', 8),        # [mA]
+        ('phasewidths', 'u1', 8),       # [10 µs]
+        ('prescalers', 'u1', 8),
+        ('doublets', 'u1'),             # bit n set .. doublets active on CH(n+1)
+        ('doubletISI', 'u1'),           # [100 µs]
+        ('sensor', 'u1'),
+        ('highVoltage', 'u1'),
+        ('checksum', 'u1'),
+    ])
+
+    MSG_HEADER = (0xFF, 0x22, 0x08)
+
+    # Returns the messages as structured array (MESSAGE_DTYPE), without copying if possible
+    # data .. bytes, bytearray, memoryview or uint8 array of consecutive messages, e.g. a capture of MM_Memory_Transport
+    @staticmethod
+    def decode(data):
+
+        data = np.asarray(memoryview(data).cast('B') if not isinstance(data, np.ndarray) else data, dtype=np.uint8)
+
+        if data.ndim == 2:
+            data = np.ascontiguousarray(data).reshape(-1)
+
+        if len(data) % MM_Message_Builder.MSG_LENGTH != 0:
+            raise ValueError('data is not a multiple of ' + str(MM_Message_Builder.MSG_LENGTH) + ' bytes, use synchronize() first')
+
+        return data.view(MM_Frame_Decoder.MESSAGE_DTYPE)
+
+    # Returns the checksums of all messages (array (messages, MSG_LENGTH) or structured array) as calculated by the builder
+    @staticmethod
+    def calculateChecksums(messages):
+
+        messages = MM_Frame_Decoder.__asMatrix(messages)
+        return (messages[:, 1:MM_Message_Builder.POS_CHECKSUM].sum(axis=1, dtype=np.int64) & 0x7F).astype(np.uint8)
+
+    # Returns a bool array, True for every message with a correct header and checksum
+    @staticmethod
+    def validate(messages):
+
+        messages = MM_Frame_Decoder.__asMatrix(messages)
+
+        return ((messages[:, 0] == MM_Frame_Decoder.MSG_HEADER[0]) &
+                (messages[:, 1] == MM_Frame_Decoder.MSG_HEADER[1]) &
+                (messages[:, 2] == MM_Frame_Decoder.MSG_HEADER[2]) &
+                (messages[:, MM_Message_Builder.POS_CHECKSUM] == MM_Frame_Decoder.calculateChecksums(messages)))
+
+    # Finds the messages in a stream which may contain other bytes or partial messages, e.g. a serial capture
+    # Returns the offsets of all valid, non overlapping messages
+    @staticmethod
+    def synchronize(data):
+
+        data = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data.reshape(-1)
+        length = MM_Message_Builder.MSG_LENGTH
+
+        if len(data) < length:
+            return np.zeros(0, dtype=np.int64)
+
+        last = len(data) - length + 1
+        candidates = np.flatnonzero((data[:last] == MM_Frame_Decoder.MSG_HEADER[0]) &
+                                    (data[1:last + 1] == MM_Frame_Decoder.MSG_HEADER[1]) &
+                                    (data[2:last + 2] == MM_Frame_Decoder.MSG_HEADER[2]))
+
+        offsets = candidates[MM_Frame_Decoder.validate(data[candidates[:, None] + np.arange(length)])]
+
+        # a valid message can only overlap another one by chance, then the first one is kept
+        if len(offsets) > 1 and (np.diff(offsets) < length).any():
+            kept = [int(offsets[0])]
+            for offset in offsets[1:].tolist():
+                if offset >= kept[-1] + length:
+                    kept.append(offset)
+            offsets = np.array(kept, dtype=np.int64)
+
+        return offsets
+
+    # Cuts the messages at the given offsets out of a stream, returns an array (messages, MSG_LENGTH)
+    @staticmethod
+    def extract(data, offsets):
+
+        data = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data.reshape(-1)
+        return data[np.asarray(offsets)[:, None] + np.arange(MM_Message_Builder.MSG_LENGTH)]
+
+    # Returns the fields of all messages as column arrays in physical units
+    # periode [ms], intensity [%], amplitudes [mA], phasewidths [µs], doubletISI [ms]
+    # calibration .. optional MM_Calibration of the stimulator, the amplitudes before the compensation are then
+    #                added as requestedAmplitudes [mA]
+    @staticmethod
+    def toColumns(messages, calibration=None):
+
+        records = messages if messages.dtype == MM_Frame_Decoder.MESSAGE_DTYPE else MM_Frame_Decoder.decode(messages)
+
+        columns = {'pulseDelay': records['pulseDelay'] == MM_Message_Builder.PULSE_DELAY_OFF[0],
+                'periode': records['periode'].astype(np.int64),
+                'intensity': records['intensity'].astype(np.int64),
+                'amplitudes': records['amplitudes'].astype(np.int64),
+                'phasewidths': records['phasewidths'].astype(np.int64) * 10,
+                'prescalers': records['prescalers'].astype(np.int64),
+                'doublets': np.unpackbits(records['doublets'][:, None], axis=1, bitorder='little').astype(bool),
+                'doubletISI': records['doubletISI'] / 10.0,
+                'sensor': records['sensor'].astype(np.int64),
+                'highVoltage': records['highVoltage'].astype(np.int64),
+                'checksum': records['checksum'].astype(np.int64),
+                'valid': MM_Frame_Decoder.validate(records)}
+
+        if calibration is not None:
+            columns['requestedAmplitudes'] = calibration.decode(records['amplitudes']).astype(np.int64)
+
+        return columns
+
+    # Returns the messages as uint8 array (messages, MSG_LENGTH)
+    @staticmethod
+    def __asMatrix(messages):
+
+        messages = np.asarray(messages)
+
+        if messages.dtype == MM_Frame_Decoder.MESSAGE_DTYPE:
+            messages = np.ascontiguousarray(messages).view(np.uint8)
+
+        return messages.reshape(-1, MM_Message_Builder.MSG_LENGTH)
@@ -0,0 +1,107 @@
+## Instrumentation for the MOTIMOVE 8 Control Interface
+## Fixed-size histograms of the durations of the individual stages of building a message, kept in shared memory
+## so that they can be queried by another process while messages are being built
+
+import time
+
+import numpy as np
+
+from MM_Shared_State import MM_Shared_State
+
+
+class MM_Stage_Timer(object):
+
+    # Bin i counts the durations of i bits in [ns], i.e. from 2^(i-1) ns to below 2^i ns, the last bin counts everything longer
+    BINS = 32
+
+    # stages .. names of the stages in the order they are passed, 'total' is added for the complete message
+    def __init__(self, stages):
+
+        self.__stages = list(stages) + ['total']
+
+        self.__state = MM_Shared_State([('counts', 'i8', len(self.__stages) * MM_Stage_Timer.BINS),
+                                        ('sum', 'i8', len(self.__stages)),
+                                        ('max', 'i8', len(self.__stages))])
+        self.__mapState()
+
+    def __mapState(self):
+
+        self.__index = {name: i for i, name in enumerate(self.__stages)}
+        self.__total = self.__index['total']
+
+        # plain memoryviews are faster than NumPy for updating single elements
+        self.__counts = self.__state.getField('counts').data
+        self.__sum = self.__state.getField('sum').data
+        self.__max = self.__state.getField('max').data
+
+        self.__begin = 0
+        self.__last = 0
+
+    def __getstate__(self):
+        return {'stages': self.__stages, 'state': self.__state}
+
+    def __setstate__(self, state):
+        self.__stages = state['stages']
+        self.__state = state['state']
+        self.__mapState()
+
+    # Starts timing a new message
+    def start(self):
+
+        self.__begin = time.perf_counter_ns()
+        self.__last = self.__begin
+
+    # Ends the given stage, it lasted from the previous mark() or start() until now
+    def mark(self, stage):
+
+        now = time.perf_counter_ns()
+        self.__record(self.__index[stage], now - self.__last)
+        self.__last = now
+
+    # Ends timing the message, its complete duration is recorded as stage 'total'
+    def finish(self):
+        self.__record(self.__total, time.perf_counter_ns() - self.__begin)
+
+    def __record(self, stage, duration):
+
+        self.__counts[stage * MM_Stage_Timer.BINS + min(duration.bit_length(), MM_Stage_Timer.BINS - 1)] += 1
+        self.__sum[stage] += duration
+        if duration > self.__max[stage]:
+            self.__max[stage] = duration
+
+    # Returns the names of all stages
+    def getStages(self):
+        return list(self.__stages)
+
+    # Returns per stage: count, mean, max, estimated median and 99th percentile in [µs] and the histogram
+    # histogram .. list of (upper bound of the bin in [µs], count) of all bins which are not empty
+    def getStatistics(self):
+
+        counts = self.__state.getField('counts').reshape(len(self.__stages), MM_Stage_Timer.BINS).copy()
+        sums = self.__state.getField('sum').copy()
+        maxima = self.__state.getField('max').copy()
+        bounds = np.exp2(np.arange(MM_Stage_Timer.BINS)) / 1000.0
+
+        statistics = {}
+        for i, name in enumerate(self.__stages):
+
+            count = int(counts[i].sum())
+            cumulative = np.cumsum(counts[i])
+
+            statistics[name] = {
+                'count': count,
+                'mean': float(sums[i]) / count / 1000.0 if count > 0 else 0.0,
+                'max': float(maxima[i]) / 1000.0,
+                'p50': float(bounds[np.searchsorted(cumulative, 0.5 * count)]) if count > 0 else 0.0,
+                'p99': float(bounds[np.searchsorted(cumulative, 0.99 * count)]) if count > 0 else 0.0,
+                'histogram': [(float(bounds[j]), int(counts[i, j])) for j in np.flatnonzero(counts[i])],
+            }
+
+        return statistics
+
+    # Clears all histograms
+    def reset(self):
+
+        self.__state.getField('counts')[:] = 0
+        self.__state.getField('sum')[:] = 0
+        self.__state.getField('max')[:] = 0
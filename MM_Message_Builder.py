@@ -1,9 +1,17 @@
 ## Control Interface for MOTIMOVE 8
 ## (c) Dipl.-Ing. Dr. Martin Schmoll, BSc
 
+import contextlib
 import numpy as np
 import struct as struct
-from multiprocessing import Process, Value
+import time
+from multiprocessing import Process
+from MM_Calibration import MM_Calibration
+from MM_Ramp_Cache import MM_Ramp_Cache
+from MM_Ramp_Engine import MM_Ramp_Engine
+from MM_Shared_State import MM_Shared_State, MM_SeqLock
+from MM_Telemetry import MM_Telemetry
+from MM_Instrumentation import MM_Stage_Timer
 
 
 class MM_Message_Builder(object):
@@ -41,6 +49,21 @@ class MM_Message_Builder(object):
     CH7 = 7
     CH8 = 8
 
+    # Byte positions inside a Pulse-by-Pulse message
+    MSG_LENGTH = 35
+    POS_PULSE_DELAY = 3
+    POS_PERIODE = 4
+    POS_INTENSITY = 5
+    POS_AMPLITUDES = 6
+    POS_PHASEWIDTHS = 14
+    POS_PRESCALERS = 22
+    POS_DOUBLETS = 30
+    POS_DOUBLET_ISI = 31
+    POS_SENSOR = 32
+    POS_HIGH_VOLTAGE = 33
+    POS_CHECKSUM = 34
+
+    # Default compensation of the requested amplitudes, stimulators with their own calibration use a MM_Calibration
     AVAL_COMPENSATION = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24,
                          25, 26, 27, 28, 29, 30, 31, 31, 32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47,
                          48, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73,
@@ -50,234 +73,504 @@ class MM_Message_Builder(object):
                          136, 137, 138, 139, 140, 141, 142, 143, 144, 145, 146, 147, 148, 149, 150, 151, 152, 153, 154,
                          155, 156, 157, 158, 159, 160, 161, 162, 163, 164, 165, 166, 167, 168, 169, 170]
 
-    def __init__(self):
+    # Layout of the parameters in the shared state block, every field is a tuple (name, dtype, number of elements)
+    # 'i4' fields replace the former Value('i') objects, 'f4' fields the former Value('f') objects
+    # The parameters are written by the setters and protected by a sequence lock
+    PARAMETER_LAYOUT = [
+        # Active Channels
+        ('Ch_active', 'i4', 8),
+
+        # BOOST mode
+        ('BOOST_MODE', 'i4', 1),
+
+        # Phasewidths in [10 µs]
+        ('PhW', 'i4', 8),
+
+        # Phasewidths during BOOST in [10 µs]
+        ('PhW_BOOST', 'i4', 8),
+
+        # Maximal Stimulation Amplitudes in [mA]
+        ('A_max', 'i4', 8),
+
+        # Stimulation Intensity in [%]
+        ('Intensity', 'i4', 1),
+
+        # Frequencies in [Hz]
+        ('F', 'i4', 1),
+        ('F_BOOST', 'i4', 1),
+
+        # Stimulation Periode in [ms]
+        ('T', 'i4', 1),
+        ('T_BOOST', 'i4', 1),
+
+        # Frequency PreScaler
+        ('Ch_PreScaler', 'i4', 8),
+
+        # Pulse Delay, Doublets, Sensor Input and High Voltage
+        ('Pulse_Delay', 'i4', 1),
+        ('Doublet_Flag', 'i4', 1),
+        ('Doublet_ISI', 'i4', 1),
+        ('Sensor_Input', 'i4', 1),
+        ('High_Voltage', 'i4', 1),
+
+        # Ramping parameters
+        ('rampOnorOff', 'i4', 1),
+        ('CH_rampup_time', 'i4', 8),
+        ('CH_rampdown_time', 'i4', 8),
+        ('rampup_startvalue', 'i4', 1),
+        ('rampdown_endvalue', 'i4', 1),
+
+        # Amplitude envelopes, number of messages (0 .. no envelope), repeated or not, bank of the table and number of changes
+        ('CH_envelopeLength', 'i4', 8),
+        ('CH_envelopeLoop', 'i4', 8),
+        ('CH_envelopeBank', 'i4', 8),
+        ('CH_envelopeEpoch', 'i4', 8),
+
+        # Message template, always up to date with the parameters above
+        ('Frame', 'u1', 35),
+    ]
+
+    # Layout of the ramping state in the shared state block, only written while building a message
+    RUNTIME_LAYOUT = [
+        ('CH_ramp', 'f4', 8),
+        ('CH_rampCounter', 'i4', 8),
+        ('CH_rampFactor', 'f4', 8),
+        ('CH_rampOffset', 'f4', 8),
+        ('CH_rampFlag', 'i4', 8),
+        ('CH_oldState', 'i4', 8),
+        ('CH_newState', 'i4', 8),
+        ('CH_envelopePosition', 'i4', 8),
+        ('CH_envelopeEpochSeen', 'i4', 8),
+        ('messageCounter', 'i8', 1),            # messages generated so far, the prescalers count their periodes from it
+    ]
+
+    # Maximal number of messages of an amplitude envelope, see setEnvelope()
+    ENVELOPE_SAMPLES = 512
+
+    # Parameters of the amplitude envelopes, they point into the envelope table and are not part of a preset
+    ENVELOPE_PARAMETERS = ['CH_envelopeLength', 'CH_envelopeLoop', 'CH_envelopeBank', 'CH_envelopeEpoch']
+
+    # Parameters which can be set together by apply(), in the order their setters are called
+    TRANSACTION_PARAMETERS = ['BOOST_Mode', 'StimFrequency', 'StimFrequency_BOOST', 'Phasewidths', 'Phasewidths_BOOST',
+                              'MaxAmplitudes', 'ActiveChannels', 'Intensity', 'HighVoltage', 'Doublets', 'PreScalers',
+                              'RampUpTime', 'RampDownTime', 'RamUpStart', 'RampDownEnd', 'RampingOnorOff']
+
+    # Stages of getMessage() timed by the instrumentation, see setInstrumentation()
+    # The header, phasewidths and prescalers are patched into the message template by the setters, so they cost nothing here
+    TIMING_STAGES = ['snapshot', 'rampStates', 'rampCache', 'rampCalculation', 'amplitudes', 'compensation', 'checksum',
+                     'writeback', 'envelopes', 'telemetry']
+
+    # Layout of the complete shared state block
+    STATE_LAYOUT = [('sequence', 'i8', 1)] + PARAMETER_LAYOUT + RUNTIME_LAYOUT
+
+    # Returns the layout of a shared state block of several devices, every field holds all devices one after the other
+    @staticmethod
+    def getStateLayout(devices=1):
+        return [('sequence', 'i8', 1)] + MM_Message_Builder.getParameterLayout(devices) + \
+               [(name, dtype, count * devices) for name, dtype, count in MM_Message_Builder.RUNTIME_LAYOUT]
+
+    # Returns the layout of the parameters of the given number of devices
+    @staticmethod
+    def getParameterLayout(devices=1):
+        return [(name, dtype, count * devices) for name, dtype, count in MM_Message_Builder.PARAMETER_LAYOUT]
+
+    # telemetryCapacity .. number of messages kept in the telemetry ring buffer
+    # state, seqlock .. shared block of several devices (see getStateLayout()) and its lock, e.g. of MM_Device_Manager
+    #                   the builder then sets and generates the messages of the given device of all devices in the block
+    # calibration .. MM_Calibration of the stimulator, e.g. MM_Calibration.load(path, serial), None uses AVAL_COMPENSATION
+    def __init__(self, telemetryCapacity=256, state=None, seqlock=None, device=0, devices=1, calibration=None):
+
+        # a block handed in belongs to a MM_Device_Manager, which generates the messages
+        self.__managed = state is not None
+
+        # All parameters and states are kept in one shared block without any per-field locks
+        if state is None:
+            state = MM_Shared_State(MM_Message_Builder.STATE_LAYOUT)
+            seqlock = MM_SeqLock(state, 'sequence', 'Ch_active', 'Frame')
+
+        self.__state = state
+        self.__seqlock = seqlock
+        self.__device = device
+        self.__devices = devices
+        self.__calibration = calibration if calibration is not None else MM_Calibration(MM_Message_Builder.AVAL_COMPENSATION)
+
+        # Amplitude envelopes in [0.01 %] of the maximal amplitudes, two banks per channel, so a new envelope never
+        # overwrites the one which is being used for the current message
+        self.__envelopeTable = MM_Shared_State([('envelopes', 'u2', 2 * 8 * MM_Message_Builder.ENVELOPE_SAMPLES)])
+        self.__mapState()
+
+        # Amplitudes, ramp flags and timings of every message, read e.g. by MM_Telemetry_Monitor
+        self.__telemetry = MM_Telemetry(telemetryCapacity)
+
+        # Optional MM_Session_Recorder for all messages
+        self.__recorder = None
+
+        # Optional MM_Charge_Account for all messages
+        self.__chargeAccount = None
+
+        # Compiled presets, name -> (parameter block, keep the active channels)
+        self.__presets = {}
+
+        # Optional MM_Stage_Timer, only created when the instrumentation is switched on
+        self.__timer = None
+        self.__instrumentation = False
 
         # Active Channels
-        self.__Ch1_active = Value('i', 0)
-        self.__Ch2_active = Value('i', 0)
-        self.__Ch3_active = Value('i', 0)
-        self.__Ch4_active = Value('i', 0)
-        self.__Ch5_active = Value('i', 0)
-        self.__Ch6_active = Value('i', 0)
-        self.__Ch7_active = Value('i', 0)
-        self.__Ch8_active = Value('i', 0)
+        self.__Ch_active[:] = 0
 
         # BOOST mode
-        self.__BOOST_MODE = Value('i', 0)
+        self.__BOOST_MODE[0] = 0
 
         # Phasewidths in [µs]
-        self.__PhW1 = Value('i', 100)
-        self.__PhW2 = Value('i', 100)
-        self.__PhW3 = Value('i', 100)
-        self.__PhW4 = Value('i', 100)
-        self.__PhW5 = Value('i', 100)
-        self.__PhW6 = Value('i', 100)
-        self.__PhW7 = Value('i', 100)
-        self.__PhW8 = Value('i', 100)
+        self.__PhW[:] = 100
 
         # Phasewidths during BOOST in [µs]
-        self.__PhW1_BOOST = Value('i', 0)
-        self.__PhW2_BOOST = Value('i', 0)
-        self.__PhW3_BOOST = Value('i', 0)
-        self.__PhW4_BOOST = Value('i', 0)
-        self.__PhW5_BOOST = Value('i', 0)
-        self.__PhW6_BOOST = Value('i', 0)
-        self.__PhW7_BOOST = Value('i', 0)
-        self.__PhW8_BOOST = Value('i', 0)
+        self.__PhW_BOOST[:] = 0
 
         # Maximal Stimulation Amplitudes in [mA]
-        self.__A1_max = Value('i', 100)
-        self.__A2_max = Value('i', 100)
-        self.__A3_max = Value('i', 100)
-        self.__A4_max = Value('i', 100)
-        self.__A5_max = Value('i', 100)
-        self.__A6_max = Value('i', 100)
-        self.__A7_max = Value('i', 100)
-        self.__A8_max = Value('i', 100)
+        self.__A_max[:] = 100
 
         # Stimulation Intensity in [%]
-        self.__Intensity = Value('i', 10)
+        self.__Intensity[0] = 10
 
         # Frequencies in [Hz]
-        self.__F = Value('i', 0)
-        self.__F_BOOST = Value('i', 0)
+        self.__F[0] = 0
+        self.__F_BOOST[0] = 0
 
         # Stimulation Periode in [ms]
-        self.__T = Value('i', 10)
-        self.__T_BOOST = Value('i', 10)
+        self.__T[0] = 10
+        self.__T_BOOST[0] = 10
 
         # Frequency PreScaler
-        self.__Ch1_PreScaler = Value('i', 1)
-        self.__Ch2_PreScaler = Value('i', 1)
-        self.__Ch3_PreScaler = Value('i', 1)
-        self.__Ch4_PreScaler = Value('i', 1)
-        self.__Ch5_PreScaler = Value('i', 1)
-        self.__Ch6_PreScaler = Value('i', 1)
-        self.__Ch7_PreScaler = Value('i', 1)
-        self.__Ch8_PreScaler = Value('i', 1)
+        self.__Ch_PreScaler[:] = 1
 
         # Pulse Delay
-        self.__Pulse_Delay = Value('i', 0)      # 0 .. PULSE_DELAY_STD
-                                                # 1 .. PULSE_DELAY_OFF -> simultaneous pulses -> max. 100mA
+        self.__Pulse_Delay[0] = 0       # 0 .. PULSE_DELAY_STD
+                                        # 1 .. PULSE_DELAY_OFF -> simultaneous pulses -> max. 100mA
 
         # Doublets
-        self.__Doublet_Flag = Value('i', 0)     # 0 .. doublets off
-                                                # 1 .. doublets active
+        self.__Doublet_Flag[0] = 0      # bit n set .. doublets active on CH(n+1)
 
         # Interstimulus Interval for Doublets in steps of 100 µs; range 2.7 - 10 ms (27 - 100)
-        self.__Doublet_ISI = Value('i', 0)
+        self.__Doublet_ISI[0] = 0
 
         # Sensor Input
-        self.__Sensor_Input = Value('i', 0)     # 0 .. MM_Message_Builder.SENSOR_AI
-                                                # 1 .. MM_Message_Builder.SENSOR_S1
-                                                # 2 .. MM_Message_Builder.SENSOR_S2
+        self.__Sensor_Input[0] = 0      # 0 .. MM_Message_Builder.SENSOR_AI
+                                        # 1 .. MM_Message_Builder.SENSOR_S1
+                                        # 2 .. MM_Message_Builder.SENSOR_S2
 
         # High Voltage
-        self.__High_Voltage = Value('i', 0)     # 0 .. HIGH_VOLTAGE_OFF
-                                                # 1 .. HIGH_VOLTAGE_ON
-                                                # 2 .. HIGH_VOLTAGE_DONT_CHANGE
+        self.__High_Voltage[0] = 0      # 0 .. HIGH_VOLTAGE_OFF
+                                        # 1 .. HIGH_VOLTAGE_ON
+                                        # 2 .. HIGH_VOLTAGE_DONT_CHANGE
 
         # Ramp activation Flag
         # 0 means off
         # 1 means on
-        self.__rampOnorOff = Value('i', 1)
+        self.__rampOnorOff[0] = 1
 
         # Ramp values in %
-        self.__CH1_ramp = Value('f', 0)
-        self.__CH2_ramp = Value('f', 0)
-        self.__CH3_ramp = Value('f', 0)
-        self.__CH4_ramp = Value('f', 0)
-        self.__CH5_ramp = Value('f', 0)
-        self.__CH6_ramp = Value('f', 0)
-        self.__CH7_ramp = Value('f', 0)
-        self.__CH8_ramp = Value('f', 0)
+        self.__CH_ramp[:] = 0
 
         # time for ramping up in ms
-        self.__CH1_rampup_time = Value('i', 1000)
-        self.__CH2_rampup_time = Value('i', 750)
-        self.__CH3_rampup_time = Value('i', 500)
-        self.__CH4_rampup_time = Value('i', 250)
-        self.__CH5_rampup_time = Value('i', 1000)
-        self.__CH6_rampup_time = Value('i', 750)
-        self.__CH7_rampup_time = Value('i', 500)
-        self.__CH8_rampup_time = Value('i', 250)
+        self.__CH_rampup_time[:] = [1000, 750, 500, 250, 1000, 750, 500, 250]
 
         # time for ramping down in ms
-        self.__CH1_rampdown_time = Value('i', 250)
-        self.__CH2_rampdown_time = Value('i', 500)
-        self.__CH3_rampdown_time = Value('i', 750)
-        self.__CH4_rampdown_time = Value('i', 1000)
-        self.__CH5_rampdown_time = Value('i', 250)
-        self.__CH6_rampdown_time = Value('i', 500)
-        self.__CH7_rampdown_time = Value('i', 750)
-        self.__CH8_rampdown_time = Value('i', 1000)
-
-        self.__rampup_startvalue = Value('i', 25)   # starting value for ramping up in %
-        self.__rampdown_endvalue = Value('i', 50)   # end value for ramping down in %
+        self.__CH_rampdown_time[:] = [250, 500, 750, 1000, 250, 500, 750, 1000]
+
+        self.__rampup_startvalue[0] = 25    # starting value for ramping up in %
+        self.__rampdown_endvalue[0] = 50    # end value for ramping down in %
 
         # Ramping Counters, Factors and Offsets used for calculating the individual peaks during the ramping process
-        self.__CH1_rampCounter = Value('i', 0)
-        self.__CH2_rampCounter = Value('i', 0)
-        self.__CH3_rampCounter = Value('i', 0)
-        self.__CH4_rampCounter = Value('i', 0)
-        self.__CH5_rampCounter = Value('i', 0)
-        self.__CH6_rampCounter = Value('i', 0)
-        self.__CH7_rampCounter = Value('i', 0)
-        self.__CH8_rampCounter = Value('i', 0)
-
-        self.__CH1_rampFactor = Value('f', 0)
-        self.__CH2_rampFactor = Value('f', 0)
-        self.__CH3_rampFactor = Value('f', 0)
-        self.__CH4_rampFactor = Value('f', 0)
-        self.__CH5_rampFactor = Value('f', 0)
-        self.__CH6_rampFactor = Value('f', 0)
-        self.__CH7_rampFactor = Value('f', 0)
-        self.__CH8_rampFactor = Value('f', 0)
-
-        self.__CH1_rampOffset = Value('f', 0)
-        self.__CH2_rampOffset = Value('f', 0)
-        self.__CH3_rampOffset = Value('f', 0)
-        self.__CH4_rampOffset = Value('f', 0)
-        self.__CH5_rampOffset = Value('f', 0)
-        self.__CH6_rampOffset = Value('f', 0)
-        self.__CH7_rampOffset = Value('f', 0)
-        self.__CH8_rampOffset = Value('f', 0)
+        self.__CH_rampCounter[:] = 0
+        self.__CH_rampFactor[:] = 0
+        self.__CH_rampOffset[:] = 0
 
         # Ramping Flags used to activate ramping
         # 0 means no ramping / regular stimulation
         # 1 means ramping upwards
         # -1 means ramping downwards
-        self.__CH1_rampFlag = Value('i', 0)
-        self.__CH2_rampFlag = Value('i', 0)
-        self.__CH3_rampFlag = Value('i', 0)
-        self.__CH4_rampFlag = Value('i', 0)
-        self.__CH5_rampFlag = Value('i', 0)
-        self.__CH6_rampFlag = Value('i', 0)
-        self.__CH7_rampFlag = Value('i', 0)
-        self.__CH8_rampFlag = Value('i', 0)
+        self.__CH_rampFlag[:] = 0
 
         # Channelstate Markers for identifying when to activate ramping
-        self.__CH1_oldState = Value('i', 0)
-        self.__CH2_oldState = Value('i', 0)
-        self.__CH3_oldState = Value('i', 0)
-        self.__CH4_oldState = Value('i', 0)
-        self.__CH5_oldState = Value('i', 0)
-        self.__CH6_oldState = Value('i', 0)
-        self.__CH7_oldState = Value('i', 0)
-        self.__CH8_oldState = Value('i', 0)
-
-        self.__CH1_newState = Value('i', 0)
-        self.__CH2_newState = Value('i', 0)
-        self.__CH3_newState = Value('i', 0)
-        self.__CH4_newState = Value('i', 0)
-        self.__CH5_newState = Value('i', 0)
-        self.__CH6_newState = Value('i', 0)
-        self.__CH7_newState = Value('i', 0)
-        self.__CH8_newState = Value('i', 0)
+        self.__CH_oldState[:] = 0
+        self.__CH_newState[:] = 0
+
+        # No amplitude envelopes
+        self.__CH_envelopeLength[:] = 0
+        self.__CH_envelopeLoop[:] = 0
+        self.__CH_envelopeBank[:] = 0
+        self.__CH_envelopeEpoch[:] = 0
+        self.__CH_envelopePosition[:] = 0
+        self.__CH_envelopeEpochSeen[:] = 0
+
+        # Message template, from now on only the changed bytes are patched by the setters
+        self.__buildFrame()
+
+    # Binds the NumPy views of the shared block to the individual parameters
+    def __mapState(self):
+
+        self.__Ch_active = self.__getField(self.__state, 'Ch_active')
+        self.__BOOST_MODE = self.__getField(self.__state, 'BOOST_MODE')
+        self.__PhW = self.__getField(self.__state, 'PhW')
+        self.__PhW_BOOST = self.__getField(self.__state, 'PhW_BOOST')
+        self.__A_max = self.__getField(self.__state, 'A_max')
+        self.__Intensity = self.__getField(self.__state, 'Intensity')
+        self.__F = self.__getField(self.__state, 'F')
+        self.__F_BOOST = self.__getField(self.__state, 'F_BOOST')
+        self.__T = self.__getField(self.__state, 'T')
+        self.__T_BOOST = self.__getField(self.__state, 'T_BOOST')
+        self.__Ch_PreScaler = self.__getField(self.__state, 'Ch_PreScaler')
+        self.__Pulse_Delay = self.__getField(self.__state, 'Pulse_Delay')
+        self.__Doublet_Flag = self.__getField(self.__state, 'Doublet_Flag')
+        self.__Doublet_ISI = self.__getField(self.__state, 'Doublet_ISI')
+        self.__Sensor_Input = self.__getField(self.__state, 'Sensor_Input')
+        self.__High_Voltage = self.__getField(self.__state, 'High_Voltage')
+        self.__rampOnorOff = self.__getField(self.__state, 'rampOnorOff')
+        self.__CH_rampup_time = self.__getField(self.__state, 'CH_rampup_time')
+        self.__CH_rampdown_time = self.__getField(self.__state, 'CH_rampdown_time')
+        self.__rampup_startvalue = self.__getField(self.__state, 'rampup_startvalue')
+        self.__rampdown_endvalue = self.__getField(self.__state, 'rampdown_endvalue')
+        self.__CH_ramp = self.__getField(self.__state, 'CH_ramp')
+        self.__CH_rampCounter = self.__getField(self.__state, 'CH_rampCounter')
+        self.__CH_rampFactor = self.__getField(self.__state, 'CH_rampFactor')
+        self.__CH_rampOffset = self.__getField(self.__state, 'CH_rampOffset')
+        self.__CH_rampFlag = self.__getField(self.__state, 'CH_rampFlag')
+        self.__CH_oldState = self.__getField(self.__state, 'CH_oldState')
+        self.__CH_newState = self.__getField(self.__state, 'CH_newState')
+        self.__CH_envelopeLength = self.__getField(self.__state, 'CH_envelopeLength')
+        self.__CH_envelopeLoop = self.__getField(self.__state, 'CH_envelopeLoop')
+        self.__CH_envelopeBank = self.__getField(self.__state, 'CH_envelopeBank')
+        self.__CH_envelopeEpoch = self.__getField(self.__state, 'CH_envelopeEpoch')
+        self.__CH_envelopePosition = self.__getField(self.__state, 'CH_envelopePosition')
+        self.__CH_envelopeEpochSeen = self.__getField(self.__state, 'CH_envelopeEpochSeen')
+        self.__messageCounter = self.__getField(self.__state, 'messageCounter')
+        self.__envelopes = self.__envelopeTable.getField('envelopes').reshape(2, 8, MM_Message_Builder.ENVELOPE_SAMPLES)
+        self.__Frame = self.__getField(self.__state, 'Frame')
+
+        # all parameters and the message template, restored if a transaction fails
+        self.__parameters = self.__state.getRegion('Ch_active', 'Frame')
+
+        # the bytes of the parameters which belong to this device, kept by the presets
+        # the envelopes are left out, their samples are not kept by a preset
+        base = self.__parameters.ctypes.data
+        fields = [self.__getField(self.__state, name) for name, dtype, count in MM_Message_Builder.PARAMETER_LAYOUT
+                  if name not in MM_Message_Builder.ENVELOPE_PARAMETERS]
+        self.__deviceBytes = np.concatenate([np.arange(field.ctypes.data - base, field.ctypes.data - base + field.nbytes)
+                                             for field in fields])
+
+        # Ramping of all channels in one step, CH1 keeps its original behaviour of finishing the downwards ramp at 0
+        # Complete ramps are precomputed per parameter combination (process local), so ramping is mostly a table lookup
+        self.__compensation = self.__calibration.getTable()
+        self.__compensationList = self.__compensation.tolist()
+        self.__rampCache = MM_Ramp_Cache(self.__compensation)
+        self.__rampEngine = MM_Ramp_Engine(self.__CH_ramp, self.__CH_rampCounter, self.__CH_rampFactor, self.__CH_rampOffset,
+                                           self.__CH_rampFlag, self.__CH_oldState, self.__CH_newState,
+                                           [True, False, False, False, False, False, False, False],
+                                           self.__compensation, self.__rampCache)
+
+        # Process local snapshot of the parameters, getMessage() only works on this consistent copy
+        self.__snapshot = MM_Shared_State(MM_Message_Builder.getParameterLayout(self.__devices), shared=False)
+        self.__snapshotBytes = self.__snapshot.getRegion('Ch_active', 'Frame')
+        self.__snap_Ch_active = self.__getField(self.__snapshot, 'Ch_active')
+        self.__snap_PhW = self.__getField(self.__snapshot, 'PhW')
+        self.__snap_PhW_BOOST = self.__getField(self.__snapshot, 'PhW_BOOST')
+        self.__snap_A_max = self.__getField(self.__snapshot, 'A_max')
+        self.__snap_T = self.__getField(self.__snapshot, 'T')
+        self.__snap_T_BOOST = self.__getField(self.__snapshot, 'T_BOOST')
+        self.__snap_F = self.__getField(self.__snapshot, 'F')
+        self.__snap_rampOnorOff = self.__getField(self.__snapshot, 'rampOnorOff')
+        self.__snap_CH_rampup_time = self.__getField(self.__snapshot, 'CH_rampup_time')
+        self.__snap_CH_rampdown_time = self.__getField(self.__snapshot, 'CH_rampdown_time')
+        self.__snap_rampup_startvalue = self.__getField(self.__snapshot, 'rampup_startvalue')
+        self.__snap_rampdown_endvalue = self.__getField(self.__snapshot, 'rampdown_endvalue')
+        self.__snap_Ch_PreScaler = self.__getField(self.__snapshot, 'Ch_PreScaler')
+        self.__snap_CH_envelopeLength = self.__getField(self.__snapshot, 'CH_envelopeLength')
+        self.__snap_CH_envelopeLoop = self.__getField(self.__snapshot, 'CH_envelopeLoop')
+        self.__snap_CH_envelopeBank = self.__getField(self.__snapshot, 'CH_envelopeBank')
+        self.__snap_CH_envelopeEpoch = self.__getField(self.__snapshot, 'CH_envelopeEpoch')
+
+        # the message template and the message of the snapshot are patched through memoryviews, see __patch()
+        self.__FrameView = memoryview(self.__Frame)
+
+        # the message of the snapshot is patched and handed out by getMessage()
+        self.__snap_Frame = self.__getField(self.__snapshot, 'Frame')
+        self.__snap_FrameView = memoryview(self.__snap_Frame)
+
+        # epoch of the parameters of the snapshot, the last message is reused while it is unchanged and nothing is ramping
+        self.__epoch = -1
+        self.__steady = False
+
+    # Returns the part of a field which belongs to the device of this builder
+    def __getField(self, state, name):
+        return state.getField(name).reshape(self.__devices, -1)[self.__device]
+
+    # Only the shared block and its lock are handed over to a new process, the views are rebuilt there
+    def __getstate__(self):
+        return {'state': self.__state, 'seqlock': self.__seqlock, 'managed': self.__managed, 'device': self.__device,
+                'devices': self.__devices, 'calibration': self.__calibration, 'envelopes': self.__envelopeTable,
+                'telemetry': self.__telemetry, 'timer': self.__timer, 'instrumentation': self.__instrumentation,
+                'presets': self.__presets, 'chargeAccount': self.__chargeAccount}
+
+    def __setstate__(self, state):
+        self.__state = state['state']
+        self.__seqlock = state['seqlock']
+        self.__managed = state['managed']
+        self.__device = state['device']
+        self.__devices = state['devices']
+        self.__calibration = state['calibration']
+        self.__envelopeTable = state['envelopes']
+        self.__telemetry = state['telemetry']
+        self.__timer = state['timer']
+        self.__instrumentation = state['instrumentation']
+        self.__presets = state['presets']
+        self.__chargeAccount = state['chargeAccount']
+        self.__recorder = None
+        self.__mapState()
+
+    # Returns the size of the shared state block in [bytes]
+    def getStateSize(self):
+        return self.__state.getSize()
+
+    # Returns the MM_Calibration the amplitudes are compensated with
+    def getCalibration(self):
+        return self.__calibration
+
+    # Returns the telemetry ring buffer with one record per message generated by getMessage()
+    def getTelemetry(self):
+        return self.__telemetry
+
+    # Records every message generated by getMessage() from now on in a MM_Session_Recorder, None stops recording
+    # The recorder belongs to the process it was created in and is not handed over to other processes
+    def setRecorder(self, recorder):
+        self.__recorder = recorder
+
+    def getRecorder(self):
+        return self.__recorder
+
+    # Accounts the charge of every message generated by getMessage() or getMessages() from now on in a MM_Charge_Account,
+    # None stops accounting. The account is kept in shared memory and handed over to other processes together with the builder
+    def setChargeAccount(self, account):
+        self.__chargeAccount = account
+
+    def getChargeAccount(self):
+        return self.__chargeAccount
+
+    # Switches the timing of the individual stages of getMessage() on or off, it is off by default
+    # The timings are kept in shared memory: switch it on before the builder is handed over to another process,
+    # then they can be queried here while the other process generates the messages
+    def setInstrumentation(self, enabled):
+
+        if enabled and self.__timer is None:
+            self.__timer = MM_Stage_Timer(MM_Message_Builder.TIMING_STAGES)
+
+        self.__instrumentation = bool(enabled)
+
+    # Returns the MM_Stage_Timer with the histograms of all stages, None if the instrumentation has never been switched on
+    def getStageTimer(self):
+        return self.__timer
+
+    # Returns count, mean, max, median and 99th percentile in [µs] and the histogram of every stage of getMessage()
+    def getStageTimings(self):
+        return None if self.__timer is None else self.__timer.getStatistics()
+
+    # Returns hits, misses and number of precomputed ramps of the ramp cache of this process
+    def getRampCacheStatistics(self):
+        return self.__rampCache.getStatistics()
+
+    # All setters called inside the transaction are published together, usage: with builder.transaction(): ...
+    # getMessage() in other processes keeps waiting meanwhile and never sees a partly applied configuration
+    # If a setter fails, all parameters and envelopes are restored and nothing is published
+    # getMessage() must not be called by the same process inside the transaction
+    @contextlib.contextmanager
+    def transaction(self):
+
+        with self.__seqlock:
+
+            backup = self.__parameters.copy()
+            envelopes = self.__envelopes.copy()
+
+            try:
+                yield self
+            except BaseException:
+                self.__parameters[:] = backup
+                self.__envelopes[:] = envelopes
+                raise
+
+    # Sets several parameters in one transaction
+    # Expects a dictionary of setter names without 'set' and their values, e.g. {'Intensity': 50, 'StimFrequency': 30}
+    # see TRANSACTION_PARAMETERS, all names are checked before anything is set
+    def apply(self, parameters):
+
+        unknown = [name for name in parameters if name not in MM_Message_Builder.TRANSACTION_PARAMETERS]
+        if unknown:
+            raise ValueError('unknown parameters: ' + ', '.join(unknown))
+
+        # the setters clamp lists in place, so the values of the caller are copied
+        values = [(getattr(self, 'set' + name), parameters[name]) for name in MM_Message_Builder.TRANSACTION_PARAMETERS
+                  if name in parameters]
+        values = [(setter, list(value) if isinstance(value, (list, tuple, np.ndarray)) else value) for setter, value in values]
+
+        with self.transaction():
+            for setter, value in values:
+                setter(value)
+
+    # Compiles a named preset once, e.g. for warm-up, cycling or cool-down, setPreset() switches to it later on
+    # Expects a dictionary like apply(), all other parameters are taken from the configuration at the time of compiling
+    # The clamped parameters and the message template are kept, the current configuration itself is not changed
+    # Without 'ActiveChannels' the preset keeps the channels active at the time it is set
+    # The amplitude envelopes are not part of a preset, the channels keep the envelopes set at the time it is set
+    def compilePreset(self, name, parameters):
+
+        with self.transaction():
+
+            backup = self.__parameters.copy()
 
-    # Activates / Deactivates the respective channels
-    # Expects boolean array [False, False, False, False, False, False, False, False]
-    def setActiveChannels(self, activeChannels):
+            try:
+                self.apply(parameters)
+                self.__presets[name] = (self.__parameters[self.__deviceBytes].copy(), 'ActiveChannels' not in parameters)
+            finally:
+                self.__parameters[:] = backup
 
-        if (activeChannels[0]):
-            self.__Ch1_active.value = 1
-        else:
-            self.__Ch1_active.value = 0
+    # Switches to a compiled preset, one copy of the parameter block without any checks or conversions
+    def setPreset(self, name):
 
-        if (activeChannels[1]):
-            self.__Ch2_active.value = 1
-        else:
-            self.__Ch2_active.value = 0
+        parameters, keepActive = self.__presets[name]
+
+        with self.__seqlock:
 
-        if (activeChannels[2]):
-            self.__Ch3_active.value = 1
-        else:
-            self.__Ch3_active.value = 0
+            if keepActive:
+                active = self.__Ch_active.copy()
+                self.__parameters[self.__deviceBytes] = parameters
+                self.__Ch_active[:] = active
+                self.__patchFrame(MM_Message_Builder.POS_AMPLITUDES, self.__getTemplateAmplitudes())
+            else:
+                self.__parameters[self.__deviceBytes] = parameters
 
-        if (activeChannels[3]):
-            self.__Ch4_active.value = 1
-        else:
-            self.__Ch4_active.value = 0
+    # Returns the names of all compiled presets
+    def getPresets(self):
+        return list(self.__presets)
 
-        if (activeChannels[4]):
-            self.__Ch5_active.value = 1
-        else:
-            self.__Ch5_active.value = 0
+    # Removes a compiled preset
+    def removePreset(self, name):
+        del self.__presets[name]
 
-        if (activeChannels[5]):
-            self.__Ch6_active.value = 1
-        else:
-            self.__Ch6_active.value = 0
+    # Activates / Deactivates the respective channels
+    # Expects boolean array [False, False, False, False, False, False, False, False]
+    def setActiveChannels(self, activeChannels):
 
-        if (activeChannels[6]):
-            self.__Ch7_active.value = 1
-        else:
-            self.__Ch7_active.value = 0
+        active = [0, 0, 0, 0, 0, 0, 0, 0]
 
-        if (activeChannels[7]):
-            self.__Ch8_active.value = 1
-        else:
-            self.__Ch8_active.value = 0
+        for i in range(0, 8):
+
+            if (activeChannels[i]):
+                active[i] = 1
+            else:
+                active[i] = 0
+
+        with self.__seqlock:
+            self.__Ch_active[:] = active
+            self.__patchFrame(MM_Message_Builder.POS_AMPLITUDES, self.__getTemplateAmplitudes())
 
     # Sets the Phasewidth for each channel for normal operation
     def setPhasewidths(self, PhW):
@@ -292,14 +585,12 @@ class MM_Message_Builder(object):
                 PhW[i] = 1000
 
         # Convert values
-        self.__PhW1.value = int(PhW[0] / 10)
-        self.__PhW2.value = int(PhW[1] / 10)
-        self.__PhW3.value = int(PhW[2] / 10)
-        self.__PhW4.value = int(PhW[3] / 10)
-        self.__PhW5.value = int(PhW[4] / 10)
-        self.__PhW6.value = int(PhW[5] / 10)
-        self.__PhW7.value = int(PhW[6] / 10)
-        self.__PhW8.value = int(PhW[7] / 10)
+        PhW = [int(PhW[i] / 10) for i in range(0, 8)]
+
+        with self.__seqlock:
+            self.__PhW[:] = PhW
+            if self.__BOOST_MODE[0] != 1:
+                self.__patchFrame(MM_Message_Builder.POS_PHASEWIDTHS, PhW)
 
     # Sets the Phasewidth for each channel during BOOST in [µs]
     def setPhasewidths_BOOST(self, PhW_BOOST):
@@ -314,18 +605,18 @@ class MM_Message_Builder(object):
                 PhW_BOOST[i] = 1000
 
         # Convert values
-        self.__PhW1_BOOST.value = int(PhW_BOOST[0] / 10)
-        self.__PhW2_BOOST.value = int(PhW_BOOST[1] / 10)
-        self.__PhW3_BOOST.value = int(PhW_BOOST[2] / 10)
-        self.__PhW4_BOOST.value = int(PhW_BOOST[3] / 10)
-        self.__PhW5_BOOST.value = int(PhW_BOOST[4] / 10)
-        self.__PhW6_BOOST.value = int(PhW_BOOST[5] / 10)
-        self.__PhW7_BOOST.value = int(PhW_BOOST[6] / 10)
-        self.__PhW8_BOOST.value = int(PhW_BOOST[7] / 10)
+        PhW_BOOST = [int(PhW_BOOST[i] / 10) for i in range(0, 8)]
+
+        with self.__seqlock:
+            self.__PhW_BOOST[:] = PhW_BOOST
+            if self.__BOOST_MODE[0] == 1:
+                self.__patchFrame(MM_Message_Builder.POS_PHASEWIDTHS, PhW_BOOST)
 
     # Sets the maximal allowed Stimulation amplitudes
     def setMaxAmplitudes(self, A):
 
+        pulseDelay = int(self.__Pulse_Delay[0])
+
         # Check boundaries
         for i in range(0, 8):
 
@@ -333,21 +624,16 @@ class MM_Message_Builder(object):
                 A[i] = 0
 
             # Standard delayed pulses -> maximum 170 mA
-            if (self.__Pulse_Delay.value == 0 &  A[i] > 170):
+            if (pulseDelay == 0 and A[i] > 170):
                 A[i] = 170
 
             # Simultaneously delivered pulses -> maximum 100 mA
-            if (self.__Pulse_Delay.value == 1 &  A[i] > 100):
+            if (pulseDelay == 1 and A[i] > 100):
                 A[i] = 100
 
-        self.__A1_max.value = A[0]
-        self.__A2_max.value = A[1]
-        self.__A3_max.value = A[2]
-        self.__A4_max.value = A[3]
-        self.__A5_max.value = A[4]
-        self.__A6_max.value = A[5]
-        self.__A7_max.value = A[6]
-        self.__A8_max.value = A[7]
+        with self.__seqlock:
+            self.__A_max[:] = A[0:8]
+            self.__patchFrame(MM_Message_Builder.POS_AMPLITUDES, self.__getTemplateAmplitudes())
 
     # Sets the intensity in [%] for all channels
     def setIntensity(self, Intensity):
@@ -359,11 +645,13 @@ class MM_Message_Builder(object):
         if (Intensity > 100):
             Intensity = 100
 
-        self.__Intensity.value = int(Intensity)
+        with self.__seqlock:
+            self.__Intensity[0] = int(Intensity)
+            self.__patchFrame(MM_Message_Builder.POS_INTENSITY, self.__Intensity)
 
     # Returns the current stimulation intensity in [%]
     def getIntensity(self):
-        return self.__Intensity.value
+        return int(self.__Intensity[0])
 
     # Activates or deactivates the high-voltage control of the stimulator.
     # 0.. High voltage OFF, 1.. High voltage ON
@@ -376,7 +664,9 @@ class MM_Message_Builder(object):
         if (HighVoltage > 1):
             HighVoltage = 1
 
-        self.__High_Voltage.value = HighVoltage
+        with self.__seqlock:
+            self.__High_Voltage[0] = HighVoltage
+            self.__patchFrame(MM_Message_Builder.POS_HIGH_VOLTAGE, self.__High_Voltage)
 
     # Activates or deactivates BOOST Mode
     # 0.. BOOST OFF, 1.. BOOST ON
@@ -389,7 +679,14 @@ class MM_Message_Builder(object):
         if (BOOST_MODE > 1):
             BOOST_MODE = 1
 
-        self.__BOOST_MODE.value = BOOST_MODE
+        with self.__seqlock:
+            self.__BOOST_MODE[0] = BOOST_MODE
+            if BOOST_MODE == 1:
+                self.__patchFrame(MM_Message_Builder.POS_PERIODE, self.__T_BOOST)
+                self.__patchFrame(MM_Message_Builder.POS_PHASEWIDTHS, self.__PhW_BOOST)
+            else:
+                self.__patchFrame(MM_Message_Builder.POS_PERIODE, self.__T)
+                self.__patchFrame(MM_Message_Builder.POS_PHASEWIDTHS, self.__PhW)
 
     # Sets a new Stimulation Frequency
     # F given in [Hz]
@@ -402,9 +699,6 @@ class MM_Message_Builder(object):
         if (F > 100):
             F = 100
 
-        self.__F.value = int(F)
-
-
         # Standard Mode
         TT = np.round(1000 / F)
         if TT < 10:
@@ -412,7 +706,11 @@ class MM_Message_Builder(object):
         elif TT > 254:
             TT = 254
 
-        self.__T.value = int(TT)
+        with self.__seqlock:
+            self.__F[0] = int(F)
+            self.__T[0] = int(TT)
+            if self.__BOOST_MODE[0] != 1:
+                self.__patchFrame(MM_Message_Builder.POS_PERIODE, self.__T)
 
     # Sets a new Stimulation Frequency during BOOST
     # F given in [Hz]
@@ -425,8 +723,6 @@ class MM_Message_Builder(object):
         if (F_BOOST > 100):
             F_BOOST = 100
 
-        self.__F_BOOST.value = int(F_BOOST)
-
         # BOOST Mode
         TT = np.round(1000 / F_BOOST)
         if TT < 10:
@@ -434,51 +730,94 @@ class MM_Message_Builder(object):
         elif TT > 254:
             TT = 254
 
-        self.__T_BOOST.value = int(TT)
+        with self.__seqlock:
+            self.__F_BOOST[0] = int(F_BOOST)
+            self.__T_BOOST[0] = int(TT)
+            if self.__BOOST_MODE[0] == 1:
+                self.__patchFrame(MM_Message_Builder.POS_PERIODE, self.__T_BOOST)
 
     # Returns Stimulation periode in [s]
     def getStimPeriode(self):
-        if self.__BOOST_MODE.value == 1:
-            return 1.0/self.__F_BOOST.value
+        if self.__BOOST_MODE[0] == 1:
+            return 1.0/int(self.__F_BOOST[0])
         else:
-            return 1/self.__F.value
+            return 1/int(self.__F[0])
+
+    # Returns the periode of the next message in [ms] as it is sent, i.e. rounded and limited to 10 - 254 ms
+    def getMessagePeriode(self):
+        return int(self.__Frame[MM_Message_Builder.POS_PERIODE])
 
     # Returns the current stimulation frequency in [Hz]
     def getFrequency(self):
-        return self.__F.value
+        return int(self.__F[0])
 
     # Returns the stimulation frequency during BOOST in [Hz]
     def getFrequency_BOOST(self):
-        return self.__F_BOOST.value
+        return int(self.__F_BOOST[0])
 
     # Returns an array of the Phasewidths in [µs]
     def getPhasewidths(self):
-        return [self.__PhW1.value * 10, self.__PhW2.value * 10, self.__PhW3.value * 10, self.__PhW4.value * 10,
-                self.__PhW5.value * 10, self.__PhW6.value * 10, self.__PhW7.value * 10, self.__PhW8.value * 10]
+        return (self.__PhW * 10).tolist()
 
     # Returns an array of the Phasewidths during BOOST in [µs]
     def getPhasewidths_BOOST(self):
-        return [self.__PhW1_BOOST.value * 10, self.__PhW2_BOOST.value * 10, self.__PhW3_BOOST.value * 10, self.__PhW4_BOOST.value * 10,
-                self.__PhW5_BOOST.value * 10, self.__PhW6_BOOST.value * 10, self.__PhW7_BOOST.value * 10, self.__PhW8_BOOST.value * 10]
+        return (self.__PhW_BOOST * 10).tolist()
 
     # Returns an array of the maximal Amplitudes in [mA]
     def getAmplitudesMax(self):
-        return [self.__A1_max.value, self.__A2_max.value, self.__A3_max.value, self.__A4_max.value,
-                self.__A5_max.value, self.__A6_max.value, self.__A7_max.value, self.__A8_max.value]
+        return self.__A_max.tolist()
 
     # Calculates a new Doublet Flag based on a bool input array
     # e.g. doublets on CH1, 7,8 -> [True, False, False, False, False, False, True, True]
     def setDoublets(self, doublet_flags):
 
-        FLAG = b'\x00'
+        FLAG = 0
 
-        MASK = b'\x01,\x02,\x04,\x08,\x10,\x20,\x40,\x80'
+        MASK = [0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80]
 
         for i in range(0, 8):
             if doublet_flags[i]:
-                FLAG = bytes(FLAG[0] & MASK[i])
+                FLAG = FLAG | MASK[i]
+
+        with self.__seqlock:
+            self.__Doublet_Flag[0] = FLAG
+            self.__patchFrame(MM_Message_Builder.POS_DOUBLETS, self.__Doublet_Flag)
+
+    # Sets the frequency prescalers of all channels, channel i then only stimulates every prescalers[i]-th periode
+    # prescalers .. 8 integers from 1 (every periode, the default) to 255
+    # The periodes are counted by the message counter of the builder (see getMessageCounter()), i.e. channel i stimulates
+    # in the messages whose number is a multiple of prescalers[i], also after the prescalers have been changed. This
+    # assumes that the stimulator counts from the first message it receives from this builder
+    def setPreScalers(self, prescalers):
+
+        for i in range(0, 8):
+
+            if (prescalers[i] < 1):
+                prescalers[i] = 1
+
+            if (prescalers[i] > 255):
+                prescalers[i] = 255
+
+        with self.__seqlock:
+            self.__Ch_PreScaler[:] = [int(prescalers[i]) for i in range(0, 8)]
+            self.__patchFrame(MM_Message_Builder.POS_PRESCALERS, self.__Ch_PreScaler)
+
+    # Returns the frequency prescalers of all channels
+    def getPreScalers(self):
+        return self.__Ch_PreScaler.tolist()
 
-        self.__Doublet_Flag = FLAG
+    # Returns the effective stimulation frequencies of all channels in [Hz], i.e. the frequency of the current mode
+    # as it is sent (whole milliseconds) divided by the prescalers
+    def getEffectiveFrequencies(self):
+        return (1000.0 / self.getMessagePeriode() / self.__Ch_PreScaler).tolist()
+
+    # the prescalers of the snapshot for the ramp engine, None while all channels stimulate every periode
+    def __getPreScalers(self):
+
+        if (self.__snap_Ch_PreScaler == 1).all():
+            return None
+
+        return self.__snap_Ch_PreScaler
 
     # sets a new time for ramping up
     # T in [ms]
@@ -489,14 +828,8 @@ class MM_Message_Builder(object):
             if (rampuptime[i] < 0):
                 rampuptime[i] = 0
 
-        self.__CH1_rampup_time.value = int(rampuptime[0])
-        self.__CH2_rampup_time.value = int(rampuptime[1])
-        self.__CH3_rampup_time.value = int(rampuptime[2])
-        self.__CH4_rampup_time.value = int(rampuptime[3])
-        self.__CH5_rampup_time.value = int(rampuptime[4])
-        self.__CH6_rampup_time.value = int(rampuptime[5])
-        self.__CH7_rampup_time.value = int(rampuptime[6])
-        self.__CH8_rampup_time.value = int(rampuptime[7])
+        with self.__seqlock:
+            self.__CH_rampup_time[:] = [int(rampuptime[i]) for i in range(0, 8)]
 
     # sets a new time for ramping down
     # T in [ms]
@@ -507,1027 +840,358 @@ class MM_Message_Builder(object):
             if (rampdowntime[i] < 0):
                 rampdowntime[i] = 0
 
-        self.__CH1_rampdown_time.value = int(rampdowntime[0])
-        self.__CH2_rampdown_time.value = int(rampdowntime[1])
-        self.__CH3_rampdown_time.value = int(rampdowntime[2])
-        self.__CH4_rampdown_time.value = int(rampdowntime[3])
-        self.__CH5_rampdown_time.value = int(rampdowntime[4])
-        self.__CH6_rampdown_time.value = int(rampdowntime[5])
-        self.__CH7_rampdown_time.value = int(rampdowntime[6])
-        self.__CH8_rampdown_time.value = int(rampdowntime[7])
+        with self.__seqlock:
+            self.__CH_rampdown_time[:] = [int(rampdowntime[i]) for i in range(0, 8)]
 
     # sets a new starting value for ramping up in [%]
     def setRamUpStart(self, rampupstartvalue):
 
         if rampupstartvalue < 0:
-            self.__rampup_startvalue.value = 0
+            rampupstartvalue = 0
 
         elif rampupstartvalue >= 100:
-            self.__rampup_startvalue.value = 100
+            rampupstartvalue = 100
 
-        else:
-            self.__rampup_startvalue.value = rampupstartvalue
+        with self.__seqlock:
+            self.__rampup_startvalue[0] = rampupstartvalue
 
     # sets a new end value for ramping down in  [%]
     def setRampDownEnd(self, rampdownendvalue):
 
         if rampdownendvalue < 0:
-            self.__rampdown_endvalue.value = 0
+            rampdownendvalue = 0
 
         elif rampdownendvalue >= 100:
-            self.__rampdown_endvalue.value = 100
+            rampdownendvalue = 100
 
-        else:
-            self.__rampdown_endvalue.value = rampdownendvalue
+        with self.__seqlock:
+            self.__rampdown_endvalue[0] = rampdownendvalue
 
     # option to manually set the Counter used for Ramping
     def setRampCounter(self, rampCounter):
-        self.__CH1_rampCounter.value = rampCounter
+        with self.__seqlock:
+            self.__CH_rampCounter[0] = rampCounter
 
     # activates or deactivates the Ramping, 1 is active, 0 is inactive
     def setRampingOnorOff(self, rampingactivate):
-        self.__rampOnorOff.value = rampingactivate
-
-    # returns the time for ramping up in [ms]
-    def getRampUpTime(self):
-        return [self.__CH1_rampup_time.value, self.__CH2_rampup_time.value, self.__CH3_rampup_time.value, self.__CH4_rampup_time.value,
-                self.__CH5_rampup_time.value, self.__CH6_rampup_time.value, self.__CH7_rampup_time.value, self.__CH8_rampup_time.value]
-
-    # returns the time for ramping down in [ms]
-    def getRampDownTime(self):
-        return [self.__CH1_rampdown_time.value, self.__CH2_rampdown_time.value, self.__CH3_rampdown_time.value, self.__CH4_rampdown_time.value,
-                self.__CH5_rampdown_time.value, self.__CH6_rampdown_time.value, self.__CH7_rampdown_time.value, self.__CH8_rampdown_time.value]
-
-    # returns the starting value for ramping up in [%]
-    def getRampUpStart(self):
-        return self.__rampup_startvalue.value
-
-    # returns the end value for ramping down in [%]
-    def getRampDownEnd(self):
-        return self.__rampdown_endvalue.value
-
-    # Calculation of the individual ramping peaks for upwards ramping of CH1
-    def rampUpCH1(self):
-
-        if self.__CH1_rampCounter.value == 0:     # if we enter the ramping for the first time, we want to calculate the required startvalue and stepheight for each following ramping pulse
-            n = self.__F.value * self.__CH1_rampup_time.value / 1000            # calculate how much ramping steps are needed
-            if self.__CH1_ramp.value < self.__rampup_startvalue.value:          # checking if starting from under the minimum starting value
-                self.__CH1_rampOffset.value = self.__rampup_startvalue.value    # starting value
-                self.__CH1_rampFactor.value = (100.0 - self.__CH1_rampOffset.value) / n     # calculation of step height
-                self.__CH1_ramp.value = self.__rampup_startvalue.value          # setting the current ramp value
-                self.__CH1_rampCounter.value += 1
-
-            elif self.__CH1_ramp.value >= 100:                                  # if we start at 100% already we want to deativate ramping and keep the value at 100
-                self.__CH1_ramp.value = 100
-                self.__CH1_rampCounter.value = 0
-                self.__CH1_rampFlag.value = 0
+        with self.__seqlock:
+            self.__rampOnorOff[0] = rampingactivate
 
-            else:
-                self.__CH1_rampOffset.value = int(self.__CH1_ramp.value)        # starting from anywhere else, we want to start from the current point, calculating startvalue and stepheight
-                self.__CH1_rampFactor.value = (100 - self.__CH1_rampOffset.value) / n
-                self.__CH1_rampCounter.value += 1
-
-        else:                                                                   # if we enter the ramping any other time than the first one, we want to check if we have exceeded any bounds
-            if self.__CH1_ramp.value < self.__rampup_startvalue.value:
-                self.__CH1_ramp.value = self.__rampup_startvalue.value
-                self.__CH1_rampCounter.value = 1
-
-            elif self.__CH1_ramp.value >= 100:
-                self.__CH1_ramp.value = 100
-                self.__CH1_rampCounter.value = 0
-                self.__CH1_rampFlag.value = 0
-
-            else:                                                               # if every check has been correct, we want to ramp upwards by calculating the next ramped impulse
-                self.__CH1_ramp.value = (self.__CH1_rampFactor.value * self.__CH1_rampCounter.value) + self.__CH1_rampOffset.value
-                self.__CH1_rampCounter.value += 1
-
-        if self.__CH1_ramp.value >= 100:                                        # when the ramping has reached 100, it has finished and is deactivated
-            self.__CH1_rampCounter.value = 0
-            self.__CH1_ramp.value = 100
-            self.__CH1_rampFlag.value = 0
-
-        return self.__CH1_ramp.value
-
-    # Calculation of the individual ramping peaks for upwards ramping of CH2, for exact explanation see CH1
-    def rampUpCH2(self):
-
-        if self.__CH2_rampCounter.value == 0:
-            n = self.__F.value * self.__CH2_rampup_time.value / 1000.0
-            if self.__CH2_ramp.value < self.__rampup_startvalue.value:
-                self.__CH2_rampOffset.value = self.__rampup_startvalue.value
-                self.__CH2_rampFactor.value = (100.0 - self.__CH2_rampOffset.value) / n
-                self.__CH2_ramp.value = self.__rampup_startvalue.value
-                self.__CH2_rampCounter.value += 1
-
-            elif self.__CH2_ramp.value >= 100:
-                self.__CH2_ramp.value = 100
-                self.__CH2_rampCounter.value = 0
-                self.__CH2_rampFlag.value = 0
-
-            else:
-                self.__CH2_rampOffset.value = int(self.__CH2_ramp.value)
-                self.__CH2_rampFactor.value = (100.0 - self.__CH2_rampOffset.value) / n
-                self.__CH2_rampCounter.value += 1
-
-        else:
-            if self.__CH2_ramp.value < self.__rampup_startvalue.value:
-                self.__CH2_ramp.value = self.__rampup_startvalue.value
-                self.__CH2_rampCounter.value = 1
+    # Gives a channel an amplitude envelope instead of the linear ramps, e.g. sigmoid, exponential or shaped like a measured torque
+    # channel .. 0 for CH1 up to 7 for CH8, envelope .. sampled values in [%] of the maximal amplitude of the channel
+    # duration .. time in [ms] the samples are spread over at the stimulation frequency of the current mode (BOOST or not),
+    #             None plays one sample per message
+    # loop .. the envelope is repeated while the channel is active, otherwise the channel stays at its last value
+    # The envelope is resampled once to the current stimulation frequency and starts whenever the channel is activated
+    # None as envelope removes the envelope of the channel
+    # The envelopes are not played by MM_Device_Manager, a builder of a device manager raises a ValueError
+    def setEnvelope(self, channel, envelope, duration=None, loop=False):
 
-            elif self.__CH2_ramp.value >= 100:
-                self.__CH2_ramp.value = 100
-                self.__CH2_rampCounter.value = 0
-                self.__CH2_rampFlag.value = 0
+        if self.__managed:
+            raise ValueError('amplitude envelopes are not supported by MM_Device_Manager')
 
-            else:
-                self.__CH2_ramp.value = (self.__CH2_rampFactor.value * self.__CH2_rampCounter.value) + self.__CH2_rampOffset.value
-                self.__CH2_rampCounter.value += 1
+        if envelope is None:
+            with self.__seqlock:
+                self.__CH_envelopeLength[channel] = 0
+            return
 
-        if self.__CH2_ramp.value >= 100:
-            self.__CH2_rampCounter.value = 0
-            self.__CH2_ramp.value = 100
-            self.__CH2_rampFlag.value = 0
+        envelope = np.clip(np.asarray(envelope, dtype=np.float64), 0, 100)
+        messages = len(envelope)
 
-        return self.__CH2_ramp.value
+        # the messages are sent with the periode of the current mode, rounded to whole milliseconds
+        if duration is not None:
 
-    # Calculation of the individual ramping peaks for upwards ramping of CH3, for exact explanation see CH1
-    def rampUpCH3(self):
+            boost = self.__BOOST_MODE[0] == 1
+            if (self.__F_BOOST[0] if boost else self.__F[0]) == 0:
+                raise ValueError('the stimulation frequency' + (' during BOOST' if boost else '') +
+                                 ' has to be set before an envelope with a duration')
 
-        if self.__CH3_rampCounter.value == 0:
-            n = self.__F.value * self.__CH3_rampup_time.value / 1000.0
-            if self.__CH3_ramp.value < self.__rampup_startvalue.value:
-                self.__CH3_rampOffset.value = self.__rampup_startvalue.value
-                self.__CH3_rampFactor.value = (100.0 - self.__CH3_rampOffset.value) / n
-                self.__CH3_ramp.value = self.__rampup_startvalue.value
-                self.__CH3_rampCounter.value += 1
+            messages = max(int(np.round(duration / float(self.__T_BOOST[0] if boost else self.__T[0]))), 1)
 
-            elif self.__CH3_ramp.value >= 100:
-                self.__CH3_ramp.value = 100
-                self.__CH3_rampCounter.value = 0
-                self.__CH3_rampFlag.value = 0
+        if len(envelope) == 0 or messages > MM_Message_Builder.ENVELOPE_SAMPLES:
+            raise ValueError('an envelope needs 1 to ' + str(MM_Message_Builder.ENVELOPE_SAMPLES) + ' messages, not ' +
+                             str(messages if len(envelope) > 0 else 0))
 
-            else:
-                self.__CH3_rampOffset.value = int(self.__CH3_ramp.value)
-                self.__CH3_rampFactor.value = (100.0 - self.__CH3_rampOffset.value) / n
-                self.__CH3_rampCounter.value += 1
+        samples = np.interp(np.linspace(0, len(envelope) - 1, messages), np.arange(len(envelope)), envelope)
 
-        else:
-            if self.__CH3_ramp.value < self.__rampup_startvalue.value:
-                self.__CH3_ramp.value = self.__rampup_startvalue.value
-                self.__CH3_rampCounter.value = 1
+        # the new envelope is written into the bank which is not in use and then published together with its length
+        with self.__seqlock:
+            bank = 1 - int(self.__CH_envelopeBank[channel])
+            self.__envelopes[bank, channel, :messages] = np.round(samples * 100)
+            self.__CH_envelopeBank[channel] = bank
+            self.__CH_envelopeLength[channel] = messages
+            self.__CH_envelopeLoop[channel] = 1 if loop else 0
+            self.__CH_envelopeEpoch[channel] += 1
 
-            elif self.__CH3_ramp.value >= 100:
-                self.__CH3_ramp.value = 100
-                self.__CH3_rampCounter.value = 0
-                self.__CH3_rampFlag.value = 0
-
-            else:
-                self.__CH3_ramp.value = (self.__CH3_rampFactor.value * self.__CH3_rampCounter.value) + self.__CH3_rampOffset.value
-                self.__CH3_rampCounter.value += 1
+    # Returns the resampled envelope of a channel in [%] with one value per message, None if it has none
+    def getEnvelope(self, channel):
 
-        if self.__CH3_ramp.value >= 100:
-            self.__CH3_rampCounter.value = 0
-            self.__CH3_ramp.value = 100
-            self.__CH3_rampFlag.value = 0
+        length = int(self.__CH_envelopeLength[channel])
+        if length == 0:
+            return None
 
-        return self.__CH3_ramp.value
+        return (self.__envelopes[int(self.__CH_envelopeBank[channel]), channel, :length] / 100.0).tolist()
 
-    # Calculation of the individual ramping peaks for upwards ramping of CH4, for exact explanation see CH1
-    def rampUpCH4(self):
-
-        if self.__CH4_rampCounter.value == 0:
-            n = self.__F.value * self.__CH4_rampup_time.value / 1000.0
-            if self.__CH4_ramp.value < self.__rampup_startvalue.value:
-                self.__CH4_rampOffset.value = self.__rampup_startvalue.value
-                self.__CH4_rampFactor.value = (100.0 - self.__CH4_rampOffset.value) / n
-                self.__CH4_ramp.value = self.__rampup_startvalue.value
-                self.__CH4_rampCounter.value += 1
-
-            elif self.__CH4_ramp.value >= 100:
-                self.__CH4_ramp.value = 100
-                self.__CH4_rampCounter.value = 0
-                self.__CH4_rampFlag.value = 0
-
-            else:
-                self.__CH4_rampOffset.value = int(self.__CH4_ramp.value)
-                self.__CH4_rampFactor.value = (100.0 - self.__CH4_rampOffset.value) / n
-                self.__CH4_rampCounter.value += 1
+    # returns the time for ramping up in [ms]
+    def getRampUpTime(self):
+        return self.__CH_rampup_time.tolist()
 
-        else:
-            if self.__CH4_ramp.value < self.__rampup_startvalue.value:
-                self.__CH4_ramp.value = self.__rampup_startvalue.value
-                self.__CH4_rampCounter.value = 1
+    # returns the time for ramping down in [ms]
+    def getRampDownTime(self):
+        return self.__CH_rampdown_time.tolist()
 
-            elif self.__CH4_ramp.value >= 100:
-                self.__CH4_ramp.value = 100
-                self.__CH4_rampCounter.value = 0
-                self.__CH4_rampFlag.value = 0
+    # returns the starting value for ramping up in [%]
+    def getRampUpStart(self):
+        return int(self.__rampup_startvalue[0])
 
-            else:
-                self.__CH4_ramp.value = (self.__CH4_rampFactor.value * self.__CH4_rampCounter.value) + self.__CH4_rampOffset.value
-                self.__CH4_rampCounter.value += 1
+    # returns the end value for ramping down in [%]
+    def getRampDownEnd(self):
+        return int(self.__rampdown_endvalue[0])
 
-        if self.__CH4_ramp.value >= 100:
-            self.__CH4_rampCounter.value = 0
-            self.__CH4_ramp.value = 100
-            self.__CH4_rampFlag.value = 0
+    # Generates a Pulse-by-Pulse / INIT message with the provided information
+    def getMessage(self):
+        return bytearray(self.getMessageView())
 
-        return self.__CH4_ramp.value
+    # Generates a Pulse-by-Pulse / INIT message without allocating a new buffer
+    # The returned memoryview is only valid until the next call, copy it if it has to be kept
+    def getMessageView(self):
 
-    # Calculation of the individual ramping peaks for upwards ramping of CH5, for exact explanation see CH1
-    def rampUpCH5(self):
+        start = time.perf_counter()
 
-        if self.__CH5_rampCounter.value == 0:
-            n = self.__F.value * self.__CH5_rampup_time.value / 1000.0
-            if self.__CH5_ramp.value < self.__rampup_startvalue.value:
-                self.__CH5_rampOffset.value = self.__rampup_startvalue.value
-                self.__CH5_rampFactor.value = (100.0 - self.__CH5_rampOffset.value) / n
-                self.__CH5_ramp.value = self.__rampup_startvalue.value
-                self.__CH5_rampCounter.value += 1
+        # the stage timings are only taken if the instrumentation is switched on
+        timer = self.__timer if self.__instrumentation else None
+        if timer is not None:
+            timer.start()
 
-            elif self.__CH5_ramp.value >= 100:
-                self.__CH5_ramp.value = 100
-                self.__CH5_rampCounter.value = 0
-                self.__CH5_rampFlag.value = 0
+        # nothing has been set since the last message and no channel is ramping, so the last message is sent again
+        if self.__steady and self.__seqlock.getSequence() == self.__epoch:
 
-            else:
-                self.__CH5_rampOffset.value = int(self.__CH5_ramp.value)
-                self.__CH5_rampFactor.value = (100.0 - self.__CH5_rampOffset.value) / n
-                self.__CH5_rampCounter.value += 1
+            if timer is not None:
+                timer.mark('snapshot')
 
         else:
-            if self.__CH5_ramp.value < self.__rampup_startvalue.value:
-                self.__CH5_ramp.value = self.__rampup_startvalue.value
-                self.__CH5_rampCounter.value = 1
-
-            elif self.__CH5_ramp.value >= 100:
-                self.__CH5_ramp.value = 100
-                self.__CH5_rampCounter.value = 0
-                self.__CH5_rampFlag.value = 0
-
-            else:
-                self.__CH5_ramp.value = (self.__CH5_rampFactor.value * self.__CH5_rampCounter.value) + self.__CH5_rampOffset.value
-                self.__CH5_rampCounter.value += 1
+            # Torn-free copy of all parameters, setters in other processes are never blocked by this
+            self.__epoch = self.__seqlock.read(self.__snapshotBytes)
 
-        if self.__CH5_ramp.value >= 100:
-            self.__CH5_rampCounter.value = 0
-            self.__CH5_ramp.value = 100
-            self.__CH5_rampFlag.value = 0
+            if timer is not None:
+                timer.mark('snapshot')
 
-        return self.__CH5_ramp.value
+            self.__buildMessage(timer)
 
-    # Calculation of the individual ramping peaks for upwards ramping of CH6, for exact explanation see CH1
-    def rampUpCH6(self):
+        # the channel amplitudes are not printed anymore but recorded, MM_Telemetry_Monitor displays them
+        self.__telemetry.write(start, time.perf_counter() - start,
+                               self.__snap_Frame[MM_Message_Builder.POS_AMPLITUDES:MM_Message_Builder.POS_AMPLITUDES + 8],
+                               self.__CH_rampFlag)
 
-        if self.__CH6_rampCounter.value == 0:
-            n = self.__F.value * self.__CH6_rampup_time.value / 1000.0
-            if self.__CH6_ramp.value < self.__rampup_startvalue.value:
-                self.__CH6_rampOffset.value = self.__rampup_startvalue.value
-                self.__CH6_rampFactor.value = (100.0 - self.__CH6_rampOffset.value) / n
-                self.__CH6_ramp.value = self.__rampup_startvalue.value
-                self.__CH6_rampCounter.value += 1
+        if self.__recorder is not None:
+            self.__recorder.append(self.__snap_Frame)
 
-            elif self.__CH6_ramp.value >= 100:
-                self.__CH6_ramp.value = 100
-                self.__CH6_rampCounter.value = 0
-                self.__CH6_rampFlag.value = 0
+        # number of the message, the phase of the prescalers
+        index = int(self.__messageCounter[0])
+        self.__messageCounter[0] = index + 1
 
-            else:
-                self.__CH6_rampOffset.value = int(self.__CH6_ramp.value)
-                self.__CH6_rampFactor.value = (100.0 - self.__CH6_rampOffset.value) / n
-                self.__CH6_rampCounter.value += 1
-
-        else:
-            if self.__CH6_ramp.value < self.__rampup_startvalue.value:
-                self.__CH6_ramp.value = self.__rampup_startvalue.value
-                self.__CH6_rampCounter.value = 1
-
-            elif self.__CH6_ramp.value >= 100:
-                self.__CH6_ramp.value = 100
-                self.__CH6_rampCounter.value = 0
-                self.__CH6_rampFlag.value = 0
-
-            else:
-                self.__CH6_ramp.value = (self.__CH6_rampFactor.value * self.__CH6_rampCounter.value) + self.__CH6_rampOffset.value
-                self.__CH6_rampCounter.value += 1
+        if self.__chargeAccount is not None:
+            self.__chargeAccount.add(self.__snap_Frame, index)
 
-        if self.__CH6_ramp.value >= 100:
-            self.__CH6_rampCounter.value = 0
-            self.__CH6_ramp.value = 100
-            self.__CH6_rampFlag.value = 0
+        if timer is not None:
+            timer.mark('telemetry')
+            timer.finish()
 
-        return self.__CH6_ramp.value
+        return self.__snap_FrameView
 
-    # Calculation of the individual ramping peaks for upwards ramping of CH7, for exact explanation see CH1
-    def rampUpCH7(self):
+    # Returns the number of messages generated by getMessage(), getMessages() or a MM_Device_Manager so far
+    def getMessageCounter(self):
+        return int(self.__messageCounter[0])
 
-        if self.__CH7_rampCounter.value == 0:
-            n = self.__F.value * self.__CH7_rampup_time.value / 1000.0
-            if self.__CH7_ramp.value < self.__rampup_startvalue.value:
-                self.__CH7_rampOffset.value = self.__rampup_startvalue.value
-                self.__CH7_rampFactor.value = (100.0 - self.__CH7_rampOffset.value) / n
-                self.__CH7_ramp.value = self.__rampup_startvalue.value
-                self.__CH7_rampCounter.value += 1
+    # Returns the epoch of the parameters, it changes whenever a parameter is set
+    def getEpoch(self):
+        return self.__seqlock.getSequence()
 
-            elif self.__CH7_ramp.value >= 100:
-                self.__CH7_ramp.value = 100
-                self.__CH7_rampCounter.value = 0
-                self.__CH7_rampFlag.value = 0
+    # Builds the message of the snapshot
+    def __buildMessage(self, timer):
 
-            else:
-                self.__CH7_rampOffset.value = int(self.__CH7_ramp.value)
-                self.__CH7_rampFactor.value = (100.0 - self.__CH7_rampOffset.value) / n
-                self.__CH7_rampCounter.value += 1
+        # the envelopes follow the channel states as they are set, before the ramping keeps channels active
+        envelopes = self.__snap_CH_envelopeLength.any()
+        if envelopes:
+            inputs = self.__snap_Ch_active.copy()
 
-        else:
-            if self.__CH7_ramp.value < self.__rampup_startvalue.value:
-                self.__CH7_ramp.value = self.__rampup_startvalue.value
-                self.__CH7_rampCounter.value = 1
+        # Algorithm to activate Ramping if wanted, 1 means ramping is on, anything else means ramping is off
 
-            elif self.__CH7_ramp.value >= 100:
-                self.__CH7_ramp.value = 100
-                self.__CH7_rampCounter.value = 0
-                self.__CH7_rampFlag.value = 0
+        if self.__snap_rampOnorOff[0] == 1:
 
-            else:
-                self.__CH7_ramp.value = (self.__CH7_rampFactor.value * self.__CH7_rampCounter.value) + self.__CH7_rampOffset.value
-                self.__CH7_rampCounter.value += 1
+            # without any switched or ramping channel the next message only differs if a parameter is set meanwhile
+            self.__steady = not self.__CH_rampFlag.any() and np.array_equal(self.__snap_Ch_active, self.__CH_oldState)
 
-        if self.__CH7_ramp.value >= 100:
-            self.__CH7_rampCounter.value = 0
-            self.__CH7_ramp.value = 100
-            self.__CH7_rampFlag.value = 0
+            # advancing the ramping of all channels at once, channels which are ramping down are kept active meanwhile
+            # the engine already applies the compensation for the MOTIMOVE error
+            amplitudes = self.__rampEngine.step(self.__snap_Ch_active, self.__snap_A_max, int(self.__snap_F[0]),
+                                                self.__snap_CH_rampup_time, self.__snap_CH_rampdown_time,
+                                                int(self.__snap_rampup_startvalue[0]), int(self.__snap_rampdown_endvalue[0]),
+                                                timer, self.__getPreScalers())
 
-        return self.__CH7_ramp.value
+            # patching the compensated ramp values into the message
+            self.__patch(self.__snap_FrameView, MM_Message_Builder.POS_AMPLITUDES, amplitudes)
 
-    # Calculation of the individual ramping peaks for upwards ramping of CH8, for exact explanation see CH1
-    def rampUpCH8(self):
+            if timer is not None:
+                timer.mark('checksum')
 
-        if self.__CH8_rampCounter.value == 0:
-            n = self.__F.value * self.__CH8_rampup_time.value / 1000.0
-            if self.__CH8_ramp.value < self.__rampup_startvalue.value:
-                self.__CH8_rampOffset.value = self.__rampup_startvalue.value
-                self.__CH8_rampFactor.value = (100.0 - self.__CH8_rampOffset.value) / n
-                self.__CH8_ramp.value = self.__rampup_startvalue.value
-                self.__CH8_rampCounter.value += 1
+            # channels which have been reactivated during ramping stay active for the next message
+            changed = self.__snap_Ch_active != self.__CH_newState
+            if changed.any():
+                with self.__seqlock:
+                    self.__Ch_active[changed] = self.__snap_Ch_active[changed]
+                    self.__patchFrame(MM_Message_Builder.POS_AMPLITUDES, self.__getTemplateAmplitudes())
 
-            elif self.__CH8_ramp.value >= 100:
-                self.__CH8_ramp.value = 100
-                self.__CH8_rampCounter.value = 0
-                self.__CH8_rampFlag.value = 0
+            if timer is not None:
+                timer.mark('writeback')
 
-            else:
-                self.__CH8_rampOffset.value = int(self.__CH8_ramp.value)
-                self.__CH8_rampFactor.value = (100.0 - self.__CH8_rampOffset.value) / n
-                self.__CH8_rampCounter.value += 1
 
+        # if no ramping is required the message template already holds the compensated maximal amplitudes of all active channels
         else:
-            if self.__CH8_ramp.value < self.__rampup_startvalue.value:
-                self.__CH8_ramp.value = self.__rampup_startvalue.value
-                self.__CH8_rampCounter.value = 1
-
-            elif self.__CH8_ramp.value >= 100:
-                self.__CH8_ramp.value = 100
-                self.__CH8_rampCounter.value = 0
-                self.__CH8_rampFlag.value = 0
+            self.__steady = True
 
-            else:
-                self.__CH8_ramp.value = (self.__CH8_rampFactor.value * self.__CH8_rampCounter.value) + self.__CH8_rampOffset.value
-                self.__CH8_rampCounter.value += 1
-
-        if self.__CH8_ramp.value >= 100:
-            self.__CH8_rampCounter.value = 0
-            self.__CH8_ramp.value = 100
-            self.__CH8_rampFlag.value = 0
-
-        return self.__CH8_ramp.value
-
-    # Calculation of the individual ramping peaks for downwarding ramping of CH1
-    def rampDownCH1(self):
-
-        if self.__CH1_rampCounter.value == 0:       # if we enter the ramping for the first time, we want to calculate the required startvalue and stepheight for each following ramping pulse
-            n = self.__F.value * self.__CH1_rampdown_time.value / 1000                  # calculate how much ramping steps are needed
-            if self.__CH1_ramp.value >= 100:                                            # checking if the ramping is started from full stimulaiton
-                self.__CH1_rampOffset.value = 100                                       # setting the startvalue
-                self.__CH1_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH1_rampOffset.value) / n    # calculation of the step height
-                self.__CH1_ramp.value = self.__CH1_rampOffset.value                     # setting the current ramp value
-                self.__CH1_rampCounter.value += 1
-                self.__Ch1_active.value = 1                                             # the channel needs to be actively set to 1 to stay active
-                                                                                        # important to deactivate it afterwards, that happens in the function getmessage
-
-            elif self.__CH1_ramp.value < self.__rampdown_endvalue.value:               # if the current value is already below the endvalue, the ramping can be deactivated
-                self.__CH1_ramp.value = 0
-                self.__CH1_rampCounter.value = 0
-                self.__CH1_rampFlag.value = 0
-                self.__Ch1_active.value = 1
-
-            else:       # if the current value is somewhere in between 100 and the endvalue, we want to start from that value, so we need to calculate the starting value and step height from here
-                self.__CH1_rampOffset.value = int(self.__CH1_ramp.value)
-                self.__CH1_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH1_rampOffset.value) / n
-                self.__CH1_rampCounter.value += 1
-                self.__Ch1_active.value = 1
-
-        else:                                                                       # if we enter the ramping any other time than the first one, we want to check if we have exceeded any bounds
-            if self.__CH1_ramp.value > 100:
-                self.__CH1_ramp.value = 100
-                self.__CH1_rampCounter.value = 1
-                self.__Ch1_active.value = 1
-
-            elif self.__CH1_ramp.value < self.__rampdown_endvalue.value:
-                    self.__CH1_ramp.value = self.__rampdown_endvalue.value
-                    self.__CH1_rampCounter.value = 0
-                    self.__CH1_rampFlag.value = 0
-
-            else:                                                                       # if every check has been correct, we want to ramp downwards by calculating the next ramped impulse
-                self.__CH1_ramp.value = (self.__CH1_rampFactor.value * self.__CH1_rampCounter.value) + self.__CH1_rampOffset.value
-                self.__Ch1_active.value = 1
-                self.__CH1_rampCounter.value += 1
-
-        if self.__CH1_ramp.value < self.__rampdown_endvalue.value:                      # when the ramping has reached its endvalue, it has finished and is deactivated
-            self.__CH1_ramp.value = 0
-            self.__CH1_rampCounter.value = 0
-            self.__Ch1_active.value = 0
-            self.__CH1_rampFlag.value = 0
-
-        return self.__CH1_ramp.value
-
-    # Calculation of the individual ramping peaks for downwarding ramping of CH2, for exact explanation see CH1
-    def rampDownCH2(self):
-
-        if self.__CH2_rampCounter.value == 0:
-            n = self.__F.value * self.__CH2_rampdown_time.value / 1000.0
-            if self.__CH2_ramp.value > 100:
-                self.__CH2_rampOffset.value = 100
-                self.__CH2_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH2_rampOffset.value) / n
-                self.__CH2_ramp.value = self.__CH2_rampOffset.value
-                self.__CH2_rampCounter.value += 1
-                self.__Ch2_active.value = 1
-
-            elif self.__CH2_ramp.value <= self.__rampdown_endvalue.value:
-                self.__CH2_ramp.value = int(self.__rampdown_endvalue.value)
-                self.__CH2_rampCounter.value = 0
-                self.__CH2_rampFlag.value = 0
-                self.__Ch2_active.value = 1
-
-            else:
-                self.__CH2_rampOffset.value = int(self.__CH2_ramp.value)
-                self.__CH2_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH2_rampOffset.value) / n
-                self.__CH2_rampCounter.value += 1
-                self.__Ch2_active.value = 1
+        if envelopes:
 
-        else:
-            if self.__CH2_ramp.value > 100:
-                self.__CH2_ramp.value = 100
-                self.__CH2_rampCounter.value = 1
-                self.__Ch2_active.value = 1
+            amplitudes = self.__snap_Frame[MM_Message_Builder.POS_AMPLITUDES:MM_Message_Builder.POS_AMPLITUDES + 8].reshape(1, 8).copy()
+            if self.__applyEnvelopes(amplitudes, inputs.reshape(1, 8)):
+                self.__steady = False
 
-            elif self.__CH2_ramp.value < self.__rampdown_endvalue.value:
-                self.__CH2_ramp.value = self.__rampdown_endvalue.value
-                self.__CH2_rampCounter.value = 0
-                self.__CH2_rampFlag.value = 0
+            self.__patch(self.__snap_FrameView, MM_Message_Builder.POS_AMPLITUDES, amplitudes[0])
 
-            else:
-                self.__CH2_ramp.value = (self.__CH2_rampFactor.value * self.__CH2_rampCounter.value) + self.__CH2_rampOffset.value
-                self.__Ch2_active.value = 1
-                self.__CH2_rampCounter.value += 1
-
-        if self.__CH2_ramp.value < self.__rampdown_endvalue.value:
-            self.__CH2_ramp.value = int(self.__rampdown_endvalue.value)
-            self.__CH2_rampCounter.value = 0
-            self.__Ch2_active.value = 0
-            self.__CH2_rampFlag.value = 0
-
-        return self.__CH2_ramp.value
-
-    # Calculation of the individual ramping peaks for downwarding ramping of CH3, for exact explanation see CH1
-    def rampDownCH3(self):
-
-        if self.__CH3_rampCounter.value == 0:
-            n = self.__F.value * self.__CH3_rampdown_time.value / 1000.0
-            if self.__CH3_ramp.value > 100:
-                self.__CH3_rampOffset.value = 100
-                self.__CH3_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH3_rampOffset.value) / n
-                self.__CH3_ramp.value = self.__CH3_rampOffset.value
-                self.__CH3_rampCounter.value += 1
-                self.__Ch3_active.value = 1
-
-            elif self.__CH3_ramp.value <= self.__rampdown_endvalue.value:
-                self.__CH3_ramp.value = int(self.__rampdown_endvalue.value)
-                self.__CH3_rampCounter.value = 0
-                self.__CH3_rampFlag.value = 0
-                self.__Ch3_active.value = 1
+            if timer is not None:
+                timer.mark('envelopes')
 
-            else:
-                self.__CH3_rampOffset.value = int(self.__CH3_ramp.value)
-                self.__CH3_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH3_rampOffset.value) / n
-                self.__CH3_rampCounter.value += 1
-                self.__Ch3_active.value = 1
+    # Replaces the amplitudes of all channels having an envelope, for consecutive messages at once
+    # amplitudes .. array (messages, 8) which is patched, inputs .. channel states set before each message (messages, 8)
+    # Returns True if an envelope is being played, i.e. the messages keep changing
+    def __applyEnvelopes(self, amplitudes, inputs):
 
-        else:
-            if self.__CH3_ramp.value > 100:
-                self.__CH3_ramp.value = 100
-                self.__CH3_rampCounter.value = 1
-                self.__Ch3_active.value = 1
+        length = self.__snap_CH_envelopeLength
+        enveloped = length > 0
+        position = self.__CH_envelopePosition
 
-            elif self.__CH3_ramp.value < self.__rampdown_endvalue.value:
-                self.__CH3_ramp.value = self.__rampdown_endvalue.value
-                self.__CH3_rampCounter.value = 0
-                self.__CH3_rampFlag.value = 0
+        # a newly set envelope starts from its beginning
+        restarted = self.__snap_CH_envelopeEpoch != self.__CH_envelopeEpochSeen
+        position[restarted] = 0
+        self.__CH_envelopeEpochSeen[restarted] = self.__snap_CH_envelopeEpoch[restarted]
 
-            else:
-                self.__CH3_ramp.value = (self.__CH3_rampFactor.value * self.__CH3_rampCounter.value) + self.__CH3_rampOffset.value
-                self.__Ch3_active.value = 1
-                self.__CH3_rampCounter.value += 1
-
-        if self.__CH3_ramp.value < self.__rampdown_endvalue.value:
-            self.__CH3_ramp.value = int(self.__rampdown_endvalue.value)
-            self.__CH3_rampCounter.value = 0
-            self.__Ch3_active.value = 0
-            self.__CH3_rampFlag.value = 0
-
-        return self.__CH3_ramp.value
-
-    # Calculation of the individual ramping peaks for downwarding ramping of CH4, for exact explanation see CH1
-    def rampDownCH4(self):
-
-        if self.__CH4_rampCounter.value == 0:
-            n = self.__F.value * self.__CH4_rampdown_time.value / 1000.0
-            if self.__CH4_ramp.value > 100:
-                self.__CH4_rampOffset.value = 100
-                self.__CH4_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH4_rampOffset.value) / n
-                self.__CH4_ramp.value = self.__CH4_rampOffset.value
-                self.__CH4_rampCounter.value += 1
-                self.__Ch4_active.value = 1
-
-            elif self.__CH4_ramp.value <= self.__rampdown_endvalue.value:
-                self.__CH4_ramp.value = int(self.__rampdown_endvalue.value)
-                self.__CH4_rampCounter.value = 0
-                self.__CH4_rampFlag.value = 0
-                self.__Ch4_active.value = 1
+        # every message in which a channel is inactive starts its envelope again, the position is counted from there
+        active = inputs != 0
+        t = np.arange(len(inputs))[:, None]
+        inactive = np.maximum.accumulate(np.where(active, -1, t), axis=0)
+        positions = self.__wrapEnvelopes(np.where(inactive < 0, position + t, t - inactive - 1), length)
 
-            else:
-                self.__CH4_rampOffset.value = int(self.__CH4_ramp.value)
-                self.__CH4_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH4_rampOffset.value) / n
-                self.__CH4_rampCounter.value += 1
-                self.__Ch4_active.value = 1
+        samples = self.__envelopes[self.__snap_CH_envelopeBank, np.arange(8), np.maximum(positions, 0)]
+        values = self.__compensation[np.round(self.__snap_A_max * (samples / 10000.0)).astype(np.int64)] * active
+        amplitudes[:, enveloped] = values[:, enveloped]
 
-        else:
-            if self.__CH4_ramp.value > 100:
-                self.__CH4_ramp.value = 100
-                self.__CH4_rampCounter.value = 1
-                self.__Ch4_active.value = 1
+        # position for the next message
+        position[enveloped] = np.where(active[-1], self.__wrapEnvelopes(positions[-1] + 1, length), 0)[enveloped]
 
-            elif self.__CH4_ramp.value < self.__rampdown_endvalue.value:
-                self.__CH4_ramp.value = self.__rampdown_endvalue.value
-                self.__CH4_rampCounter.value = 0
-                self.__CH4_rampFlag.value = 0
+        return bool((active & enveloped).any())
 
-            else:
-                self.__CH4_ramp.value = (self.__CH4_rampFactor.value * self.__CH4_rampCounter.value) + self.__CH4_rampOffset.value
-                self.__Ch4_active.value = 1
-                self.__CH4_rampCounter.value += 1
-
-        if self.__CH4_ramp.value < self.__rampdown_endvalue.value:
-            self.__CH4_ramp.value = int(self.__rampdown_endvalue.value)
-            self.__CH4_rampCounter.value = 0
-            self.__Ch4_active.value = 0
-            self.__CH4_rampFlag.value = 0
-
-        return self.__CH4_ramp.value
-
-    # Calculation of the individual ramping peaks for downwarding ramping of CH5, for exact explanation see CH1
-    def rampDownCH5(self):
-
-        if self.__CH5_rampCounter.value == 0:
-            n = self.__F.value * self.__CH5_rampdown_time.value / 1000.0
-            if self.__CH5_ramp.value > 100:
-                self.__CH5_rampOffset.value = 100
-                self.__CH5_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH5_rampOffset.value) / n
-                self.__CH5_ramp.value = self.__CH5_rampOffset.value
-                self.__CH5_rampCounter.value += 1
-                self.__Ch5_active.value = 1
-
-            elif self.__CH5_ramp.value <= self.__rampdown_endvalue.value:
-                self.__CH5_ramp.value = int(self.__rampdown_endvalue.value)
-                self.__CH5_rampCounter.value = 0
-                self.__CH5_rampFlag.value = 0
-                self.__Ch5_active.value = 1
+    # Repeated envelopes start again after their last message, all others stay at their last message
+    def __wrapEnvelopes(self, positions, length):
+        return np.where(self.__snap_CH_envelopeLoop == 1, positions % np.maximum(length, 1), np.minimum(positions, length - 1))
 
-            else:
-                self.__CH5_rampOffset.value = int(self.__CH5_ramp.value)
-                self.__CH5_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH5_rampOffset.value) / n
-                self.__CH5_rampCounter.value += 1
-                self.__Ch5_active.value = 1
+    # Generates the next Pulse-by-Pulse messages at once, identical to calling getMessage() once per message
+    # activeChannels .. optional boolean array (messages, 8), the channels activated before each message
+    # BOOST_MODE .. optional array (messages), the BOOST Mode set before each message
+    # Afterwards the builder is in the same state as after the individual calls
+    # Returns a uint8 array (messages, MSG_LENGTH)
+    def getMessages(self, messages, activeChannels=None, BOOST_MODE=None):
 
-        else:
-            if self.__CH5_ramp.value > 100:
-                self.__CH5_ramp.value = 100
-                self.__CH5_rampCounter.value = 1
-                self.__Ch5_active.value = 1
+        # the ramping state is advanced here, the next getMessage() must not repeat its last message
+        self.__steady = False
 
-            elif self.__CH5_ramp.value < self.__rampdown_endvalue.value:
-                self.__CH5_ramp.value = self.__rampdown_endvalue.value
-                self.__CH5_rampCounter.value = 0
-                self.__CH5_rampFlag.value = 0
+        self.__seqlock.read(self.__snapshotBytes)
 
-            else:
-                self.__CH5_ramp.value = (self.__CH5_rampFactor.value * self.__CH5_rampCounter.value) + self.__CH5_rampOffset.value
-                self.__Ch5_active.value = 1
-                self.__CH5_rampCounter.value += 1
-
-        if self.__CH5_ramp.value < self.__rampdown_endvalue.value:
-            self.__CH5_ramp.value = int(self.__rampdown_endvalue.value)
-            self.__CH5_rampCounter.value = 0
-            self.__Ch5_active.value = 0
-            self.__CH5_rampFlag.value = 0
-
-        return self.__CH5_ramp.value
-
-    # Calculation of the individual ramping peaks for downwarding ramping of CH6, for exact explanation see CH1
-    def rampDownCH6(self):
-
-        if self.__CH6_rampCounter.value == 0:
-            n = self.__F.value * self.__CH6_rampdown_time.value / 1000.0
-            if self.__CH6_ramp.value > 100:
-                self.__CH6_rampOffset.value = 100
-                self.__CH6_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH6_rampOffset.value) / n
-                self.__CH6_ramp.value = self.__CH6_rampOffset.value
-                self.__CH6_rampCounter.value += 1
-                self.__Ch6_active.value = 1
-
-            elif self.__CH6_ramp.value <= self.__rampdown_endvalue.value:
-                self.__CH6_ramp.value = int(self.__rampdown_endvalue.value)
-                self.__CH6_rampCounter.value = 0
-                self.__CH6_rampFlag.value = 0
-                self.__Ch6_active.value = 1
+        result = np.empty((messages, MM_Message_Builder.MSG_LENGTH), dtype=np.uint8)
+        result[:] = self.__snap_Frame
 
-            else:
-                self.__CH6_rampOffset.value = int(self.__CH6_ramp.value)
-                self.__CH6_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH6_rampOffset.value) / n
-                self.__CH6_rampCounter.value += 1
-                self.__Ch6_active.value = 1
+        schedule = None
+        if activeChannels is not None:
+            schedule = (np.asarray(activeChannels, dtype=bool)[:messages]).astype(np.int32)
 
-        else:
-            if self.__CH6_ramp.value > 100:
-                self.__CH6_ramp.value = 100
-                self.__CH6_rampCounter.value = 1
-                self.__Ch6_active.value = 1
+        active = self.__snap_Ch_active
+        before = active.copy()
 
-            elif self.__CH6_ramp.value < self.__rampdown_endvalue.value:
-                self.__CH6_ramp.value = self.__rampdown_endvalue.value
-                self.__CH6_rampCounter.value = 0
-                self.__CH6_rampFlag.value = 0
+        # channel states set before each message, needed by the envelopes
+        inputs = None
+        if self.__snap_CH_envelopeLength.any() and messages > 0:
+            inputs = np.empty((messages, 8), dtype=np.int32)
 
-            else:
-                self.__CH6_ramp.value = (self.__CH6_rampFactor.value * self.__CH6_rampCounter.value) + self.__CH6_rampOffset.value
-                self.__Ch6_active.value = 1
-                self.__CH6_rampCounter.value += 1
-
-        if self.__CH6_ramp.value < self.__rampdown_endvalue.value:
-            self.__CH6_ramp.value = int(self.__rampdown_endvalue.value)
-            self.__CH6_rampCounter.value = 0
-            self.__Ch6_active.value = 0
-            self.__CH6_rampFlag.value = 0
-
-        return self.__CH6_ramp.value
-
-    # Calculation of the individual ramping peaks for downwarding ramping of CH7, for exact explanation see CH1
-    def rampDownCH7(self):
-
-        if self.__CH7_rampCounter.value == 0:
-            n = self.__F.value * self.__CH7_rampdown_time.value / 1000.0
-            if self.__CH7_ramp.value > 100:
-                self.__CH7_rampOffset.value = 100
-                self.__CH7_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH7_rampOffset.value) / n
-                self.__CH7_ramp.value = self.__CH7_rampOffset.value
-                self.__CH7_rampCounter.value += 1
-                self.__Ch7_active.value = 1
-
-            elif self.__CH7_ramp.value <= self.__rampdown_endvalue.value:
-                self.__CH7_ramp.value = int(self.__rampdown_endvalue.value)
-                self.__CH7_rampCounter.value = 0
-                self.__CH7_rampFlag.value = 0
-                self.__Ch7_active.value = 1
+        amplitudes = slice(MM_Message_Builder.POS_AMPLITUDES, MM_Message_Builder.POS_AMPLITUDES + 8)
+        phasewidths = slice(MM_Message_Builder.POS_PHASEWIDTHS, MM_Message_Builder.POS_PHASEWIDTHS + 8)
 
-            else:
-                self.__CH7_rampOffset.value = int(self.__CH7_ramp.value)
-                self.__CH7_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH7_rampOffset.value) / n
-                self.__CH7_rampCounter.value += 1
-                self.__Ch7_active.value = 1
+        # ramping of all messages, channels which are ramping down are kept active meanwhile
+        if self.__snap_rampOnorOff[0] == 1:
+            result[:, amplitudes] = self.__rampEngine.run(messages, active, self.__snap_A_max, int(self.__snap_F[0]),
+                                                          self.__snap_CH_rampup_time, self.__snap_CH_rampdown_time,
+                                                          int(self.__snap_rampup_startvalue[0]), int(self.__snap_rampdown_endvalue[0]),
+                                                          schedule, inputs, self.__getPreScalers())
 
-        else:
-            if self.__CH7_ramp.value > 100:
-                self.__CH7_ramp.value = 100
-                self.__CH7_rampCounter.value = 1
-                self.__Ch7_active.value = 1
+        elif schedule is not None and messages > 0:
+            result[:, amplitudes] = self.__compensation[self.__snap_A_max] * schedule
+            active[:] = schedule[-1]
+            if inputs is not None:
+                inputs[:] = schedule
 
-            elif self.__CH7_ramp.value < self.__rampdown_endvalue.value:
-                self.__CH7_ramp.value = self.__rampdown_endvalue.value
-                self.__CH7_rampCounter.value = 0
-                self.__CH7_rampFlag.value = 0
+        elif inputs is not None:
+            inputs[:] = before
 
-            else:
-                self.__CH7_ramp.value = (
-                                                    self.__CH7_rampFactor.value * self.__CH7_rampCounter.value) + self.__CH7_rampOffset.value
-                self.__Ch7_active.value = 1
-                self.__CH7_rampCounter.value += 1
-
-        if self.__CH7_ramp.value < self.__rampdown_endvalue.value:
-            self.__CH7_ramp.value = int(self.__rampdown_endvalue.value)
-            self.__CH7_rampCounter.value = 0
-            self.__Ch7_active.value = 0
-            self.__CH7_rampFlag.value = 0
-
-        return self.__CH7_ramp.value
-
-    # Calculation of the individual ramping peaks for downwarding ramping of CH8, for exact explanation see CH1
-    def rampDownCH8(self):
-
-        if self.__CH8_rampCounter.value == 0:
-            n = self.__F.value * self.__CH8_rampdown_time.value / 1000.0
-            if self.__CH8_ramp.value > 100:
-                self.__CH8_rampOffset.value = 100
-                self.__CH8_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH8_rampOffset.value) / n
-                self.__CH8_ramp.value = self.__CH8_rampOffset.value
-                self.__CH8_rampCounter.value += 1
-                self.__Ch8_active.value = 1
-
-            elif self.__CH8_ramp.value <= self.__rampdown_endvalue.value:
-                self.__CH8_ramp.value = int(self.__rampdown_endvalue.value)
-                self.__CH8_rampCounter.value = 0
-                self.__CH8_rampFlag.value = 0
-                self.__Ch8_active.value = 1
+        if inputs is not None:
+            self.__applyEnvelopes(result[:, amplitudes], inputs)
 
-            else:
-                self.__CH8_rampOffset.value = int(self.__CH8_ramp.value)
-                self.__CH8_rampFactor.value = (self.__rampdown_endvalue.value - self.__CH8_rampOffset.value) / n
-                self.__CH8_rampCounter.value += 1
-                self.__Ch8_active.value = 1
+        # Stimulation Periode and Phasewidths of the respective mode
+        if BOOST_MODE is not None:
+            boost = np.clip(np.asarray(BOOST_MODE)[:messages], 0, 1) == 1
+            result[:, MM_Message_Builder.POS_PERIODE] = np.where(boost, self.__snap_T_BOOST[0], self.__snap_T[0])
+            result[:, phasewidths] = np.where(boost[:, None], self.__snap_PhW_BOOST, self.__snap_PhW)
 
-        else:
-            if self.__CH8_ramp.value > 100:
-                self.__CH8_ramp.value = 100
-                self.__CH8_rampCounter.value = 1
-                self.__Ch8_active.value = 1
+        # Checksums of all messages
+        result[:, MM_Message_Builder.POS_CHECKSUM] = result[:, 1:MM_Message_Builder.POS_CHECKSUM].sum(axis=1, dtype=np.int64) & 0x7F
 
-            elif self.__CH8_ramp.value < self.__rampdown_endvalue.value:
-                self.__CH8_ramp.value = self.__rampdown_endvalue.value
-                self.__CH8_rampCounter.value = 0
-                self.__CH8_rampFlag.value = 0
+        # the channel states and the BOOST Mode of the last message stay active
+        if messages > 0:
+            changed = active != before
+            if schedule is not None or changed.any():
+                with self.__seqlock:
+                    self.__Ch_active[:] = active
+                    self.__patchFrame(MM_Message_Builder.POS_AMPLITUDES, self.__getTemplateAmplitudes())
 
-            else:
-                self.__CH8_ramp.value = (
-                                                self.__CH8_rampFactor.value * self.__CH8_rampCounter.value) + self.__CH8_rampOffset.value
-                self.__Ch8_active.value = 1
-                self.__CH8_rampCounter.value += 1
-
-        if self.__CH8_ramp.value < self.__rampdown_endvalue.value:
-            self.__CH8_ramp.value = int(self.__rampdown_endvalue.value)
-            self.__CH8_rampCounter.value = 0
-            self.__Ch8_active.value = 0
-            self.__CH8_rampFlag.value = 0
-
-        return self.__CH8_ramp.value
-
-    # function for determining which channels need to be ramped at the moment
-    def toRamp_or_not_to_Ramp(self, channel):
-
-        if channel == self.CH1:                 # Decision tree for ramping CH1
+            if BOOST_MODE is not None:
+                self.setBOOST_Mode(int(np.asarray(BOOST_MODE)[messages - 1]))
 
-            if (self.__CH1_newState.value == 0 and self.__CH1_oldState.value == 0 and not self.__CH1_rampFlag.value == -1) \
-                    or (self.__CH1_newState.value == 1 and self.__CH1_oldState.value == 1 and not self.__CH1_rampFlag.value == 1) \
-                    or self.__CH1_rampFlag.value == 0:                          # if no change in the state of the channel has occured and it is not already ramping, no ramping is needed
-                self.__CH1_rampFlag.value = self.NO_RAMPING
-
-            # if the channel has been switched on or it is already ramping upwards, we want to ramp upwards
-            if (self.__CH1_newState.value == 1 and self.__CH1_oldState.value == 0) or self.__CH1_rampFlag.value == 1:
-                self.__CH1_rampFlag.value = self.RAMPING_UP
-
-            # if the channel has been switched off or it is already ramping downwards, we want to ramp downwards
-            if (self.__CH1_newState.value == 0 and self.__CH1_oldState.value == 1) or self.__CH1_rampFlag.value == -1:
-                self.__CH1_rampFlag.value = self.RAMPING_DOWN
-
-            if self.__CH1_rampFlag.value == self.NO_RAMPING:                    # when we are not ramping, we want to set the stimulation to either no stimulation or full stimulation
-                if self.__Ch1_active.value == 0:
-                    self.__CH1_ramp.value = 0
-                else:
-                    self.__CH1_ramp.value = 100
-
-            if self.__CH1_rampFlag.value == self.RAMPING_UP:                    # when ramping upwards is active, if it is the first time, the ramping counter is set to start from 0
-                if self.__CH1_newState.value == 1 and self.__CH1_oldState.value == 0:
-                    self.__CH1_rampCounter.value = 0
-                self.rampUpCH1()                                                # the function for ramping up is called
-
-            if self.__CH1_rampFlag.value == self.RAMPING_DOWN:                  # when ramping downwards is active, if it is the first time, the ramping counter is set to start from 0
-                if self.__CH1_newState.value == 0 and self.__CH1_oldState.value == 1:
-                    self.__CH1_rampCounter.value = 0
-                self.rampDownCH1()                                              # the function for ramping up is called
+        index = int(self.__messageCounter[0])
+        self.__messageCounter[0] = index + messages
 
-        if channel == self.CH2:                 # Decision tree for ramping CH2, for exact explanation see CH1
-
-            if (self.__CH2_newState.value == 0 and self.__CH2_oldState.value == 0 and not self.__CH2_rampFlag.value == -1) \
-                    or (self.__CH2_newState.value == 1 and self.__CH2_oldState.value == 1 and not self.__CH2_rampFlag.value == 1) \
-                    or self.__CH2_rampFlag.value == 0:
-                self.__CH2_rampFlag.value = self.NO_RAMPING
-
-            if (self.__CH2_newState.value == 1 and self.__CH2_oldState.value == 0) or self.__CH2_rampFlag.value == 1:
-                self.__CH2_rampFlag.value = self.RAMPING_UP
-
-            if (self.__CH2_newState.value == 0 and self.__CH2_oldState.value == 1) or self.__CH2_rampFlag.value == -1:
-                self.__CH2_rampFlag.value = self.RAMPING_DOWN
-
-            if self.__CH2_rampFlag.value == self.NO_RAMPING:
-                if self.__Ch2_active.value == 0:
-                    self.__CH2_ramp.value = 0
-                else:
-                    self.__CH2_ramp.value = 100
-
-            if self.__CH2_rampFlag.value == self.RAMPING_UP:
-                if self.__CH2_newState.value == 1 and self.__CH2_oldState.value == 0:
-                    self.__CH2_rampCounter.value = 0
-                self.rampUpCH2()
-
-            if self.__CH2_rampFlag.value == self.RAMPING_DOWN:
-                if self.__CH2_newState.value == 0 and self.__CH2_oldState.value == 1:
-                    self.__CH2_rampCounter.value = 0
-                self.rampDownCH2()
-
-        if channel == self.CH3:                 # Decision tree for ramping CH3, for exact explanation see CH1
-
-            if (self.__CH3_newState.value == 0 and self.__CH3_oldState.value == 0 and not self.__CH3_rampFlag.value == -1) \
-                    or (self.__CH3_newState.value == 1 and self.__CH3_oldState.value == 1 and not self.__CH3_rampFlag.value == 1) \
-                    or self.__CH3_rampFlag.value == 0:
-                self.__CH3_rampFlag.value = self.NO_RAMPING
-
-            if (self.__CH3_newState.value == 1 and self.__CH3_oldState.value == 0) or self.__CH3_rampFlag.value == 1:
-                self.__CH3_rampFlag.value = self.RAMPING_UP
-
-            if (self.__CH3_newState.value == 0 and self.__CH3_oldState.value == 1) or self.__CH3_rampFlag.value == -1:
-                self.__CH3_rampFlag.value = self.RAMPING_DOWN
-
-            if self.__CH3_rampFlag.value == self.NO_RAMPING:
-                if self.__Ch3_active.value == 0:
-                    self.__CH3_ramp.value = 0
-                else:
-                    self.__CH3_ramp.value = 100
-
-            if self.__CH3_rampFlag.value == self.RAMPING_UP:
-                if self.__CH3_newState.value == 1 and self.__CH3_oldState.value == 0:
-                    self.__CH3_rampCounter.value = 0
-                self.rampUpCH3()
-
-            if self.__CH3_rampFlag.value == self.RAMPING_DOWN:
-                if self.__CH3_newState.value == 0 and self.__CH3_oldState.value == 1:
-                    self.__CH3_rampCounter.value = 0
-                self.rampDownCH3()
+        if self.__chargeAccount is not None:
+            self.__chargeAccount.addMessages(result, index)
 
-        if channel == self.CH4:                 # Decision tree for ramping CH4, for exact explanation see CH1
-
-            if (self.__CH4_newState.value == 0 and self.__CH4_oldState.value == 0 and not self.__CH4_rampFlag.value == -1) \
-                    or (self.__CH4_newState.value == 1 and self.__CH4_oldState.value == 1 and not self.__CH4_rampFlag.value == 1) \
-                    or self.__CH4_rampFlag.value == 0:
-                self.__CH4_rampFlag.value = self.NO_RAMPING
-
-            if (self.__CH4_newState.value == 1 and self.__CH4_oldState.value == 0) or self.__CH4_rampFlag.value == 1:
-                self.__CH4_rampFlag.value = self.RAMPING_UP
-
-            if (self.__CH4_newState.value == 0 and self.__CH4_oldState.value == 1) or self.__CH4_rampFlag.value == -1:
-                self.__CH4_rampFlag.value = self.RAMPING_DOWN
-
-            if self.__CH4_rampFlag.value == self.NO_RAMPING:
-                if self.__Ch4_active.value == 0:
-                    self.__CH4_ramp.value = 0
-                else:
-                    self.__CH4_ramp.value = 100
-
-            if self.__CH4_rampFlag.value == self.RAMPING_UP:
-                if self.__CH4_newState.value == 1 and self.__CH4_oldState.value == 0:
-                    self.__CH4_rampCounter.value = 0
-                self.rampUpCH4()
-
-            if self.__CH4_rampFlag.value == self.RAMPING_DOWN:
-                if self.__CH4_newState.value == 0 and self.__CH4_oldState.value == 1:
-                    self.__CH4_rampCounter.value = 0
-                self.rampDownCH4()
-
-        if channel == self.CH5:                 # Decision tree for ramping CH5, for exact explanation see CH1
-
-            if (self.__CH5_newState.value == 0 and self.__CH5_oldState.value == 0 and not self.__CH5_rampFlag.value == -1) \
-                    or (self.__CH5_newState.value == 1 and self.__CH5_oldState.value == 1 and not self.__CH5_rampFlag.value == 1) \
-                    or self.__CH5_rampFlag.value == 0:
-                self.__CH5_rampFlag.value = self.NO_RAMPING
-
-            if (self.__CH5_newState.value == 1 and self.__CH5_oldState.value == 0) or self.__CH5_rampFlag.value == 1:
-                self.__CH5_rampFlag.value = self.RAMPING_UP
-
-            if (self.__CH5_newState.value == 0 and self.__CH5_oldState.value == 1) or self.__CH5_rampFlag.value == -1:
-                self.__CH5_rampFlag.value = self.RAMPING_DOWN
-
-            if self.__CH5_rampFlag.value == self.NO_RAMPING:
-                if self.__Ch5_active.value == 0:
-                    self.__CH5_ramp.value = 0
-                else:
-                    self.__CH5_ramp.value = 100
-
-            if self.__CH5_rampFlag.value == self.RAMPING_UP:
-                if self.__CH5_newState.value == 1 and self.__CH5_oldState.value == 0:
-                    self.__CH5_rampCounter.value = 0
-                self.rampUpCH5()
-
-            if self.__CH5_rampFlag.value == self.RAMPING_DOWN:
-                if self.__CH5_newState.value == 0 and self.__CH5_oldState.value == 1:
-                    self.__CH5_rampCounter.value = 0
-                self.rampDownCH5()
-
-        if channel == self.CH6:                 # Decision tree for ramping CH6, for exact explanation see CH1
-
-            if (self.__CH6_newState.value == 0 and self.__CH6_oldState.value == 0 and not self.__CH6_rampFlag.value == -1) \
-                    or (self.__CH6_newState.value == 1 and self.__CH6_oldState.value == 1 and not self.__CH6_rampFlag.value == 1) \
-                    or self.__CH6_rampFlag.value == 0:
-                self.__CH6_rampFlag.value = self.NO_RAMPING
-
-            if (self.__CH6_newState.value == 1 and self.__CH6_oldState.value == 0) or self.__CH6_rampFlag.value == 1:
-                self.__CH6_rampFlag.value = self.RAMPING_UP
-
-            if (self.__CH6_newState.value == 0 and self.__CH6_oldState.value == 1) or self.__CH6_rampFlag.value == -1:
-                self.__CH6_rampFlag.value = self.RAMPING_DOWN
+        return result
 
-            if self.__CH6_rampFlag.value == self.NO_RAMPING:
-                if self.__Ch6_active.value == 0:
-                    self.__CH6_ramp.value = 0
-                else:
-                    self.__CH6_ramp.value = 100
-
-            if self.__CH6_rampFlag.value == self.RAMPING_UP:
-                if self.__CH6_newState.value == 1 and self.__CH6_oldState.value == 0:
-                    self.__CH6_rampCounter.value = 0
-                self.rampUpCH6()
-
-            if self.__CH6_rampFlag.value == self.RAMPING_DOWN:
-                if self.__CH6_newState.value == 0 and self.__CH6_oldState.value == 1:
-                    self.__CH6_rampCounter.value = 0
-                self.rampDownCH6()
-
-        if channel == self.CH7:                 # Decision tree for ramping CH7, for exact explanation see CH1
-
-            if (self.__CH7_newState.value == 0 and self.__CH7_oldState.value == 0 and not self.__CH7_rampFlag.value == -1) \
-                    or (self.__CH7_newState.value == 1 and self.__CH7_oldState.value == 1 and not self.__CH7_rampFlag.value == 1) \
-                    or self.__CH7_rampFlag.value == 0:
-                self.__CH7_rampFlag.value = self.NO_RAMPING
-
-            if (self.__CH7_newState.value == 1 and self.__CH7_oldState.value == 0) or self.__CH7_rampFlag.value == 1:
-                self.__CH7_rampFlag.value = self.RAMPING_UP
-
-            if (self.__CH7_newState.value == 0 and self.__CH7_oldState.value == 1) or self.__CH7_rampFlag.value == -1:
-                self.__CH7_rampFlag.value = self.RAMPING_DOWN
+    # Returns a Start Train Message
+    # Please set the stimulation Parameter first through a Message generated by getMessage()
+    # Also ensure that High Voltage is active
+    def getStartTrainMessage(self):
+        return MM_Message_Builder.__MSG_START_TRAIN
 
-            if self.__CH7_rampFlag.value == self.NO_RAMPING:
-                if self.__Ch7_active.value == 0:
-                    self.__CH7_ramp.value = 0
-                else:
-                    self.__CH7_ramp.value = 100
-
-            if self.__CH7_rampFlag.value == self.RAMPING_UP:
-                if self.__CH7_newState.value == 1 and self.__CH7_oldState.value == 0:
-                    self.__CH7_rampCounter.value = 0
-                self.rampUpCH7()
-
-            if self.__CH7_rampFlag.value == self.RAMPING_DOWN:
-                if self.__CH7_newState.value == 0 and self.__CH7_oldState.value == 1:
-                    self.__CH7_rampCounter.value = 0
-                self.rampDownCH7()
-
-        if channel == self.CH8:                 # Decision tree for ramping CH8, for exact explanation see CH1
-
-            if (self.__CH8_newState.value == 0 and self.__CH8_oldState.value == 0 and not self.__CH8_rampFlag.value == -1) \
-                    or (self.__CH8_newState.value == 1 and self.__CH8_oldState.value == 1 and not self.__CH8_rampFlag.value == 1) \
-                    or self.__CH8_rampFlag.value == 0:
-                self.__CH8_rampFlag.value = self.NO_RAMPING
+    # Returns a Stop Train Message
+    def getStopTrainMessage(self):
+        return MM_Message_Builder.__MSG_STOP_TRAIN
 
-            if (self.__CH8_newState.value == 1 and self.__CH8_oldState.value == 0) or self.__CH8_rampFlag.value == 1:
-                self.__CH8_rampFlag.value = self.RAMPING_UP
-
-            if (self.__CH8_newState.value == 0 and self.__CH8_oldState.value == 1) or self.__CH8_rampFlag.value == -1:
-                self.__CH8_rampFlag.value = self.RAMPING_DOWN
 
-            if self.__CH8_rampFlag.value == self.NO_RAMPING:
-                if self.__Ch8_active.value == 0:
-                    self.__CH8_ramp.value = 0
-                else:
-                    self.__CH8_ramp.value = 100
+    # Returns the amplitudes of the message template, the compensated maximal amplitudes of all active channels
+    # Only the few bytes are handled as Python integers, like in __patch()
+    def __getTemplateAmplitudes(self):
 
-            if self.__CH8_rampFlag.value == self.RAMPING_UP:
-                if self.__CH8_newState.value == 1 and self.__CH8_oldState.value == 0:
-                    self.__CH8_rampCounter.value = 0
-                self.rampUpCH8()
-
-            if self.__CH8_rampFlag.value == self.RAMPING_DOWN:
-                if self.__CH8_newState.value == 0 and self.__CH8_oldState.value == 1:
-                    self.__CH8_rampCounter.value = 0
-                self.rampDownCH8()
+        table = self.__compensationList
+        return [table[A] if active else 0 for A, active in zip(self.__A_max.tolist(), self.__Ch_active.tolist())]
 
-    # Generates a Pulse-by-Pulse / INIT message with the provided information
-    def getMessage(self):
+    # Builds the complete message template from the parameters
+    # Must only be called while no other process can write, e.g. during initialisation
+    def __buildFrame(self):
 
         # Build message
         message = bytearray()
@@ -1538,194 +1202,73 @@ class MM_Message_Builder(object):
         message += MM_Message_Builder.MSG_TYPE_PULSE_BY_PULSE
 
         # Pulse Delay
-        if self.__Pulse_Delay.value == 0:
+        if self.__Pulse_Delay[0] == 0:
             message += MM_Message_Builder.PULSE_DELAY_STD
-        elif self.__Pulse_Delay.value == 1:
-             message += MM_Message_Builder.PULSE_DELAY_OFF
+        else:
+            message += MM_Message_Builder.PULSE_DELAY_OFF
 
         # Stimulation Periode
-        if self.__BOOST_MODE.value == 1:
-            message += self.__T_BOOST.value.to_bytes(1, 'big')
+        if self.__BOOST_MODE[0] == 1:
+            message += int(self.__T_BOOST[0]).to_bytes(1, 'big')
         else:
-            message += self.__T.value.to_bytes(1, 'big')
+            message += int(self.__T[0]).to_bytes(1, 'big')
 
         # Stimulation Intensity
-        message += self.__Intensity.value.to_bytes(1, 'big')
+        message += int(self.__Intensity[0]).to_bytes(1, 'big')
 
-        # Algorithm to activate Ramping if wanted, 1 means ramping is on, anything else means ramping is off
-
-        if self.__rampOnorOff.value == 1:
-
-            # saving the current channel values for comparison to see if they were acitvated or deactivated
-            self.__CH1_newState.value = self.__Ch1_active.value
-            self.__CH2_newState.value = self.__Ch2_active.value
-            self.__CH3_newState.value = self.__Ch3_active.value
-            self.__CH4_newState.value = self.__Ch4_active.value
-            self.__CH5_newState.value = self.__Ch5_active.value
-            self.__CH6_newState.value = self.__Ch6_active.value
-            self.__CH7_newState.value = self.__Ch7_active.value
-            self.__CH8_newState.value = self.__Ch8_active.value
-
-            # activate function to check if ramping is required for every singel channel
-            self.toRamp_or_not_to_Ramp(self.CH1)
-            self.toRamp_or_not_to_Ramp(self.CH2)
-            self.toRamp_or_not_to_Ramp(self.CH3)
-            self.toRamp_or_not_to_Ramp(self.CH4)
-            self.toRamp_or_not_to_Ramp(self.CH5)
-            self.toRamp_or_not_to_Ramp(self.CH6)
-            self.toRamp_or_not_to_Ramp(self.CH7)
-            self.toRamp_or_not_to_Ramp(self.CH8)
-
-            # calculate the ramping value by multiplying the ramp factor with the maximum amplitude
-            rampmessage_CH1 = int(round((self.__A1_max.value * (self.__CH1_ramp.value / 100.0))) * self.__Ch1_active.value)
-            rampmessage_CH2 = int(round((self.__A2_max.value * (self.__CH2_ramp.value / 100.0))) * self.__Ch2_active.value)
-            rampmessage_CH3 = int(round((self.__A3_max.value * (self.__CH3_ramp.value / 100.0))) * self.__Ch3_active.value)
-            rampmessage_CH4 = int(round((self.__A4_max.value * (self.__CH4_ramp.value / 100.0))) * self.__Ch4_active.value)
-            rampmessage_CH5 = int(round((self.__A5_max.value * (self.__CH5_ramp.value / 100.0))) * self.__Ch5_active.value)
-            rampmessage_CH6 = int(round((self.__A6_max.value * (self.__CH6_ramp.value / 100.0))) * self.__Ch6_active.value)
-            rampmessage_CH7 = int(round((self.__A7_max.value * (self.__CH7_ramp.value / 100.0))) * self.__Ch7_active.value)
-            rampmessage_CH8 = int(round((self.__A8_max.value * (self.__CH8_ramp.value / 100.0))) * self.__Ch8_active.value)
-
-            # compensation for MOTIMOVE error through comparison with array of compensation values
-            rampmessage_CH1 = self.AVAL_COMPENSATION[rampmessage_CH1]
-            rampmessage_CH2 = self.AVAL_COMPENSATION[rampmessage_CH2]
-            rampmessage_CH3 = self.AVAL_COMPENSATION[rampmessage_CH3]
-            rampmessage_CH4 = self.AVAL_COMPENSATION[rampmessage_CH4]
-            rampmessage_CH5 = self.AVAL_COMPENSATION[rampmessage_CH5]
-            rampmessage_CH6 = self.AVAL_COMPENSATION[rampmessage_CH6]
-            rampmessage_CH7 = self.AVAL_COMPENSATION[rampmessage_CH7]
-            rampmessage_CH8 = self.AVAL_COMPENSATION[rampmessage_CH8]
-
-            # addition of compensated ramp value to the message
-            message += (rampmessage_CH1).to_bytes(1, 'big')
-            message += (rampmessage_CH2).to_bytes(1, 'big')
-            message += (rampmessage_CH3).to_bytes(1, 'big')
-            message += (rampmessage_CH4).to_bytes(1, 'big')
-            message += (rampmessage_CH5).to_bytes(1, 'big')
-            message += (rampmessage_CH6).to_bytes(1, 'big')
-            message += (rampmessage_CH7).to_bytes(1, 'big')
-            message += (rampmessage_CH8).to_bytes(1, 'big')
-
-            # printing of channel amplitude just for checking while working on it, can later be removed
-            if not rampmessage_CH1 == 0:
-                print("Stim CH1: " + str(rampmessage_CH1) + "%")
-            if not rampmessage_CH2 == 0:
-                print("Stim CH2: " + str(rampmessage_CH2) + "%")
-            if not rampmessage_CH3 == 0:
-                print("Stim CH3: " + str(rampmessage_CH3) + "%")
-            if not rampmessage_CH4 == 0:
-                print("Stim CH4: " + str(rampmessage_CH4) + "%")
-            if not rampmessage_CH5 == 0:
-                print("Stim CH5: " + str(rampmessage_CH5) + "%")
-            if not rampmessage_CH6 == 0:
-                print("Stim CH6: " + str(rampmessage_CH6) + "%")
-            if not rampmessage_CH7 == 0:
-                print("Stim CH7: " + str(rampmessage_CH7) + "%")
-            if not rampmessage_CH8 == 0:
-                print("Stim CH8: " + str(rampmessage_CH8) + "%")
-
-            # while ramping down the channel active value needs to be on longer than normally, but to get an accurate comparison it needs to be reset now
-            if self.__CH1_rampFlag.value == self.RAMPING_DOWN:
-                self.__Ch1_active.value = 0
-            if self.__CH2_rampFlag.value == self.RAMPING_DOWN:
-                self.__Ch2_active.value = 0
-            if self.__CH3_rampFlag.value == self.RAMPING_DOWN:
-                self.__Ch3_active.value = 0
-            if self.__CH4_rampFlag.value == self.RAMPING_DOWN:
-                self.__Ch4_active.value = 0
-            if self.__CH5_rampFlag.value == self.RAMPING_DOWN:
-                self.__Ch5_active.value = 0
-            if self.__CH6_rampFlag.value == self.RAMPING_DOWN:
-                self.__Ch6_active.value = 0
-            if self.__CH7_rampFlag.value == self.RAMPING_DOWN:
-                self.__Ch7_active.value = 0
-            if self.__CH8_rampFlag.value == self.RAMPING_DOWN:
-                self.__Ch8_active.value = 0
-
-            # saving of the current channel values for later comparison in next message
-            self.__CH1_oldState.value = self.__CH1_newState.value
-            self.__CH2_oldState.value = self.__CH2_newState.value
-            self.__CH3_oldState.value = self.__CH3_newState.value
-            self.__CH4_oldState.value = self.__CH4_newState.value
-            self.__CH5_oldState.value = self.__CH5_newState.value
-            self.__CH6_oldState.value = self.__CH6_newState.value
-            self.__CH7_oldState.value = self.__CH7_newState.value
-            self.__CH8_oldState.value = self.__CH8_newState.value
-
-        # if no ramping is required a normal message is built
-        else:
-            message += (self.__A1_max.value * self.__Ch1_active.value).to_bytes(1, 'big')
-            message += (self.__A2_max.value * self.__Ch2_active.value).to_bytes(1, 'big')
-            message += (self.__A3_max.value * self.__Ch3_active.value).to_bytes(1, 'big')
-            message += (self.__A4_max.value * self.__Ch4_active.value).to_bytes(1, 'big')
-            message += (self.__A5_max.value * self.__Ch5_active.value).to_bytes(1, 'big')
-            message += (self.__A6_max.value * self.__Ch6_active.value).to_bytes(1, 'big')
-            message += (self.__A7_max.value * self.__Ch7_active.value).to_bytes(1, 'big')
-            message += (self.__A8_max.value * self.__Ch8_active.value).to_bytes(1, 'big')
+        # Stimulation Amplitudes
+        message += bytes(self.__getTemplateAmplitudes())
 
         # Phasewidths
-        if self.__BOOST_MODE.value == 1:
-            message += self.__PhW1_BOOST.value.to_bytes(1, 'big')
-            message += self.__PhW2_BOOST.value.to_bytes(1, 'big')
-            message += self.__PhW3_BOOST.value.to_bytes(1, 'big')
-            message += self.__PhW4_BOOST.value.to_bytes(1, 'big')
-            message += self.__PhW5_BOOST.value.to_bytes(1, 'big')
-            message += self.__PhW6_BOOST.value.to_bytes(1, 'big')
-            message += self.__PhW7_BOOST.value.to_bytes(1, 'big')
-            message += self.__PhW8_BOOST.value.to_bytes(1, 'big')
+        if self.__BOOST_MODE[0] == 1:
+            message += bytes(self.__PhW_BOOST.tolist())
         else:
-            message += self.__PhW1.value.to_bytes(1, 'big')
-            message += self.__PhW2.value.to_bytes(1, 'big')
-            message += self.__PhW3.value.to_bytes(1, 'big')
-            message += self.__PhW4.value.to_bytes(1, 'big')
-            message += self.__PhW5.value.to_bytes(1, 'big')
-            message += self.__PhW6.value.to_bytes(1, 'big')
-            message += self.__PhW7.value.to_bytes(1, 'big')
-            message += self.__PhW8.value.to_bytes(1, 'big')
+            message += bytes(self.__PhW.tolist())
 
         # PreScalers
-        message += self.__Ch1_PreScaler.value.to_bytes(1, 'big')
-        message += self.__Ch2_PreScaler.value.to_bytes(1, 'big')
-        message += self.__Ch3_PreScaler.value.to_bytes(1, 'big')
-        message += self.__Ch4_PreScaler.value.to_bytes(1, 'big')
-        message += self.__Ch5_PreScaler.value.to_bytes(1, 'big')
-        message += self.__Ch6_PreScaler.value.to_bytes(1, 'big')
-        message += self.__Ch7_PreScaler.value.to_bytes(1, 'big')
-        message += self.__Ch8_PreScaler.value.to_bytes(1, 'big')
+        message += bytes(self.__Ch_PreScaler.tolist())
 
         # Doublets
-        message += self.__Doublet_Flag.value.to_bytes(1, 'big')
+        message += int(self.__Doublet_Flag[0]).to_bytes(1, 'big')
 
         # Doublet ISI
-        message += self.__Doublet_ISI.value.to_bytes(1, 'big')
+        message += int(self.__Doublet_ISI[0]).to_bytes(1, 'big')
 
         # Sensor Input
-        if self.__Sensor_Input.value == 0:
+        if self.__Sensor_Input[0] == 0:
             message += MM_Message_Builder.SENSOR_AI
-        elif self.__Sensor_Input.value == 1:
+        elif self.__Sensor_Input[0] == 1:
             message += MM_Message_Builder.SENSOR_S1
         else:
             message += MM_Message_Builder.SENSOR_S2
 
         # High Voltage
-        message += self.__High_Voltage.value.to_bytes(1, 'big')
+        message += int(self.__High_Voltage[0]).to_bytes(1, 'big')
 
         # Checksum
         message = self.__addCheckSum(message)
 
-        return message
+        self.__Frame[:] = message
 
+    # Writes new values into the message template, must only be called while holding the seqlock
+    def __patchFrame(self, position, values):
+        self.__patch(self.__FrameView, position, values)
 
-    # Returns a Start Train Message
-    # Please set the stimulation Parameter first through a Message generated by getMessage()
-    # Also ensure that High Voltage is active
-    def getStartTrainMessage(self):
-        return MM_Message_Builder.__MSG_START_TRAIN
+    # Writes new values (list or array of 0 - 255) into a message (memoryview of a uint8 array) and updates the checksum
+    # by the difference instead of recalculating it
+    @staticmethod
+    def __patch(message, position, values):
 
-    # Returns a Stop Train Message
-    def getStopTrainMessage(self):
-        return MM_Message_Builder.__MSG_STOP_TRAIN
+        # the few bytes are handled as Python integers, much faster than through NumPy for 1 - 8 elements
+        if isinstance(values, np.ndarray):
+            values = values.tolist()
+
+        end = position + len(values)
+
+        old = sum(message[position:end])
+        message[position:end] = bytes(values)
 
+        message[MM_Message_Builder.POS_CHECKSUM] = (message[MM_Message_Builder.POS_CHECKSUM] + sum(values) - old) & 0x7F
 
     # Calculates and appends the Checksum
     def __addCheckSum(self, message):
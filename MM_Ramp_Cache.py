@@ -0,0 +1,245 @@
+## Ramp Trajectory Cache for the MOTIMOVE 8 Control Interface
+## Precomputes complete ramps (ramp values, states and compensated amplitudes) once per parameter combination,
+## so that every message during a ramp becomes a table lookup
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+class MM_Ramp_Cache(object):
+
+    RAMPING_UP = 1
+    RAMPING_DOWN = -1
+
+    # compensation .. lookup table applied to the amplitudes in [mA], e.g. MM_Message_Builder.AVAL_COMPENSATION
+    # size .. number of trajectories kept, the least recently used one is replaced
+    # steps .. length of a trajectory in messages the cache is allocated for, it grows for longer ramps
+    # maxSteps .. maximal length of a trajectory in messages, longer ramps are not cached
+    def __init__(self, compensation, size=16, steps=512, maxSteps=65536):
+
+        self.__compensation = np.asarray(compensation)
+        self.__size = size
+        self.__steps = steps
+        self.__maxSteps = maxSteps
+
+        # one row per trajectory
+        self.__ramp = np.zeros((size, steps), dtype=np.float32)
+        self.__counter = np.zeros((size, steps), dtype=np.int32)
+        self.__flag = np.zeros((size, steps), dtype=np.int8)
+        self.__active = np.zeros((size, steps), dtype=np.int8)
+        self.__amplitude = np.zeros((size, steps), dtype=np.uint8)
+        self.__factor = np.zeros(size, dtype=np.float32)
+        self.__offset = np.zeros(size, dtype=np.float32)
+        self.__length = np.zeros(size, dtype=np.int64)
+
+        # increased whenever a row is replaced, so that users of the old trajectory can notice it
+        self.__generation = np.zeros(size, dtype=np.int64)
+
+        self.__rows = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    # Returns (row, generation) of the trajectory for a ramp starting now, or (-1, 0) if the ramp can not be cached
+    # direction .. RAMPING_UP or RAMPING_DOWN, n .. number of ramping steps (F * ramp time / 1000)
+    # value .. starting value for ramping up or end value for ramping down in [%]
+    # A_max .. maximal amplitude in [mA], ramp .. current ramp value in [%]
+    # toZero .. the channel finishes ramping down at 0 instead of the end value
+    def getTrajectory(self, direction, n, value, A_max, ramp, toZero):
+
+        ramp = np.float32(ramp)
+
+        # ramps starting below the starting value all start at the starting value, the current value doesn't matter then
+        if direction == MM_Ramp_Cache.RAMPING_UP:
+            start = 'start' if ramp < value else float(ramp)
+            key = (direction, float(n), int(value), int(A_max), start)
+        else:
+            start = 'full' if (ramp >= 100 if toZero else ramp > 100) else float(ramp)
+            key = (direction, float(n), int(value), int(A_max), start, bool(toZero))
+
+        row = self.__rows.get(key)
+
+        if row is not None:
+            self.__rows.move_to_end(key)
+            self.__hits += 1
+            return row, int(self.__generation[row])
+
+        self.__misses += 1
+
+        if direction == MM_Ramp_Cache.RAMPING_UP:
+            trajectory = self.__buildRampUp(n, value, A_max, ramp)
+        else:
+            trajectory = self.__buildRampDown(n, value, A_max, ramp, toZero)
+
+        if trajectory is None:
+            return -1, 0
+
+        # reuse the least recently used row once the cache is full
+        if len(self.__rows) < self.__size:
+            row = len(self.__rows)
+        else:
+            row = self.__rows.popitem(last=False)[1]
+
+        ramps, counter, flag, active, factor, offset = trajectory
+        length = len(ramps)
+
+        if length > self.__steps:
+            self.__grow(length)
+
+        self.__ramp[row, :length] = ramps
+        self.__counter[row, :length] = counter
+        self.__flag[row, :length] = flag
+        self.__active[row, :length] = active
+        self.__amplitude[row, :length] = self.__compensation[np.round(int(A_max) * (ramps.astype(np.float64) / 100.0)).astype(np.int64) * active]
+        self.__factor[row] = factor
+        self.__offset[row] = offset
+        self.__length[row] = length
+        self.__generation[row] += 1
+
+        self.__rows[key] = row
+
+        return row, int(self.__generation[row])
+
+    # Returns the ramp states of the given rows and positions:
+    # ramp, counter, flag, active and compensated amplitude of the message, factor and offset of the ramp
+    def lookup(self, rows, positions):
+        return (self.__ramp[rows, positions], self.__counter[rows, positions], self.__flag[rows, positions],
+                self.__active[rows, positions], self.__amplitude[rows, positions], self.__factor[rows], self.__offset[rows])
+
+    # Returns the compensated amplitudes of the given rows for the next messages, array (rows, messages)
+    def getAmplitudes(self, rows, positions, messages):
+        return self.__amplitude[rows[:, None], positions[:, None] + np.arange(messages)]
+
+    # Returns the ramp values, counters and compensated amplitudes of the given rows for the next messages, arrays (rows, messages)
+    def getStates(self, rows, positions, messages):
+
+        index = (rows[:, None], positions[:, None] + np.arange(messages))
+        return self.__ramp[index], self.__counter[index], self.__amplitude[index]
+
+    # Returns the lengths of the trajectories in the given rows in [messages]
+    def getLengths(self, rows):
+        return self.__length[rows]
+
+    # Returns the current generations of the given rows
+    def getGenerations(self, rows):
+        return self.__generation[rows]
+
+    # Returns the number of cache hits and misses
+    def getStatistics(self):
+        return {'hits': self.__hits, 'misses': self.__misses, 'trajectories': len(self.__rows)}
+
+    # Widens all rows to at least the given number of messages, the trajectories are kept
+    def __grow(self, steps):
+
+        steps = min(max(steps, 2 * self.__steps), self.__maxSteps)
+
+        for name in ['ramp', 'counter', 'flag', 'active', 'amplitude']:
+            old = getattr(self, '_MM_Ramp_Cache__' + name)
+            new = np.zeros((self.__size, steps), dtype=old.dtype)
+            new[:, :self.__steps] = old
+            setattr(self, '_MM_Ramp_Cache__' + name, new)
+
+        self.__steps = steps
+
+    # Ramp values of consecutive messages, same calculation as MM_Ramp_Engine
+    # n .. number of ramping steps, the ramp ends after about n messages
+    def __calculate(self, first, factor, offset, n):
+
+        steps = min(self.__maxSteps, int(np.ceil(n)) + 3)
+
+        ramps = np.empty(steps, dtype=np.float32)
+        ramps[0] = first
+        ramps[1:] = np.float64(factor) * np.arange(1, steps) + np.float64(offset)
+
+        return ramps
+
+    # Trajectory of upwards ramping, same calculation as MM_Ramp_Engine
+    def __buildRampUp(self, n, start, A_max, ramp):
+
+        if n == 0:
+            return None
+
+        # starting below the starting value -> starting at the starting value
+        if ramp < start:
+            offset = np.float32(start)
+            first = np.float32(start)
+
+        # starting at 100% already, the ramp ends immediately
+        elif ramp >= 100:
+            return None
+
+        # starting from the current value
+        else:
+            offset = np.float32(np.trunc(ramp))
+            first = ramp
+
+        factor = np.float32((100.0 - np.float64(offset)) / n)
+
+        ramps = self.__calculate(first, factor, offset, n)
+        finished = np.flatnonzero(ramps >= 100)
+
+        # rounding may need a few more steps
+        if len(finished) == 0:
+            ramps = self.__calculate(first, factor, offset, 2 * n + 16)
+            finished = np.flatnonzero(ramps >= 100)
+
+        if len(finished) == 0:
+            return None
+
+        length = finished[0] + 1
+        ramps = ramps[:length]
+        ramps[-1] = 100
+
+        counter = np.arange(1, length + 1, dtype=np.int32)
+        counter[-1] = 0
+        flag = np.full(length, MM_Ramp_Cache.RAMPING_UP, dtype=np.int8)
+        flag[-1] = 0
+        active = np.ones(length, dtype=np.int8)
+
+        return ramps, counter, flag, active, factor, offset
+
+    # Trajectory of downwards ramping, same calculation as MM_Ramp_Engine
+    def __buildRampDown(self, n, end, A_max, ramp, toZero):
+
+        if n == 0:
+            return None
+
+        # starting from full stimulation
+        if (ramp >= 100 if toZero else ramp > 100):
+            offset = np.float32(100)
+            first = np.float32(100)
+
+        # already below the end value, the ramp ends immediately
+        elif (ramp < end if toZero else ramp <= end):
+            return None
+
+        # starting from the current value
+        else:
+            offset = np.float32(np.trunc(ramp))
+            first = ramp
+
+        factor = np.float32((end - np.float64(offset)) / n)
+
+        ramps = self.__calculate(first, factor, offset, n)
+        finished = np.flatnonzero(ramps < end)
+
+        # rounding may need a few more steps
+        if len(finished) == 0:
+            ramps = self.__calculate(first, factor, offset, 2 * n + 16)
+            finished = np.flatnonzero(ramps < end)
+
+        if len(finished) == 0:
+            return None
+
+        length = finished[0] + 1
+        ramps = ramps[:length]
+        ramps[-1] = 0 if toZero else end
+
+        counter = np.arange(1, length + 1, dtype=np.int32)
+        counter[-1] = 0
+        flag = np.full(length, MM_Ramp_Cache.RAMPING_DOWN, dtype=np.int8)
+        flag[-1] = 0
+        active = np.ones(length, dtype=np.int8)
+        active[-1] = 0
+
+        return ramps, counter, flag, active, factor, offset
@@ -0,0 +1,625 @@
+## Ramp Engine for the MOTIMOVE 8 Control Interface
+## Advances the ramping of all channels in one vectorized step, for any number of channels
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+class MM_Ramp_Engine(object):
+
+    RAMPING_UP = 1
+    RAMPING_DOWN = -1
+    NO_RAMPING = 0
+
+    # Number of messages of the trajectories prepared at once while no channel is switched, see __prepareAhead()
+    AHEAD = 64
+
+    # Number of switch messages remembered with the states they lead to, see __rememberSwitch()
+    SWITCHES = 16
+
+    # The engine works directly on the given state arrays (e.g. views of a shared state block), one element per channel
+    # ramp, rampFactor, rampOffset .. float32, rampCounter, rampFlag, oldState, newState .. int32
+    # rampDownToZero .. bool array, channels which finish ramping down at 0 instead of the end value (original behaviour of CH1)
+    # compensation .. optional lookup table applied to the amplitudes, e.g. MM_Message_Builder.AVAL_COMPENSATION
+    # cache .. optional MM_Ramp_Cache, ramps are then looked up instead of calculated (needs the same compensation)
+    def __init__(self, ramp, rampCounter, rampFactor, rampOffset, rampFlag, oldState, newState, rampDownToZero,
+                 compensation=None, cache=None):
+
+        self.__ramp = ramp
+        self.__rampCounter = rampCounter
+        self.__rampFactor = rampFactor
+        self.__rampOffset = rampOffset
+        self.__rampFlag = rampFlag
+        self.__oldState = oldState
+        self.__newState = newState
+        self.__rampDownToZero = np.asarray(rampDownToZero, dtype=bool)
+        self.__compensation = None if compensation is None else np.asarray(compensation)
+        self.__cache = cache
+
+        # trajectory followed by each channel, -1 means the channel is calculated
+        # the arrays are the rows of one table, so that they can be remembered and restored at once
+        channels = len(ramp)
+        self.__trajectories = np.zeros((8, channels), dtype=np.int64)
+        (self.__row, self.__generation, self.__position, self.__direction, self.__counterValue, self.__keyValue,
+         self.__keyA_max, self.__cachedAmplitudes) = self.__trajectories
+        self.__row[:] = -1
+
+        # parameters the followed trajectories have last been checked against, see __getTrajectoryKey()
+        self.__trajectoryKey = None
+
+        # states of the next messages while all ramping channels follow their trajectories, see __prepareAhead()
+        self.__aheadNext = 0
+        self.__aheadCount = 0
+
+        # states after the last switch messages, the least recently used one is dropped, see __rememberSwitch()
+        self.__switches = OrderedDict()
+
+    # Returns the number of channels handled by the engine
+    def getChannels(self):
+        return len(self.__ramp)
+
+    # Calculates the ramp values of the next message for all channels
+    # active is updated in place: channels which are ramping down stay active until the ramp has finished
+    # All other parameters may be scalars or arrays with one element per channel
+    # timer .. optional MM_Stage_Timer, the stages rampStates, rampCache, rampCalculation, amplitudes and compensation are marked
+    # prescaler .. optional frequency prescaler per channel, a channel then only stimulates every prescaler-th message and
+    #              its ramps last a whole number of its pulses, see __getSteps()
+    # Returns the stimulation amplitudes in [mA], compensated if the engine has a compensation table
+    def step(self, active, A_max, F, rampup_time, rampdown_time, rampup_startvalue, rampdown_endvalue, timer=None, prescaler=None):
+
+        channels = len(self.__ramp)
+        new = self.__newState
+        old = self.__oldState
+        flag = self.__rampFlag
+
+        # saving the current channel values for comparison to see if they were activated or deactivated
+        new[:] = active
+
+        switched = not np.array_equal(new, old)
+
+        # no channel has been switched and the prepared messages of the trajectories are still valid, they are just copied
+        if self.__aheadNext < self.__aheadCount:
+
+            key = self.__getTrajectoryKey(A_max, rampup_startvalue, rampdown_endvalue)
+            if key == self.__trajectoryKey and not switched and \
+                    self.__rampCounter.tobytes() == self.__aheadCounter[self.__aheadNext - 1].tobytes():
+                if timer is not None:
+                    timer.mark('rampCache')
+                return self.__stepAhead()
+
+            self.__aheadCount = 0
+
+        # no channel has been switched and none is ramping, so every channel is either off or at full stimulation
+        if not flag.any() and not switched:
+            self.__ramp[:] = np.where(active == 0, 0, 100)
+            if timer is not None:
+                timer.mark('rampStates')
+            return self.__calculateAmplitudes(A_max, active, timer)
+
+        # no channel has been switched and every ramping channel just continues its trajectory, that's one table lookup
+        if self.__cache is not None and not switched:
+            amplitudes = self.__continueTrajectories(active, A_max, rampup_startvalue, rampdown_endvalue)
+            if amplitudes is not None:
+                if timer is not None:
+                    timer.mark('rampCache')
+                return amplitudes
+
+        # the same switch from the same states and with the same parameters has been calculated before, e.g. channels
+        # switched in a fixed cycle, its result is just restored
+        switch = None
+        if self.__cache is not None and switched:
+            switch = self.__getSwitchKey(A_max, F, rampup_time, rampdown_time, rampup_startvalue, rampdown_endvalue, prescaler)
+            amplitudes = self.__recallSwitch(switch, active)
+            if amplitudes is not None:
+                if timer is not None:
+                    timer.mark('rampCache')
+                return amplitudes
+
+        switchedOn = (new == 1) & (old == 0)
+        switchedOff = (new == 0) & (old == 1)
+
+        # if no change in the state of the channel has occured and it is not already ramping, no ramping is needed
+        flag[((new == 0) & (old == 0) & (flag != -1)) | ((new == 1) & (old == 1) & (flag != 1)) | (flag == 0)] = self.NO_RAMPING
+
+        # if the channel has been switched on or it is already ramping upwards, we want to ramp upwards
+        flag[switchedOn | (flag == 1)] = self.RAMPING_UP
+
+        # if the channel has been switched off or it is already ramping downwards, we want to ramp downwards
+        flag[switchedOff | (flag == -1)] = self.RAMPING_DOWN
+
+        # when we are not ramping, we want to set the stimulation to either no stimulation or full stimulation
+        idle = flag == self.NO_RAMPING
+        self.__ramp[idle] = np.where(active[idle] == 0, 0, 100)
+
+        # when ramping is active and it is the first time, the ramping counter is set to start from 0
+        up = flag == self.RAMPING_UP
+        down = flag == self.RAMPING_DOWN
+        self.__rampCounter[up & switchedOn] = 0
+        self.__rampCounter[down & switchedOff] = 0
+
+        if timer is not None:
+            timer.mark('rampStates')
+
+        # channels following a precomputed trajectory are not calculated
+        cached = None
+        if self.__cache is not None and (up | down).any():
+            cached = self.__followTrajectories(up, down, switchedOn | switchedOff, active, A_max, F, rampup_time, rampdown_time,
+                                               rampup_startvalue, rampdown_endvalue, prescaler)
+            up &= ~cached
+            down &= ~cached
+
+        if timer is not None:
+            timer.mark('rampCache')
+
+        if up.any():
+            self.__rampUp(up, self.__getSteps(F, rampup_time, prescaler), np.zeros(channels, dtype=np.int64) + rampup_startvalue)
+
+        if down.any():
+            self.__rampDown(down, active, self.__getSteps(F, rampdown_time, prescaler),
+                            np.zeros(channels, dtype=np.int64) + rampdown_endvalue)
+
+        if timer is not None:
+            timer.mark('rampCalculation')
+
+        # the amplitudes of channels following a trajectory are taken from the cache
+        if cached is not None and cached.all():
+            amplitudes = self.__cachedAmplitudes.copy()
+        else:
+            amplitudes = self.__calculateAmplitudes(A_max, active, timer)
+            if cached is not None:
+                amplitudes[cached] = self.__cachedAmplitudes[cached]
+
+        # while ramping down the channel active value needs to be on longer than normally, but to get an accurate comparison it needs to be reset now
+        active[flag == self.RAMPING_DOWN] = 0
+
+        # saving of the current channel values for later comparison in next message
+        old[:] = new
+
+        if switch is not None:
+            self.__rememberSwitch(switch, active, amplitudes)
+
+        return amplitudes
+
+    # Calculates the amplitudes of consecutive messages, exactly like calling step() once per message
+    # active is the channel state before the first message and is updated in place from message to message
+    # schedule .. optional array (messages, channels), the channel states set before each message
+    # inputs .. optional array (messages, channels), receives the channel states each message has been calculated from
+    # prescaler .. optional frequency prescaler per channel, see step()
+    # Returns an array (messages, channels) of the stimulation amplitudes
+    def run(self, messages, active, A_max, F, rampup_time, rampdown_time, rampup_startvalue, rampdown_endvalue, schedule=None,
+            inputs=None, prescaler=None):
+
+        amplitudes = np.empty((messages, len(self.__ramp)), dtype=np.int64)
+
+        # messages before which the channels are switched
+        switches = np.array([messages])
+        if schedule is not None:
+            switches = np.append(np.flatnonzero((schedule[1:messages] != schedule[:messages - 1]).any(axis=1)) + 1, messages)
+
+        i = 0
+        while i < messages:
+
+            if schedule is not None:
+                active[:] = schedule[i]
+
+            if inputs is not None:
+                inputs[i] = active
+
+            steady = not self.__rampFlag.any() and np.array_equal(active, self.__oldState)
+            amplitudes[i] = self.step(active, A_max, F, rampup_time, rampdown_time, rampup_startvalue, rampdown_endvalue,
+                                      prescaler=prescaler)
+            i += 1
+
+            # the channels are not switched again before end
+            end = int(switches[np.searchsorted(switches, i)])
+
+            # without any ramping nothing changes until then
+            if steady:
+                amplitudes[i:end] = amplitudes[i - 1]
+                if inputs is not None:
+                    inputs[i:end] = active
+                i = end
+
+            # ramps following a trajectory are copied from the cache
+            elif i < end and self.__cache is not None and np.array_equal(active if schedule is None else schedule[i], self.__oldState):
+                active[:] = self.__oldState
+                ahead = self.__followTrajectoriesAhead(amplitudes[i:end], active, A_max)
+                if inputs is not None:
+                    inputs[i:i + ahead] = active
+                i += ahead
+
+        return amplitudes
+
+    # Returns the number of messages of a ramp of the given time in [ms] for all channels
+    # A channel with a prescaler p only stimulates every p-th message, so its ramp is counted in its own pulses at the
+    # effective rate F / p and lasts p messages per pulse. Any p consecutive messages hold exactly one pulse of the
+    # channel, so the ramp has this number of pulses whatever the phase of the prescaler (see
+    # MM_Message_Builder.setPreScalers()). The length is fixed when the ramp starts, a prescaler changed during the ramp
+    # only applies to the next one
+    def __getSteps(self, F, time, prescaler):
+
+        channels = len(self.__ramp)
+        steps = (np.zeros(channels, dtype=np.int64) + F) * time / 1000
+
+        if prescaler is None:
+            return steps
+
+        prescaler = np.zeros(channels, dtype=np.int64) + prescaler
+        return np.where(prescaler > 1, np.ceil(steps / prescaler) * prescaler, steps)
+
+    # calculate the ramping value by multiplying the ramp factor with the maximum amplitude, then compensate it
+    def __calculateAmplitudes(self, A_max, active, timer):
+
+        amplitudes = np.round(np.asarray(A_max) * (self.__ramp.astype(np.float64) / 100.0)).astype(np.int64) * active
+        if timer is not None:
+            timer.mark('amplitudes')
+
+        amplitudes = self.__compensate(amplitudes)
+        if timer is not None:
+            timer.mark('compensation')
+
+        return amplitudes
+
+    # Applies the compensation table, if there is one
+    def __compensate(self, amplitudes):
+
+        if self.__compensation is None:
+            return amplitudes
+
+        return self.__compensation[amplitudes]
+
+    # Advances all channels which can follow a precomputed trajectory of the cache by one message
+    # Returns the mask of these channels, their states are written and their amplitudes are kept in __cachedAmplitudes
+    def __followTrajectories(self, up, down, switched, active, A_max, F, rampup_time, rampdown_time, rampup_startvalue, rampdown_endvalue,
+                             prescaler):
+
+        channels = len(self.__ramp)
+        flag = self.__rampFlag
+        row = self.__row
+        ramping = up | down
+
+        self.__trajectoryKey = self.__getTrajectoryKey(A_max, rampup_startvalue, rampdown_endvalue)
+        A_max = np.zeros(channels, dtype=np.int64) + A_max
+        value = np.where(up, rampup_startvalue, rampdown_endvalue)
+
+        # a trajectory is only valid as long as the ramp runs undisturbed with the parameters it was computed for
+        row[~(ramping & ~switched & (self.__direction == flag) & (self.__keyValue == value) & (self.__keyA_max == A_max) &
+              (self.__counterValue == self.__rampCounter))] = -1
+
+        # channels which have just been switched start a new trajectory
+        entering = ramping & switched
+        if entering.any():
+
+            steps = np.zeros(channels)
+            if (up & switched).any():
+                steps[up] = self.__getSteps(F, rampup_time, prescaler)[up]
+            if (down & switched).any():
+                steps[down] = self.__getSteps(F, rampdown_time, prescaler)[down]
+
+            self.__position[entering] = 0
+            self.__direction[entering] = flag[entering]
+            self.__keyValue[entering] = value[entering]
+            self.__keyA_max[entering] = A_max[entering]
+
+            keys = zip(flag[entering].tolist(), steps[entering].tolist(), value[entering].tolist(), A_max[entering].tolist(),
+                       self.__ramp[entering].tolist(), self.__rampDownToZero[entering].tolist())
+            row[entering], self.__generation[entering] = zip(*[self.__cache.getTrajectory(*key) for key in keys])
+
+        # trajectories replaced in the cache by the new ones are not valid anymore
+        cached = row >= 0
+        if entering.any() and cached.any():
+            cached[cached] = self.__cache.getGenerations(row[cached]) == self.__generation[cached]
+            row[~cached] = -1
+
+        if not cached.any():
+            return cached
+
+        ramp, counter, rampFlag, rampActive, amplitudes, factor, offset = self.__cache.lookup(row[cached], self.__position[cached])
+
+        self.__ramp[cached] = ramp
+        self.__rampCounter[cached] = counter
+        self.__rampFactor[cached] = factor
+        self.__rampOffset[cached] = offset
+        flag[cached] = rampFlag
+        active[cached] = rampActive
+        self.__cachedAmplitudes[cached] = amplitudes
+
+        # the trajectory ends together with the ramp
+        self.__position[cached] += 1
+        self.__counterValue[cached] = counter
+        row[cached & (flag == self.NO_RAMPING)] = -1
+
+        return cached
+
+    # Advances all channels by one message without any channel being switched, if every ramping channel follows a trajectory
+    # which is still valid for the current parameters and doesn't end with this message
+    # The following messages are prepared at once, step() then only copies them as long as nothing is changed
+    # Returns the amplitudes of the message, None if step() has to calculate it
+    def __continueTrajectories(self, active, A_max, rampup_startvalue, rampdown_endvalue):
+
+        # __followTrajectories() has dropped every trajectory not matching these parameters, directions and channel states
+        # stay consistent as long as no channel is switched
+        if self.__getTrajectoryKey(A_max, rampup_startvalue, rampdown_endvalue) != self.__trajectoryKey:
+            return None
+
+        ramping = self.__rampFlag != self.NO_RAMPING
+        rows = self.__row[ramping]
+
+        if (rows < 0).any() or (self.__counterValue[ramping] != self.__rampCounter[ramping]).any() or \
+                (self.__cache.getGenerations(rows) != self.__generation[ramping]).any():
+            return None
+
+        if not self.__prepareAhead(ramping, rows, active, A_max):
+            return None
+
+        return self.__stepAhead()
+
+    # Parameters a trajectory is only valid for
+    @staticmethod
+    def __getTrajectoryKey(A_max, rampup_startvalue, rampdown_endvalue):
+        return np.asarray(A_max).tobytes(), np.asarray(rampup_startvalue).tobytes(), np.asarray(rampdown_endvalue).tobytes()
+
+    # Identifies a switch message by everything its result depends on: the channel states before and after the switch,
+    # the states of all ramps and trajectories and the parameters
+    def __getSwitchKey(self, A_max, F, rampup_time, rampdown_time, rampup_startvalue, rampdown_endvalue, prescaler):
+
+        states = b''.join([self.__newState.tobytes(), self.__oldState.tobytes(), self.__rampFlag.tobytes(), self.__ramp.tobytes(),
+                           self.__rampCounter.tobytes(), self.__rampFactor.tobytes(), self.__rampOffset.tobytes(),
+                           self.__trajectories.tobytes()])
+        parameters = [np.asarray(value).tobytes() for value in (A_max, F, rampup_time, rampdown_time, rampup_startvalue,
+                                                                 rampdown_endvalue)]
+
+        return states, tuple(parameters), None if prescaler is None else np.asarray(prescaler).tobytes()
+
+    # Keeps the states the switch message has led to and its amplitudes
+    def __rememberSwitch(self, key, active, amplitudes):
+
+        self.__switches[key] = (amplitudes.copy(), active.copy(), self.__rampFlag.copy(), self.__ramp.copy(), self.__rampCounter.copy(),
+                                self.__rampFactor.copy(), self.__rampOffset.copy(), self.__trajectories.copy(), self.__trajectoryKey)
+
+        if len(self.__switches) > MM_Ramp_Engine.SWITCHES:
+            self.__switches.popitem(last=False)
+
+    # Restores the states after a remembered switch message, as long as the trajectories they follow are still in the cache
+    # Returns the amplitudes of the message, None if step() has to calculate it
+    def __recallSwitch(self, key, active):
+
+        switch = self.__switches.get(key)
+        if switch is None:
+            return None
+
+        amplitudes, rampActive, flag, ramp, counter, factor, offset, trajectories, trajectoryKey = switch
+
+        # a trajectory replaced in the cache since then can not be followed anymore
+        rows = trajectories[0]
+        followed = rows >= 0
+        if (self.__cache.getGenerations(rows[followed]) != trajectories[1][followed]).any():
+            del self.__switches[key]
+            return None
+
+        self.__switches.move_to_end(key)
+
+        active[:] = rampActive
+        self.__rampFlag[:] = flag
+        self.__ramp[:] = ramp
+        self.__rampCounter[:] = counter
+        self.__rampFactor[:] = factor
+        self.__rampOffset[:] = offset
+        self.__trajectories[:] = trajectories
+        self.__trajectoryKey = trajectoryKey
+        self.__oldState[:] = self.__newState
+
+        return amplitudes.copy()
+
+    # Prepares the amplitudes, ramp values and counters of all channels for up to AHEAD messages, as long as every ramping
+    # channel follows its trajectory. The messages are stopped before the first trajectory ends, that message is left to step()
+    # Returns False if not even one message can be prepared
+    def __prepareAhead(self, ramping, rows, active, A_max):
+
+        positions = self.__position[ramping]
+        messages = min(MM_Ramp_Engine.AHEAD, int((self.__cache.getLengths(rows) - positions).min()) - 1)
+
+        if messages < 1:
+            return False
+
+        # the channels which are not ramping stay at no stimulation or full stimulation
+        idle = ~ramping
+        self.__ramp[idle] = np.where(active[idle] == 0, 0, 100)
+
+        ramp, counter, amplitudes = self.__cache.getStates(rows, positions, messages)
+
+        self.__aheadAmplitudes = np.empty((messages, len(ramping)), dtype=np.int64)
+        self.__aheadAmplitudes[:] = self.__calculateAmplitudes(A_max, active, None)
+        self.__aheadAmplitudes[:, ramping] = amplitudes.T
+        self.__aheadRamp = np.empty((messages, len(ramping)), dtype=self.__ramp.dtype)
+        self.__aheadRamp[:] = self.__ramp
+        self.__aheadRamp[:, ramping] = ramp.T
+        self.__aheadCounter = np.empty((messages, len(ramping)), dtype=self.__rampCounter.dtype)
+        self.__aheadCounter[:] = self.__rampCounter
+        self.__aheadCounter[:, ramping] = counter.T
+        self.__aheadPosition = ramping.astype(np.int64)
+
+        self.__aheadNext = 0
+        self.__aheadCount = messages
+
+        return True
+
+    # Advances all channels to the next prepared message, factors, offsets and ramp flags stay the same within a trajectory
+    # Returns the amplitudes of the message
+    def __stepAhead(self):
+
+        i = self.__aheadNext
+
+        self.__ramp[:] = self.__aheadRamp[i]
+        self.__rampCounter[:] = self.__aheadCounter[i]
+        self.__counterValue[:] = self.__aheadCounter[i]
+        self.__position += self.__aheadPosition
+        self.__aheadNext = i + 1
+
+        return self.__aheadAmplitudes[i].copy()
+
+    # Advances all channels by up to len(amplitudes) messages without any channel being switched, if every ramping
+    # channel follows a trajectory. The messages are stopped before the first trajectory ends, that message is left to step()
+    # Returns the number of messages written into amplitudes
+    def __followTrajectoriesAhead(self, amplitudes, active, A_max):
+
+        flag = self.__rampFlag
+        row = self.__row
+        ramping = flag != self.NO_RAMPING
+
+        if not ramping.any() or (row[ramping] < 0).any():
+            return 0
+
+        rows = row[ramping]
+        positions = self.__position[ramping]
+        messages = min(len(amplitudes), int((self.__cache.getLengths(rows) - positions).min()) - 1)
+
+        if messages < 1:
+            return 0
+
+        # the trajectories are advanced past the prepared messages
+        self.__aheadCount = 0
+
+        # the channels which are not ramping stay at no stimulation or full stimulation
+        idle = ~ramping
+        self.__ramp[idle] = np.where(active[idle] == 0, 0, 100)
+        amplitudes[:messages] = self.__calculateAmplitudes(A_max, active, None)
+        amplitudes[:messages, ramping] = self.__cache.getAmplitudes(rows, positions, messages).T
+
+        # state after the last of these messages
+        ramp, counter, rampFlag, rampActive, last, factor, offset = self.__cache.lookup(rows, positions + messages - 1)
+
+        self.__ramp[ramping] = ramp
+        self.__rampCounter[ramping] = counter
+        self.__rampFactor[ramping] = factor
+        self.__rampOffset[ramping] = offset
+        flag[ramping] = rampFlag
+        self.__position[ramping] += messages
+        self.__counterValue[ramping] = counter
+
+        return messages
+
+    # Calculation of the individual ramping peaks for upwards ramping of the channels in mask
+    # n .. number of ramping steps, start .. starting value for ramping up in [%]
+    def __rampUp(self, mask, n, start):
+
+        ramp = self.__ramp
+        counter = self.__rampCounter
+        factor = self.__rampFactor
+        offset = self.__rampOffset
+        flag = self.__rampFlag
+
+        first = mask & (counter == 0)
+        later = mask & (counter != 0)
+
+        # if we enter the ramping for the first time, we want to calculate the required startvalue and stepheight for each following ramping pulse
+        if first.any():
+            belowStart = first & (ramp < start)                         # starting from under the minimum starting value
+            full = first & ~belowStart & (ramp >= 100)                  # starting at 100% already, ramping is deactivated
+            between = first & ~belowStart & ~full                       # starting from anywhere else, we start from the current point
+
+            if (n[belowStart | between] == 0).any():
+                raise ZeroDivisionError('float division by zero')
+
+            offset[belowStart] = start[belowStart]
+            factor[belowStart] = (100.0 - offset[belowStart].astype(np.float64)) / n[belowStart]
+            ramp[belowStart] = start[belowStart]
+            counter[belowStart] += 1
+
+            ramp[full] = 100
+            counter[full] = 0
+            flag[full] = self.NO_RAMPING
+
+            offset[between] = np.trunc(ramp[between])
+            factor[between] = (100.0 - offset[between].astype(np.float64)) / n[between]
+            counter[between] += 1
+
+        # if we enter the ramping any other time than the first one, we want to check if we have exceeded any bounds
+        if later.any():
+            belowStart = later & (ramp < start)
+            full = later & ~belowStart & (ramp >= 100)
+            step = later & ~belowStart & ~full
+
+            ramp[belowStart] = start[belowStart]
+            counter[belowStart] = 1
+
+            ramp[full] = 100
+            counter[full] = 0
+            flag[full] = self.NO_RAMPING
+
+            # if every check has been correct, we want to ramp upwards by calculating the next ramped impulse
+            ramp[step] = factor[step].astype(np.float64) * counter[step] + offset[step].astype(np.float64)
+            counter[step] += 1
+
+        # when the ramping has reached 100, it has finished and is deactivated
+        finished = mask & (ramp >= 100)
+        counter[finished] = 0
+        ramp[finished] = 100
+        flag[finished] = self.NO_RAMPING
+
+    # Calculation of the individual ramping peaks for downwards ramping of the channels in mask
+    # n .. number of ramping steps, end .. end value for ramping down in [%]
+    def __rampDown(self, mask, active, n, end):
+
+        ramp = self.__ramp
+        counter = self.__rampCounter
+        factor = self.__rampFactor
+        offset = self.__rampOffset
+        flag = self.__rampFlag
+        toZero = self.__rampDownToZero
+
+        first = mask & (counter == 0)
+        later = mask & (counter != 0)
+
+        # if we enter the ramping for the first time, we want to calculate the required startvalue and stepheight for each following ramping pulse
+        if first.any():
+            full = first & np.where(toZero, ramp >= 100, ramp > 100)                # ramping is started from full stimulation
+            belowEnd = first & ~full & np.where(toZero, ramp < end, ramp <= end)    # already below the end value, ramping can be deactivated
+            between = first & ~full & ~belowEnd                                      # starting from the current value
+
+            if (n[full | between] == 0).any():
+                raise ZeroDivisionError('float division by zero')
+
+            # the channel needs to be actively set to 1 to stay active, it is deactivated again after the message has been built
+            offset[full] = 100
+            factor[full] = (end[full] - offset[full].astype(np.float64)) / n[full]
+            ramp[full] = offset[full]
+            counter[full] += 1
+            active[full] = 1
+
+            ramp[belowEnd] = np.where(toZero[belowEnd], 0, end[belowEnd])
+            counter[belowEnd] = 0
+            flag[belowEnd] = self.NO_RAMPING
+            active[belowEnd] = 1
+
+            offset[between] = np.trunc(ramp[between])
+            factor[between] = (end[between] - offset[between].astype(np.float64)) / n[between]
+            counter[between] += 1
+            active[between] = 1
+
+        # if we enter the ramping any other time than the first one, we want to check if we have exceeded any bounds
+        if later.any():
+            aboveFull = later & (ramp > 100)
+            belowEnd = later & ~aboveFull & (ramp < end)
+            step = later & ~aboveFull & ~belowEnd
+
+            ramp[aboveFull] = 100
+            counter[aboveFull] = 1
+            active[aboveFull] = 1
+
+            ramp[belowEnd] = end[belowEnd]
+            counter[belowEnd] = 0
+            flag[belowEnd] = self.NO_RAMPING
+
+            # if every check has been correct, we want to ramp downwards by calculating the next ramped impulse
+            ramp[step] = factor[step].astype(np.float64) * counter[step] + offset[step].astype(np.float64)
+            active[step] = 1
+            counter[step] += 1
+
+        # when the ramping has reached its endvalue, it has finished and is deactivated
+        finished = mask & (ramp < end)
+        ramp[finished] = np.where(toZero[finished], 0, end[finished])
+        counter[finished] = 0
+        active[finished] = 0
+        flag[finished] = self.NO_RAMPING
@@ -0,0 +1,151 @@
+## Session Replay for the MOTIMOVE 8 Control Interface
+## Sends a recorded session (MM_Session_Log) to a transport again, with the original timing, faster or as fast as possible.
+## The messages are read straight from the memory-mapped log, the session is never loaded into memory as a whole.
+
+import time
+from multiprocessing import Event, Process
+
+from MM_Session_Log import MM_Session_Log
+from MM_Shared_State import MM_Shared_State
+
+
+class MM_Session_Replay(object):
+
+    # Messages mapped at once, the blocks are mapped one after the other, so only a small part of the log is touched at a time
+    BLOCK = 4096
+
+    # path .. file of a MM_Session_Recorder, transport .. any object with write(message), e.g. MM_Pty_Transport
+    # speed .. 1.0 replays with the original timing, 2.0 twice as fast, None as fast as possible
+    # start, stop .. part of the session to be replayed, timestamps of the log in [s], None for the beginning / end
+    # spin .. the last part before a message in [s] is busy waited instead of slept, for a more precise timing
+    def __init__(self, path, transport, speed=1.0, start=None, stop=None, spin=0.0005):
+
+        self.__path = path
+        self.__transport = transport
+        self.__speed = speed
+        self.__start = start
+        self.__stop = stop
+        self.__spin = spin
+        self.__stopEvent = Event()
+        self.__process = None
+
+        # messages sent and maximal delay after the original timing in [s], shared with the process which started the replay
+        self.__statistics = MM_Shared_State([('messages', 'i8', 1), ('total', 'i8', 1), ('lagMax', 'f8', 1)])
+        self.__mapState()
+
+    def __mapState(self):
+
+        self.__messages = self.__statistics.getField('messages')
+        self.__total = self.__statistics.getField('total')
+        self.__lagMax = self.__statistics.getField('lagMax')
+
+    # The process handle stays with the process which started the replay
+    def __getstate__(self):
+
+        state = self.__dict__.copy()
+        state['_MM_Session_Replay__process'] = None
+        del state['_MM_Session_Replay__messages']
+        del state['_MM_Session_Replay__total']
+        del state['_MM_Session_Replay__lagMax']
+
+        return state
+
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+        self.__mapState()
+
+    # Replays the session until it has ended or stop() is called
+    def run(self):
+
+        log = MM_Session_Log(self.__path)
+
+        try:
+            first = 0 if self.__start is None else log.seek(self.__start)
+            last = log.getCount() if self.__stop is None else log.seek(self.__stop)
+
+            self.__messages[0] = 0
+            self.__total[0] = max(last - first, 0)
+            self.__lagMax[0] = 0
+
+            if self.__speed is None:
+                self.__runFast(log, first, last)
+            else:
+                self.__runTimed(log, first, last)
+
+            if hasattr(self.__transport, 'flush'):
+                self.__transport.flush()
+
+        finally:
+            log.close()
+
+    def __runFast(self, log, first, last):
+
+        for block in range(first, last, MM_Session_Replay.BLOCK):
+
+            for message in log.getMessages(block, min(block + MM_Session_Replay.BLOCK, last)):
+                self.__transport.write(message)
+
+            self.__messages[0] += min(MM_Session_Replay.BLOCK, last - block)
+
+            if self.__stopEvent.is_set():
+                return
+
+    def __runTimed(self, log, first, last):
+
+        origin = None
+
+        for block in range(first, last, MM_Session_Replay.BLOCK):
+
+            stop = min(block + MM_Session_Replay.BLOCK, last)
+            timestamps = log.getTimestamps(block, stop).tolist()
+
+            if origin is None:
+                origin = timestamps[0]
+                begin = time.monotonic()
+
+            for message, timestamp in zip(log.getMessages(block, stop), timestamps):
+
+                # absolute deadline of the message, relative to the first message of the replay
+                deadline = begin + (timestamp - origin) / self.__speed
+
+                remaining = deadline - time.monotonic()
+                if remaining > self.__spin:
+                    time.sleep(remaining - self.__spin)
+
+                now = time.monotonic()
+                while now < deadline:
+                    now = time.monotonic()
+
+                self.__transport.write(message)
+
+                self.__messages[0] += 1
+                if now - deadline > self.__lagMax[0]:
+                    self.__lagMax[0] = now - deadline
+
+                if self.__stopEvent.is_set():
+                    return
+
+    # Runs the replay in a separate process
+    def start(self):
+
+        self.__stopEvent.clear()
+        self.__process = Process(target=self.run, daemon=True)
+        self.__process.start()
+
+    # Stops the replay after the current message
+    def stop(self):
+
+        self.__stopEvent.set()
+        self.join()
+
+    # Waits until the replay has ended
+    def join(self):
+
+        if self.__process is not None:
+            self.__process.join()
+            self.__process = None
+
+    # Returns the messages sent, the number of messages to be replayed and the maximal delay after the original timing in [s]
+    def getStatistics(self):
+        return {'messages': int(self.__messages[0]), 'total': int(self.__total[0]), 'lagMax': float(self.__lagMax[0])}
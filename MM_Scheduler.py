@@ -0,0 +1,145 @@
+## Stimulation Scheduler for the MOTIMOVE 8 Control Interface
+## Sends the messages of a MM_Message_Builder at the stimulation periode of the active mode.
+## Every message has an absolute deadline on the monotonic clock, so timing errors never add up.
+
+import time
+from multiprocessing import Event, Process
+
+from MM_Message_Builder import MM_Message_Builder
+from MM_Shared_State import MM_Shared_State, MM_SeqLock
+
+
+class MM_Stimulation_Scheduler(object):
+
+    # Layout of the statistics, shared with the process which started the scheduler
+    STATISTICS_LAYOUT = [
+        ('sequence', 'i8', 1),
+        ('messages', 'i8', 1),          # messages sent
+        ('missed', 'i8', 1),            # deadlines which have been skipped, because the scheduler was too late
+        ('periode', 'f8', 1),           # periode of the last message in [s]
+        ('jitterSum', 'f8', 1),         # sum of the delays after the deadlines in [s]
+        ('jitterSquareSum', 'f8', 1),
+        ('jitterMax', 'f8', 1),
+    ]
+
+    # builder .. MM_Message_Builder, transport .. any object with write(message), e.g. MM_Pty_Transport
+    #            or MM_Device_Manager with a MM_Device_Transport, then the messages of all devices share one clock
+    #            and all devices have to be set to the same periode, see run()
+    # spin .. the last part before a deadline in [s] is busy waited instead of slept, for a more precise timing
+    def __init__(self, builder, transport, spin=0.0005):
+
+        self.__builder = builder
+        self.__transport = transport
+        self.__spin = spin
+        self.__stop = Event()
+        self.__process = None
+
+        self.__statistics = MM_Shared_State(MM_Stimulation_Scheduler.STATISTICS_LAYOUT)
+        self.__seqlock = MM_SeqLock(self.__statistics, 'sequence', 'messages', 'jitterMax')
+        self.__mapState()
+
+    def __mapState(self):
+
+        self.__messages = self.__statistics.getField('messages')
+        self.__missed = self.__statistics.getField('missed')
+        self.__periode = self.__statistics.getField('periode')
+        self.__jitterSum = self.__statistics.getField('jitterSum')
+        self.__jitterSquareSum = self.__statistics.getField('jitterSquareSum')
+        self.__jitterMax = self.__statistics.getField('jitterMax')
+
+    # The process handle stays with the process which started the scheduler
+    def __getstate__(self):
+        return {'builder': self.__builder, 'transport': self.__transport, 'spin': self.__spin, 'stop': self.__stop,
+                'statistics': self.__statistics, 'seqlock': self.__seqlock}
+
+    def __setstate__(self, state):
+        self.__builder = state['builder']
+        self.__transport = state['transport']
+        self.__spin = state['spin']
+        self.__stop = state['stop']
+        self.__statistics = state['statistics']
+        self.__seqlock = state['seqlock']
+        self.__process = None
+        self.__mapState()
+
+    # Sends messages until stop() is called
+    # The periode is taken from every message itself (T or T_BOOST in [ms]), so changes apply from the next message on
+    # The messages of a MM_Device_Manager advance the ramps of all devices together, so they can only be sent at one periode:
+    # a ValueError is raised before any message with different periodes of the devices is sent
+    def run(self):
+
+        deadline = time.monotonic()
+
+        while not self.__stop.is_set():
+
+            # waiting for the deadline, the last part is busy waited
+            remaining = deadline - time.monotonic()
+            if remaining > self.__spin:
+                time.sleep(remaining - self.__spin)
+
+            now = time.monotonic()
+            while now < deadline:
+                now = time.monotonic()
+
+            message = self.__builder.getMessageView()
+
+            # a MM_Device_Manager generates one message per device, a device must not silently run at the periode of another
+            if getattr(message, 'ndim', 1) == 2:
+                periodes = message[:, MM_Message_Builder.POS_PERIODE]
+                if periodes.min() != periodes.max():
+                    raise ValueError('all devices have to be set to the same periode, not ' + str(periodes.tolist()) + ' ms')
+                periode = int(periodes[0]) / 1000.0
+            else:
+                periode = message[MM_Message_Builder.POS_PERIODE] / 1000.0
+
+            self.__transport.write(message)
+            jitter = now - deadline
+
+            # deadlines which have already passed completely are skipped instead of being caught up with
+            missed = int(jitter // periode) if periode > 0 else 0
+            deadline += (missed + 1) * periode
+
+            with self.__seqlock:
+                self.__messages[0] += 1
+                self.__missed[0] += missed
+                self.__periode[0] = periode
+                self.__jitterSum[0] += jitter
+                self.__jitterSquareSum[0] += jitter * jitter
+                if jitter > self.__jitterMax[0]:
+                    self.__jitterMax[0] = jitter
+
+        # coalescing transports may still hold some messages
+        if hasattr(self.__transport, 'flush'):
+            self.__transport.flush()
+
+    # Runs the scheduler in a separate process
+    def start(self):
+
+        self.__stop.clear()
+        self.__process = Process(target=self.run, daemon=True)
+        self.__process.start()
+
+    # Stops the scheduler, the current message is still sent completely
+    def stop(self):
+
+        self.__stop.set()
+        if self.__process is not None:
+            self.__process.join()
+            self.__process = None
+
+    # Returns the statistics: messages, missed deadlines, periode in [s] and jitter (mean, standard deviation, max) in [s]
+    def getStatistics(self):
+
+        values = MM_Shared_State(MM_Stimulation_Scheduler.STATISTICS_LAYOUT, shared=False)
+        self.__seqlock.read(values.getRegion('messages', 'jitterMax'))
+
+        messages = int(values.getField('messages')[0])
+        jitterMean = float(values.getField('jitterSum')[0]) / messages if messages > 0 else 0.0
+        jitterVariance = float(values.getField('jitterSquareSum')[0]) / messages - jitterMean ** 2 if messages > 0 else 0.0
+
+        return {'messages': messages,
+                'missed': int(values.getField('missed')[0]),
+                'periode': float(values.getField('periode')[0]),
+                'jitterMean': jitterMean,
+                'jitterStd': max(jitterVariance, 0.0) ** 0.5,
+                'jitterMax': float(values.getField('jitterMax')[0])}
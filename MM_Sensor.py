@@ -0,0 +1,301 @@
+## Sensor Input Pipeline for the MOTIMOVE 8 Control Interface
+## Sensor or IMU samples are written into a fixed-size shared memory ring buffer without any lock,
+## a pipeline process hands every new batch to a controller and applies its output to the builder in one transaction.
+## The latency from the acquisition of the newest sample to the published parameters is measured for every update.
+
+import math
+import time
+from multiprocessing import Event, Process
+
+import numpy as np
+
+from MM_Shared_State import MM_Shared_State, MM_SeqLock
+
+
+class MM_Sensor_Buffer(object):
+
+    # capacity .. number of samples kept, older samples are overwritten
+    # channels .. values per sample, e.g. 6 for an IMU with accelerometer and gyroscope
+    def __init__(self, capacity=4096, channels=6):
+
+        self.__capacity = capacity
+        self.__channels = channels
+
+        # head counts all samples ever written, sample i is kept in slot i % capacity
+        self.__state = MM_Shared_State([('head', 'i8', 1),
+                                        ('timestamp', 'f8', capacity),
+                                        ('values', 'f8', capacity * channels)])
+        self.__mapState()
+
+    def __mapState(self):
+
+        self.__head = self.__state.getField('head')
+        self.__timestamp = self.__state.getField('timestamp')
+        self.__values = self.__state.getField('values').reshape(self.__capacity, self.__channels)
+
+    def __getstate__(self):
+        return {'state': self.__state, 'capacity': self.__capacity, 'channels': self.__channels}
+
+    def __setstate__(self, state):
+        self.__state = state['state']
+        self.__capacity = state['capacity']
+        self.__channels = state['channels']
+        self.__mapState()
+
+    # Returns the number of samples kept
+    def getCapacity(self):
+        return self.__capacity
+
+    # Returns the number of values per sample
+    def getChannels(self):
+        return self.__channels
+
+    # Returns the number of samples written so far
+    def getHead(self):
+        return int(self.__head[0])
+
+    # Adds one sample, only one process may write
+    # timestamp .. time.monotonic() of the acquisition in [s], defaults to now
+    def write(self, values, timestamp=None):
+
+        head = int(self.__head[0])
+        slot = head % self.__capacity
+
+        self.__timestamp[slot] = time.monotonic() if timestamp is None else timestamp
+        self.__values[slot] = values
+
+        # the sample is published only after it has been written completely
+        self.__head[0] = head + 1
+
+    # Copies all samples from index start on which are still available, never blocks the writer
+    # Returns (index of the first sample, timestamps, values (samples, channels))
+    # Samples which have been overwritten before or during the copy are skipped
+    def read(self, start=0):
+
+        head = int(self.__head[0])
+        first = max(start, head - self.__capacity)
+        slots = np.arange(first, head) % self.__capacity
+
+        timestamps = self.__timestamp[slots]
+        values = self.__values[slots]
+
+        # the writer may have started to overwrite the oldest samples in the meantime
+        valid = max(first, int(self.__head[0]) - self.__capacity + 1)
+        if valid > first:
+            timestamps = timestamps[valid - first:]
+            values = values[valid - first:]
+
+        return valid, timestamps, values
+
+
+class MM_Linear_Controller(object):
+
+    # Example controller: one sensor value controls the intensity, optionally the channels are switched by a threshold
+    # channel .. index of the value within a sample, low, high .. range of the value mapped onto intensity (minimum, maximum) in [%]
+    # threshold .. the channels given by active (8 booleans) are switched on while the value is at or above it, None never switches
+    def __init__(self, channel=0, low=0.0, high=1.0, intensity=(0, 100), threshold=None, active=None):
+
+        self.__channel = channel
+        self.__low = low
+        self.__high = high
+        self.__intensity = intensity
+        self.__threshold = threshold
+        self.__active = [True] * 8 if active is None else list(active)
+        self.__last = {}
+
+    # Called by MM_Sensor_Pipeline with all new samples, returns the parameters for MM_Message_Builder.apply()
+    # Only parameters which have changed are returned, None if nothing has changed
+    def __call__(self, timestamps, values):
+
+        value = float(values[-1, self.__channel])
+        fraction = min(max((value - self.__low) / (self.__high - self.__low), 0.0), 1.0)
+
+        parameters = {'Intensity': int(round(self.__intensity[0] + fraction * (self.__intensity[1] - self.__intensity[0])))}
+
+        if self.__threshold is not None:
+            on = value >= self.__threshold
+            parameters['ActiveChannels'] = [on and active for active in self.__active]
+
+        changed = {name: value for name, value in parameters.items() if self.__last.get(name) != value}
+        self.__last.update(changed)
+
+        return changed if changed else None
+
+
+class MM_Sensor_Pipeline(object):
+
+    # Layout of the statistics, shared with the process which started the pipeline
+    STATISTICS_LAYOUT = [
+        ('sequence', 'i8', 1),
+        ('samples', 'i8', 1),           # samples handed to the controller
+        ('lost', 'i8', 1),              # samples overwritten before they could be read
+        ('updates', 'i8', 1),           # parameter updates applied to the builder
+        ('latencySum', 'f8', 1),        # sum of the times from the newest sample to the applied update in [s]
+        ('latencySquareSum', 'f8', 1),
+        ('latencyMax', 'f8', 1),
+    ]
+
+    # buffer .. MM_Sensor_Buffer, builder .. MM_Message_Builder (or anything with apply(), e.g. MM_Device_Manager)
+    # controller .. function (timestamps, values) returning a dictionary for builder.apply() or None
+    # poll .. time slept while no new sample is available in [s], 0 busy waits for the lowest latency
+    def __init__(self, buffer, builder, controller, poll=0.0001):
+
+        self.__buffer = buffer
+        self.__builder = builder
+        self.__controller = controller
+        self.__poll = poll
+        self.__stop = Event()
+        self.__process = None
+
+        self.__statistics = MM_Shared_State(MM_Sensor_Pipeline.STATISTICS_LAYOUT)
+        self.__seqlock = MM_SeqLock(self.__statistics, 'sequence', 'samples', 'latencyMax')
+        self.__mapState()
+
+    def __mapState(self):
+
+        self.__samples = self.__statistics.getField('samples')
+        self.__lost = self.__statistics.getField('lost')
+        self.__updates = self.__statistics.getField('updates')
+        self.__latencySum = self.__statistics.getField('latencySum')
+        self.__latencySquareSum = self.__statistics.getField('latencySquareSum')
+        self.__latencyMax = self.__statistics.getField('latencyMax')
+
+    # The process handle stays with the process which started the pipeline
+    def __getstate__(self):
+        return {'buffer': self.__buffer, 'builder': self.__builder, 'controller': self.__controller, 'poll': self.__poll,
+                'stop': self.__stop, 'statistics': self.__statistics, 'seqlock': self.__seqlock}
+
+    def __setstate__(self, state):
+        self.__buffer = state['buffer']
+        self.__builder = state['builder']
+        self.__controller = state['controller']
+        self.__poll = state['poll']
+        self.__stop = state['stop']
+        self.__statistics = state['statistics']
+        self.__seqlock = state['seqlock']
+        self.__process = None
+        self.__mapState()
+
+    # Hands all samples from index start on to the controller and applies its output
+    # Returns the index of the next sample and the number of samples handled
+    def step(self, start):
+
+        first, timestamps, values = self.__buffer.read(start)
+
+        if len(timestamps) == 0:
+            return first, 0
+
+        parameters = self.__controller(timestamps, values)
+        if parameters:
+            self.__builder.apply(parameters)
+
+        latency = time.monotonic() - float(timestamps[-1])
+
+        with self.__seqlock:
+            self.__samples[0] += len(timestamps)
+            self.__lost[0] += first - start
+            if parameters:
+                self.__updates[0] += 1
+                self.__latencySum[0] += latency
+                self.__latencySquareSum[0] += latency * latency
+                if latency > self.__latencyMax[0]:
+                    self.__latencyMax[0] = latency
+
+        return first + len(timestamps), len(timestamps)
+
+    # Processes the samples until stop() is called, samples written before are ignored
+    def run(self):
+
+        position = self.__buffer.getHead()
+
+        while not self.__stop.is_set():
+
+            position, samples = self.step(position)
+
+            if samples == 0 and self.__poll > 0:
+                time.sleep(self.__poll)
+
+    # Runs the pipeline in a separate process
+    def start(self):
+
+        self.__stop.clear()
+        self.__process = Process(target=self.run, daemon=True)
+        self.__process.start()
+
+    def stop(self):
+
+        self.__stop.set()
+        if self.__process is not None:
+            self.__process.join()
+            self.__process = None
+
+    # Returns samples, lost samples, updates and the latency of the updates (mean, standard deviation, max) in [s]
+    def getStatistics(self):
+
+        values = MM_Shared_State(MM_Sensor_Pipeline.STATISTICS_LAYOUT, shared=False)
+        self.__seqlock.read(values.getRegion('samples', 'latencyMax'))
+
+        updates = int(values.getField('updates')[0])
+        latencyMean = float(values.getField('latencySum')[0]) / updates if updates > 0 else 0.0
+        latencyVariance = float(values.getField('latencySquareSum')[0]) / updates - latencyMean ** 2 if updates > 0 else 0.0
+
+        return {'samples': int(values.getField('samples')[0]),
+                'lost': int(values.getField('lost')[0]),
+                'updates': updates,
+                'latencyMean': latencyMean,
+                'latencyStd': max(latencyVariance, 0.0) ** 0.5,
+                'latencyMax': float(values.getField('latencyMax')[0])}
+
+
+class MM_Synthetic_Sensor(object):
+
+    # Writes sine waves into a MM_Sensor_Buffer at a fixed rate, e.g. for tests and benchmarks without a real sensor
+    # rate .. samples per second, frequency .. of the sine waves in [Hz], channel n is shifted by n / channels periods
+    def __init__(self, buffer, rate=1000.0, frequency=1.0):
+
+        self.__buffer = buffer
+        self.__rate = rate
+        self.__frequency = frequency
+        self.__stop = Event()
+        self.__process = None
+
+    # The process handle stays with the process which started the sensor
+    def __getstate__(self):
+
+        state = self.__dict__.copy()
+        state['_MM_Synthetic_Sensor__process'] = None
+
+        return state
+
+    # Writes samples with absolute deadlines until stop() is called
+    def run(self):
+
+        channels = self.__buffer.getChannels()
+        phases = np.arange(channels) / channels
+        start = time.monotonic()
+        sample = 0
+
+        while not self.__stop.is_set():
+
+            deadline = start + sample / self.__rate
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+
+            now = time.monotonic()
+            self.__buffer.write(0.5 + 0.5 * np.sin(2 * math.pi * (self.__frequency * (now - start) + phases)), now)
+            sample += 1
+
+    # Runs the sensor in a separate process
+    def start(self):
+
+        self.__stop.clear()
+        self.__process = Process(target=self.run, daemon=True)
+        self.__process.start()
+
+    def stop(self):
+
+        self.__stop.set()
+        if self.__process is not None:
+            self.__process.join()
+            self.__process = None
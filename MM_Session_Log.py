@@ -0,0 +1,210 @@
+## Session Log for the MOTIMOVE 8 Control Interface
+## Records every message with its monotonic timestamp in a memory-mapped file of fixed-size records.
+## Records are written into the mapped memory without any system call, the file grows in large chunks.
+## A sparse index of every INDEX_INTERVAL-th timestamp allows seeking by time in O(log n).
+
+import mmap
+import os
+import time
+
+import numpy as np
+
+from MM_Message_Builder import MM_Message_Builder
+
+
+class MM_Session_Log(object):
+
+    MAGIC = b'MMLOG001'
+
+    # File header, followed by the records
+    HEADER_DTYPE = np.dtype([('magic', 'S8'), ('recordSize', '<u4'), ('messageLength', '<u4'), ('count', '<u8'),
+                             ('reserved', 'u1', 40)])
+
+    # One record per message, timestamp of time.monotonic() in [s]
+    RECORD_DTYPE = np.dtype([('timestamp', '<f8'), ('message', 'u1', MM_Message_Builder.MSG_LENGTH)])
+
+    # Every INDEX_INTERVAL-th timestamp is kept in the sparse time index
+    INDEX_INTERVAL = 1024
+
+    # Opens a log for reading, also while it is still being recorded
+    def __init__(self, path):
+
+        self.__file = open(path, 'rb')
+        self.__mmap = None
+        self.__retired = []
+        self.__index = np.zeros(0, dtype=np.float64)
+        self.__map()
+
+        if bytes(self.__header['magic'][0]) != MM_Session_Log.MAGIC:
+            raise ValueError(path + ' is not a MOTIMOVE session log')
+
+    # The new mapping is in place before the old one is given up, so the log always stays usable
+    def __map(self):
+
+        size = os.fstat(self.__file.fileno()).st_size
+        mapping = mmap.mmap(self.__file.fileno(), size, access=mmap.ACCESS_READ)
+        header = np.frombuffer(mapping, dtype=MM_Session_Log.HEADER_DTYPE, count=1)
+        records = np.frombuffer(mapping, dtype=MM_Session_Log.RECORD_DTYPE,
+                                count=(size - MM_Session_Log.HEADER_DTYPE.itemsize) // MM_Session_Log.RECORD_DTYPE.itemsize,
+                                offset=MM_Session_Log.HEADER_DTYPE.itemsize)
+
+        if self.__mmap is not None:
+            self.__retired.append(self.__mmap)
+
+        self.__mmap = mapping
+        self.__size = size
+        self.__header = header
+        self.__records = records
+
+        self.__release()
+
+    # Closes the old mappings, those still exported by views of getTimestamps() or getMessages() are kept until a later call
+    def __release(self):
+
+        retired = []
+
+        for mapping in self.__retired:
+            try:
+                mapping.close()
+            except BufferError:
+                retired.append(mapping)
+
+        self.__retired = retired
+
+    # Returns the number of records, the file is mapped again if a running recording has grown it meanwhile
+    def getCount(self):
+
+        count = int(self.__header['count'][0])
+
+        if count > len(self.__records) and os.fstat(self.__file.fileno()).st_size != self.__size:
+            self.__map()
+
+        return min(count, len(self.__records))
+
+    # Returns the timestamps of the records from start to stop as view into the file
+    def getTimestamps(self, start=0, stop=None):
+        return self.__records['timestamp'][start:self.getCount() if stop is None else min(stop, self.getCount())]
+
+    # Returns the messages of the records from start to stop as view into the file, array (records, MSG_LENGTH)
+    def getMessages(self, start=0, stop=None):
+        return self.__records['message'][start:self.getCount() if stop is None else min(stop, self.getCount())]
+
+    # Returns the sparse time index, it is extended for records added since the last call
+    def getIndex(self):
+
+        count = self.getCount()
+        known = len(self.__index) * MM_Session_Log.INDEX_INTERVAL
+
+        if known < count:
+            self.__index = np.append(self.__index, self.__records['timestamp'][known:count:MM_Session_Log.INDEX_INTERVAL])
+
+        return self.__index
+
+    # Returns the number of the first record at or after timestamp, getCount() if there is none
+    def seek(self, timestamp):
+
+        index = self.getIndex()
+        count = self.getCount()
+        interval = MM_Session_Log.INDEX_INTERVAL
+
+        # the index narrows the search down to one block of records
+        block = int(np.searchsorted(index, timestamp, side='left'))
+        if block == 0:
+            return 0
+
+        start = (block - 1) * interval
+        stop = min(block * interval + 1, count)
+
+        return start + int(np.searchsorted(self.__records['timestamp'][start:stop], timestamp, side='left'))
+
+    # Mappings which are still exported by views are closed as soon as the last view is released
+    def close(self):
+
+        self.__records = None
+        self.__header = None
+        self.__retired.append(self.__mmap)
+        self.__release()
+        self.__retired = []
+        self.__file.close()
+
+
+class MM_Session_Recorder(object):
+
+    # Creates a new log, an existing file is overwritten
+    # chunk .. number of records the file grows by whenever it is full
+    def __init__(self, path, chunk=65536):
+
+        self.__chunk = chunk
+        self.__file = open(path, 'w+b')
+        self.__mmap = None
+        self.__count = 0
+        self.__capacity = 0
+        self.__grow()
+
+        self.__header['magic'] = MM_Session_Log.MAGIC
+        self.__header['recordSize'] = MM_Session_Log.RECORD_DTYPE.itemsize
+        self.__header['messageLength'] = MM_Message_Builder.MSG_LENGTH
+
+    # Extends the file by one chunk and maps it again
+    def __grow(self):
+
+        self.__header = None
+        self.__timestamps = None
+        self.__messages = None
+        if self.__mmap is not None:
+            self.__mmap.close()
+
+        self.__capacity += self.__chunk
+        self.__file.truncate(MM_Session_Log.HEADER_DTYPE.itemsize + self.__capacity * MM_Session_Log.RECORD_DTYPE.itemsize)
+        self.__mmap = mmap.mmap(self.__file.fileno(), 0)
+
+        self.__header = np.frombuffer(self.__mmap, dtype=MM_Session_Log.HEADER_DTYPE, count=1)
+        records = np.frombuffer(self.__mmap, dtype=MM_Session_Log.RECORD_DTYPE, count=self.__capacity,
+                                offset=MM_Session_Log.HEADER_DTYPE.itemsize)
+        self.__timestamps = records['timestamp']
+        self.__messages = records['message']
+
+    # Appends one message, timestamp defaults to time.monotonic()
+    def append(self, message, timestamp=None):
+
+        if self.__count == self.__capacity:
+            self.__grow()
+
+        self.__timestamps[self.__count] = time.monotonic() if timestamp is None else timestamp
+        self.__messages[self.__count] = message
+        self.__count += 1
+
+        # the count is published after the record, so readers never see a partial record
+        self.__header['count'] = self.__count
+
+    # Appends several messages at once, e.g. of MM_Message_Builder.getMessages(), with one timestamp each
+    def appendMany(self, messages, timestamps):
+
+        messages = np.asarray(messages, dtype=np.uint8).reshape(-1, MM_Message_Builder.MSG_LENGTH)
+
+        while self.__count + len(messages) > self.__capacity:
+            self.__grow()
+
+        self.__timestamps[self.__count:self.__count + len(messages)] = timestamps
+        self.__messages[self.__count:self.__count + len(messages)] = messages
+        self.__count += len(messages)
+        self.__header['count'] = self.__count
+
+    # Returns the number of records written
+    def getCount(self):
+        return self.__count
+
+    # Writes the mapped records to disk, e.g. periodically from another thread
+    def flush(self):
+        self.__mmap.flush()
+
+    # Cuts the unused part of the last chunk off and closes the file
+    def close(self):
+
+        self.__header = None
+        self.__timestamps = None
+        self.__messages = None
+        self.__mmap.flush()
+        self.__mmap.close()
+        self.__file.truncate(MM_Session_Log.HEADER_DTYPE.itemsize + self.__count * MM_Session_Log.RECORD_DTYPE.itemsize)
+        self.__file.close()
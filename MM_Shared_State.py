@@ -0,0 +1,165 @@
+## Shared State Block for the MOTIMOVE 8 Control Interface
+## Keeps all fields of a state layout in one contiguous shared memory block (struct-of-arrays)
+
+import threading
+
+import numpy as np
+from multiprocessing import Lock, RawArray
+
+
+class MM_Shared_State(object):
+
+    # Alignment of the individual fields inside the block in [bytes]
+    ALIGNMENT = 8
+
+    # Creates one block for the given layout
+    # Expects a list of tuples (name, dtype, number of elements), e.g. [('PhW', 'i4', 8), ('Intensity', 'i4', 1)]
+    # shared = False creates a process local block with the identical layout, e.g. for snapshots
+    def __init__(self, layout, shared=True):
+
+        self.__layout = []
+        offset = 0
+
+        for name, dtype, count in layout:
+            dtype = np.dtype(dtype)
+            offset = (offset + MM_Shared_State.ALIGNMENT - 1) // MM_Shared_State.ALIGNMENT * MM_Shared_State.ALIGNMENT
+            self.__layout.append((name, dtype.str, int(count), offset))
+            offset += dtype.itemsize * int(count)
+
+        # one single memory allocation without any locks, zero initialized
+        if shared:
+            self.__block = RawArray('B', max(offset, 1))
+        else:
+            self.__block = bytearray(max(offset, 1))
+
+        self.__mapFields()
+
+    # Creates the NumPy views onto the block
+    def __mapFields(self):
+
+        self.__fields = {}
+        self.__bounds = {}
+
+        for name, dtype, count, offset in self.__layout:
+            self.__fields[name] = np.frombuffer(self.__block, dtype=dtype, count=count, offset=offset)
+            self.__bounds[name] = (offset, offset + self.__fields[name].nbytes)
+
+    # Only the layout and the shared block are transferred to a child process, the views are rebuilt there
+    def __getstate__(self):
+        return {'layout': self.__layout, 'block': self.__block}
+
+    def __setstate__(self, state):
+        self.__layout = state['layout']
+        self.__block = state['block']
+        self.__mapFields()
+
+    # Returns the NumPy view of the field with the given name
+    def getField(self, name):
+        return self.__fields[name]
+
+    # Returns the names of all fields in layout order
+    def getFieldNames(self):
+        return [field[0] for field in self.__layout]
+
+    # Returns a byte view spanning all fields from first to last (both included) in layout order
+    def getRegion(self, first, last):
+        return np.frombuffer(self.__block, dtype=np.uint8)[self.__bounds[first][0]:self.__bounds[last][1]]
+
+    # Returns the size of the block in [bytes]
+    def getSize(self):
+        return len(self.__block)
+
+
+class MM_SeqLock(object):
+
+    # Failed reads after which the reader waits for the writer lock instead of trying again, e.g. if the writer has been
+    # preempted while writing or keeps writing, the reader then waits for one write instead of spinning through its time slice
+    SPIN = 4
+
+    # Sequence lock protecting a region of a shared state block
+    # Writers are serialized by one lock and make the sequence counter odd while they are writing,
+    # readers never lock but copy the region and retry if the sequence counter has changed in the meantime.
+    # sequence must name an 'i8' field of the state which is not part of the region.
+    # Writes may be nested by the same thread, the changes are only published when the outermost write finishes.
+    def __init__(self, state, sequence, first, last):
+
+        self.__state = state
+        self.__names = (sequence, first, last)
+        self.__lock = Lock()
+        self.__mapState()
+
+    def __mapState(self):
+
+        # the sequence counter is read and incremented as Python integer, much faster than through a NumPy scalar
+        self.__sequence = memoryview(self.__state.getField(self.__names[0])).cast('B').cast('q')
+        self.__region = self.__state.getRegion(self.__names[1], self.__names[2])
+
+        # thread of this process which is writing at the moment and its nesting depth
+        self.__owner = None
+        self.__depth = 0
+
+    def __getstate__(self):
+        return {'state': self.__state, 'names': self.__names, 'lock': self.__lock}
+
+    def __setstate__(self, state):
+        self.__state = state['state']
+        self.__names = state['names']
+        self.__lock = state['lock']
+        self.__mapState()
+
+    # Starts a write, usage: with seqlock: ...
+    def __enter__(self):
+
+        if self.__owner == threading.get_ident():
+            self.__depth += 1
+            return self
+
+        self.__lock.acquire()
+        self.__owner = threading.get_ident()
+        self.__depth = 1
+        self.__sequence[0] += 1
+
+        return self
+
+    # Finishes a write and publishes the new values
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.__depth -= 1
+        if self.__depth > 0:
+            return False
+
+        self.__sequence[0] += 1
+        self.__owner = None
+        self.__lock.release()
+
+        return False
+
+    # Copies a torn-free version of the protected region into target (uint8 array of the region size)
+    # The region is copied without locking up to SPIN times, then under the writer lock, so a busy writer delays a read
+    # by about the write in progress instead of as long as it keeps writing
+    # Returns the sequence number of the copied version
+    def read(self, target):
+
+        for retry in range(0, MM_SeqLock.SPIN):
+
+            sequence = self.__sequence[0]
+
+            # unless a writer is active at the moment
+            if not sequence & 1:
+
+                target[:] = self.__region
+
+                if self.__sequence[0] == sequence:
+                    return sequence
+
+        # the lock is not reentrant, a thread waiting for its own write would never return
+        if self.__owner == threading.get_ident():
+            raise RuntimeError('the seqlock can not be read inside a write of the same thread')
+
+        with self.__lock:
+            target[:] = self.__region
+            return self.__sequence[0]
+
+    # Returns the current sequence number, it changes with every write
+    def getSequence(self):
+        return self.__sequence[0]
@@ -0,0 +1,62 @@
+## Session Simulator for the MOTIMOVE 8 Control Interface
+## Previews a whole stimulation protocol offline: a timeline of parameter changes is evaluated with the semantics of
+## MM_Message_Builder, every stretch between two changes is generated at once by getMessages() instead of message by message.
+
+import math
+
+import numpy as np
+
+from MM_Charge import MM_Charge_Account
+from MM_Frame_Decoder import MM_Frame_Decoder
+from MM_Message_Builder import MM_Message_Builder
+
+
+class MM_Session_Simulator(object):
+
+    # calibration .. MM_Calibration of the stimulator, None uses AVAL_COMPENSATION
+    def __init__(self, calibration=None):
+        self.__calibration = calibration
+
+    # Simulates a session of the given duration in [s]
+    # timeline .. list of (time in [s], parameters for MM_Message_Builder.apply()), e.g.
+    #             [(0, {'StimFrequency': 100, 'ActiveChannels': [True] * 8}), (60, {'BOOST_Mode': 1}), (65, {'BOOST_Mode': 0})]
+    #             a change takes effect with the first message sent at or after its time, like with MM_Stimulation_Scheduler
+    # Returns the columns of MM_Frame_Decoder.toColumns() with one row per message and additionally
+    # time .. start of every message in [s], charge .. charge of one phase of all pulses of every message and channel in [nC]
+    # as accounted by MM_Charge_Account (intensity, doublets and prescalers included)
+    # and messages .. all messages as uint8 array (messages, MSG_LENGTH)
+    def simulate(self, timeline, duration):
+
+        # every simulation starts from the defaults of a new builder
+        builder = MM_Message_Builder(1, calibration=self.__calibration)
+        events = sorted(timeline, key=lambda event: event[0])
+
+        chunks = []
+        starts = []
+        now = 0                 # start of the next message in [ms], the periodes are whole milliseconds
+        i = 0
+
+        while now < duration * 1000.0:
+
+            while i < len(events) and events[i][0] * 1000.0 <= now:
+                builder.apply(events[i][1])
+                i += 1
+
+            end = duration * 1000.0 if i == len(events) else min(events[i][0] * 1000.0, duration * 1000.0)
+            periode = builder.getMessagePeriode()
+
+            # all messages starting before the next change
+            messages = int(math.ceil((end - now) / periode))
+            chunks.append(builder.getMessages(messages))
+            starts.append(now + periode * np.arange(messages, dtype=np.int64))
+            now += messages * periode
+
+        messages = np.concatenate(chunks) if chunks else np.zeros((0, MM_Message_Builder.MSG_LENGTH), dtype=np.uint8)
+
+        columns = MM_Frame_Decoder.toColumns(messages, builder.getCalibration())
+        columns['time'] = (np.concatenate(starts) if starts else np.zeros(0, dtype=np.int64)) / 1000.0
+        charge, pulses = MM_Charge_Account.getPulses(messages)
+        columns['charge'] = charge * pulses
+        columns['messages'] = messages
+
+        return columns
@@ -0,0 +1,167 @@
+## Telemetry for the MOTIMOVE 8 Control Interface
+## Per-message records (amplitudes, ramp flags, timings) in a fixed-size shared memory ring buffer.
+## The stimulation loop only writes into the buffer and never waits, display and logging is done by a separate consumer.
+
+import sys
+import time
+from multiprocessing import Event, Process
+
+import numpy as np
+
+from MM_Shared_State import MM_Shared_State
+
+
+class MM_Telemetry(object):
+
+    # capacity .. number of messages kept, older records are overwritten
+    def __init__(self, capacity=1024, channels=8):
+
+        self.__capacity = capacity
+        self.__channels = channels
+
+        # head counts all records ever written, record i is kept in slot i % capacity
+        self.__state = MM_Shared_State([('head', 'i8', 1),
+                                        ('timestamp', 'f8', capacity),
+                                        ('duration', 'f8', capacity),
+                                        ('amplitudes', 'u1', capacity * channels),
+                                        ('rampFlags', 'i1', capacity * channels)])
+        self.__mapState()
+
+    def __mapState(self):
+
+        self.__head = self.__state.getField('head')
+        self.__timestamp = self.__state.getField('timestamp')
+        self.__duration = self.__state.getField('duration')
+        self.__amplitudes = self.__state.getField('amplitudes').reshape(self.__capacity, self.__channels)
+        self.__rampFlags = self.__state.getField('rampFlags').reshape(self.__capacity, self.__channels)
+
+    def __getstate__(self):
+        return {'state': self.__state, 'capacity': self.__capacity, 'channels': self.__channels}
+
+    def __setstate__(self, state):
+        self.__state = state['state']
+        self.__capacity = state['capacity']
+        self.__channels = state['channels']
+        self.__mapState()
+
+    # Returns the number of records kept
+    def getCapacity(self):
+        return self.__capacity
+
+    # Returns the number of records written so far
+    def getHead(self):
+        return int(self.__head[0])
+
+    # Adds the record of one message, only one process may write
+    # timestamp .. time.perf_counter() of the message in [s], duration .. time needed to build the message in [s]
+    def write(self, timestamp, duration, amplitudes, rampFlags):
+
+        head = int(self.__head[0])
+        slot = head % self.__capacity
+
+        self.__timestamp[slot] = timestamp
+        self.__duration[slot] = duration
+        self.__amplitudes[slot] = amplitudes
+        self.__rampFlags[slot] = rampFlags
+
+        # the record is published only after it has been written completely
+        self.__head[0] = head + 1
+
+    # Copies all records from index start on which are still available, never blocks the writer
+    # Returns (index of the first record, dict of arrays 'timestamp', 'duration', 'amplitudes', 'rampFlags')
+    # Records which have been overwritten before or during the copy are skipped
+    def read(self, start=0):
+
+        head = int(self.__head[0])
+        first = max(start, head - self.__capacity)
+        slots = np.arange(first, head) % self.__capacity
+
+        records = {'timestamp': self.__timestamp[slots],
+                   'duration': self.__duration[slots],
+                   'amplitudes': self.__amplitudes[slots],
+                   'rampFlags': self.__rampFlags[slots]}
+
+        # the writer may have started to overwrite the oldest records in the meantime
+        valid = max(first, int(self.__head[0]) - self.__capacity + 1)
+        if valid > first:
+            records = {name: values[valid - first:] for name, values in records.items()}
+
+        return valid, records
+
+
+class MM_Telemetry_Monitor(object):
+
+    # Rate limited consumer of the telemetry, e.g. for displaying the amplitudes
+    # interval .. minimal time between two outputs in [s]
+    # output .. function called with the latest record, prints the stimulated channels by default
+    def __init__(self, telemetry, interval=0.5, output=None):
+
+        self.__telemetry = telemetry
+        self.__interval = interval
+        self.__output = output
+        self.__next = telemetry.getHead()
+        self.__lost = 0
+        # perf_counter has no defined origin, so the first record is output at once
+        self.__lastOutput = float('-inf')
+        self.__stop = Event()
+        self.__process = None
+
+    # The process handle stays with the process which started the monitor
+    def __getstate__(self):
+
+        state = self.__dict__.copy()
+        state['_MM_Telemetry_Monitor__process'] = None
+
+        return state
+
+    # Prints the amplitudes of all stimulated channels of a record
+    @staticmethod
+    def printAmplitudes(timestamp, duration, amplitudes, rampFlags):
+
+        for i, amplitude in enumerate(amplitudes.tolist()):
+            if not amplitude == 0:
+                print("Stim CH" + str(i + 1) + ": " + str(amplitude) + "%")
+
+        sys.stdout.flush()
+
+    # Returns all new records since the last call, see MM_Telemetry.read()
+    # At most once per interval the latest of them is handed to the output
+    def poll(self):
+
+        first, records = self.__telemetry.read(self.__next)
+
+        self.__lost += first - self.__next
+        self.__next = first + len(records['timestamp'])
+
+        now = time.perf_counter()
+        if len(records['timestamp']) > 0 and now - self.__lastOutput >= self.__interval:
+            self.__lastOutput = now
+            output = self.__output if self.__output is not None else MM_Telemetry_Monitor.printAmplitudes
+            output(records['timestamp'][-1], records['duration'][-1], records['amplitudes'][-1], records['rampFlags'][-1])
+
+        return records
+
+    # Returns the number of records which have been overwritten before they could be read
+    def getLost(self):
+        return self.__lost
+
+    # Polls until stop() is called
+    def run(self):
+
+        while not self.__stop.is_set():
+            self.poll()
+            self.__stop.wait(self.__interval)
+
+    # Runs the monitor in a separate process
+    def start(self):
+
+        self.__stop.clear()
+        self.__process = Process(target=self.run, daemon=True)
+        self.__process.start()
+
+    def stop(self):
+
+        self.__stop.set()
+        if self.__process is not None:
+            self.__process.join()
+            self.__process = None
@@ -0,0 +1,294 @@
+## Transports for the MOTIMOVE 8 Control Interface
+## Send the messages to the serial port or to a stand-in (pseudo terminal, pipe, memory, file).
+## Messages are written straight from the given buffer (e.g. MM_Message_Builder.getMessageView()) without copying,
+## optionally several messages are coalesced into one write. All transports count bytes and messages.
+## Optionally a message identical to the previous one is skipped, or only repeated at a slower rate.
+
+import os
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from MM_Shared_State import MM_Shared_State
+
+
+class MM_Transport(ABC):
+
+    # coalesce .. number of messages collected before they are written together, 1 writes every message immediately
+    # bufferSize .. size of the buffer for coalesced messages in [bytes]
+    # repeat .. None writes every message, otherwise a message identical to the previously written one is skipped
+    #           unless repeat [s] have passed since, float('inf') never repeats it
+    #           Only for devices which keep stimulating with the last message, in Pulse-by-Pulse mode every message is one pulse
+    def __init__(self, coalesce=1, bufferSize=4096, repeat=None):
+
+        self.__coalesce = coalesce
+        self.__repeat = repeat
+        self.__last = bytearray()
+        self.__lastTime = 0.0
+        self.__buffer = bytearray(bufferSize if coalesce > 1 else 0)
+        self.__bufferView = memoryview(self.__buffer)
+        self.__filled = 0
+        self.__pending = 0
+
+        # counters are shared, so they can be read while e.g. MM_Stimulation_Scheduler writes in another process
+        self.__counters = MM_Shared_State([('bytes', 'i8', 1), ('messages', 'i8', 1), ('skipped', 'i8', 1), ('start', 'f8', 1)])
+        self.__mapCounters()
+        self.resetStatistics()
+
+    def __mapCounters(self):
+
+        self.__bytes = self.__counters.getField('bytes')
+        self.__messages = self.__counters.getField('messages')
+        self.__skipped = self.__counters.getField('skipped')
+        self.__start = self.__counters.getField('start')
+
+    def __getstate__(self):
+
+        state = self.__dict__.copy()
+        del state['_MM_Transport__bufferView']
+        del state['_MM_Transport__bytes']
+        del state['_MM_Transport__messages']
+        del state['_MM_Transport__skipped']
+        del state['_MM_Transport__start']
+
+        return state
+
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+        self.__bufferView = memoryview(self.__buffer)
+        self.__mapCounters()
+
+    # Sends one message, e.g. the memoryview returned by MM_Message_Builder.getMessageView()
+    # The message is either written directly or copied into the coalescing buffer, it can be reused afterwards
+    def write(self, message):
+
+        view = memoryview(message).cast('B')
+        length = len(view)
+
+        if self.__repeat is not None:
+
+            now = time.monotonic()
+
+            if view == self.__last:
+                if now - self.__lastTime < self.__repeat:
+                    self.__skipped[0] += 1
+                    return
+            else:
+                self.__last = bytearray(view)
+
+            self.__lastTime = now
+
+        if self.__coalesce <= 1:
+            self._send(view)
+            self.__count(length, 1)
+            return
+
+        if self.__filled + length > len(self.__buffer):
+            self.flush()
+
+        # a message which doesn't fit into the buffer at all is written directly
+        if length > len(self.__buffer):
+            self._send(view)
+            self.__count(length, 1)
+            return
+
+        self.__bufferView[self.__filled:self.__filled + length] = view
+        self.__filled += length
+        self.__pending += 1
+
+        if self.__pending >= self.__coalesce:
+            self.flush()
+
+    # Writes all coalesced messages
+    def flush(self):
+
+        if self.__filled > 0:
+            self._send(self.__bufferView[:self.__filled])
+            self.__count(self.__filled, self.__pending)
+            self.__filled = 0
+            self.__pending = 0
+
+    def __count(self, length, messages):
+
+        self.__bytes[0] += length
+        self.__messages[0] += messages
+
+    # Returns bytes and messages written and identical messages skipped since the last reset, and the rates per second
+    def getStatistics(self):
+
+        elapsed = time.monotonic() - float(self.__start[0])
+        sentBytes = int(self.__bytes[0])
+        messages = int(self.__messages[0])
+
+        return {'bytes': sentBytes,
+                'messages': messages,
+                'skipped': int(self.__skipped[0]),
+                'seconds': elapsed,
+                'bytesPerSecond': sentBytes / elapsed if elapsed > 0 else 0.0,
+                'messagesPerSecond': messages / elapsed if elapsed > 0 else 0.0}
+
+    def resetStatistics(self):
+
+        self.__bytes[0] = 0
+        self.__messages[0] = 0
+        self.__skipped[0] = 0
+        self.__start[0] = time.monotonic()
+
+    # Writes pending messages and releases the transport
+    def close(self):
+        self.flush()
+
+    # Writes all bytes of the view, implemented by the individual transports
+    @abstractmethod
+    def _send(self, view):
+        pass
+
+    # Writes all bytes of the view to a file descriptor
+    @staticmethod
+    def _sendToFd(fd, view):
+
+        while len(view) > 0:
+            view = view[os.write(fd, view):]
+
+
+class MM_Serial_Transport(MM_Transport):
+
+    # Serial connection to the MOTIMOVE, needs pyserial
+    # port .. e.g. '/dev/ttyUSB0' or 'COM3', further arguments are handed to serial.Serial
+    def __init__(self, port, baudrate=115200, coalesce=1, bufferSize=4096, repeat=None, **kwargs):
+
+        try:
+            import serial
+        except ImportError:
+            raise ImportError('MM_Serial_Transport needs pyserial, install it with: pip install pyserial')
+
+        MM_Transport.__init__(self, coalesce, bufferSize, repeat)
+        self.__serial = serial.Serial(port, baudrate, **kwargs)
+
+    def _send(self, view):
+
+        while len(view) > 0:
+            view = view[self.__serial.write(view):]
+
+    # Returns up to size bytes received from the MOTIMOVE
+    def read(self, size):
+        return self.__serial.read(size)
+
+    # Returns the file descriptor of the port (POSIX only)
+    def fileno(self):
+        return self.__serial.fileno()
+
+    def close(self):
+
+        MM_Transport.close(self)
+        self.__serial.close()
+
+
+class MM_Loopback_Transport(MM_Transport):
+
+    # Messages written are read back from the other end of a pipe, e.g. in another process
+    def __init__(self, coalesce=1, bufferSize=4096, repeat=None):
+
+        MM_Transport.__init__(self, coalesce, bufferSize, repeat)
+        self.__readFd, self.__writeFd = os.pipe()
+
+    def _send(self, view):
+        MM_Transport._sendToFd(self.__writeFd, view)
+
+    # Returns up to size bytes which have been written, blocks until at least one byte is available
+    def read(self, size):
+        return os.read(self.__readFd, size)
+
+    # Returns the file descriptor messages are written to
+    def fileno(self):
+        return self.__writeFd
+
+    def close(self):
+
+        MM_Transport.close(self)
+        os.close(self.__readFd)
+        os.close(self.__writeFd)
+
+
+class MM_Pty_Transport(MM_Transport):
+
+    # Messages are written to a pseudo terminal in raw mode, which looks like a serial port to the other side
+    # getPortName() returns the device to be opened instead of the MOTIMOVE port, e.g. by a simulator
+    # Pseudo terminals are POSIX only, tty is imported here as it needs termios, which doesn't exist on Windows
+    def __init__(self, coalesce=1, bufferSize=4096, repeat=None):
+
+        import tty
+
+        MM_Transport.__init__(self, coalesce, bufferSize, repeat)
+        self.__master, self.__slave = os.openpty()
+        tty.setraw(self.__master)
+        tty.setraw(self.__slave)
+
+    # Returns the device name of the other side of the pseudo terminal
+    def getPortName(self):
+        return os.ttyname(self.__slave)
+
+    def _send(self, view):
+        MM_Transport._sendToFd(self.__master, view)
+
+    # Returns up to size bytes from the other side, blocks until at least one byte is available
+    def read(self, size):
+        return os.read(self.__master, size)
+
+    # Reads as the other side, e.g. instead of the MOTIMOVE, blocks until at least one byte is available
+    def readPort(self, size):
+        return os.read(self.__slave, size)
+
+    # Returns the file descriptor messages are written to
+    def fileno(self):
+        return self.__master
+
+    def close(self):
+
+        MM_Transport.close(self)
+        os.close(self.__master)
+        os.close(self.__slave)
+
+
+class MM_Memory_Transport(MM_Transport):
+
+    # Keeps all written bytes in memory, e.g. for tests
+    def __init__(self, coalesce=1, bufferSize=4096, repeat=None):
+
+        MM_Transport.__init__(self, coalesce, bufferSize, repeat)
+        self.__data = bytearray()
+
+    def _send(self, view):
+        self.__data += view
+
+    # Returns all bytes written so far
+    def getData(self):
+        return bytes(self.__data)
+
+    # Returns all messages written so far as uint8 array (messages, length)
+    def getMessages(self, length):
+        return np.frombuffer(self.__data, dtype=np.uint8)[:len(self.__data) // length * length].reshape(-1, length).copy()
+
+    def clear(self):
+        self.__data = bytearray()
+
+
+class MM_File_Transport(MM_Transport):
+
+    # Writes all messages unbuffered into a file
+    def __init__(self, path, coalesce=1, bufferSize=4096, append=False, repeat=None):
+
+        MM_Transport.__init__(self, coalesce, bufferSize, repeat)
+        self.__file = open(path, 'ab' if append else 'wb', buffering=0)
+
+    def _send(self, view):
+
+        while len(view) > 0:
+            view = view[self.__file.write(view):]
+
+    def close(self):
+
+        MM_Transport.close(self)
+        self.__file.close()
@@ -0,0 +1,58 @@
+import asyncio
+
+from MM_Async import MM_Async_Builder
+from MM_Message_Builder import MM_Message_Builder
+
+
+def configure(builder):
+
+    builder.setStimFrequency(50)
+    builder.setMaxAmplitudes([100, 80, 60, 40, 20, 10, 5, 0])
+    builder.setActiveChannels([True, True, False, False, False, False, False, False])
+
+
+def test_awaited_setters_take_keyword_arguments():
+
+    expected = MM_Message_Builder()
+    configure(expected)
+    expected.setEnvelope(0, [20, 60, 100], duration=100, loop=True)
+
+    builder = MM_Async_Builder()
+
+    async def update():
+        await builder.setStimFrequency(50)
+        await builder.setMaxAmplitudes([100, 80, 60, 40, 20, 10, 5, 0])
+        await builder.apply({'ActiveChannels': [True, True, False, False, False, False, False, False]})
+        await builder.setEnvelope(0, [20, 60, 100], duration=100, loop=True)
+
+    asyncio.run(update())
+
+    # 100 ms at 50 Hz are 5 messages, looped
+    assert len(builder.getEnvelope(0)) == 5
+    amplitudes = set()
+    for i in range(12):
+        message = bytes(builder.getMessage())
+        assert message == bytes(expected.getMessage()), 'message ' + str(i)
+        amplitudes.add(message[MM_Message_Builder.POS_AMPLITUDES])
+
+    # the envelope changes the amplitude of channel 1 from message to message
+    assert len(amplitudes) > 1
+
+
+def test_only_parameter_setters_are_awaited():
+
+    builder = MM_Async_Builder()
+    configure(builder.getBuilder())
+
+    assert builder.setInstrumentation(True) is None
+    assert builder.getStageTimer() is not None
+
+    update = builder.setIntensity(50)
+    assert asyncio.iscoroutine(update)
+    asyncio.run(update)
+
+    expected = MM_Message_Builder()
+    configure(expected)
+    expected.setIntensity(50)
+
+    assert bytes(builder.getMessage()) == bytes(expected.getMessage())
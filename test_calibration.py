@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from MM_Calibration import MM_Calibration
+from MM_Frame_Decoder import MM_Frame_Decoder
+from MM_Message_Builder import MM_Message_Builder
+
+
+# sends 1.5 times the requested amplitude, at most 255 mA
+TABLE = np.minimum(np.arange(MM_Calibration.AMPLITUDES) * 3 // 2, 255)
+
+AMPLITUDES = slice(MM_Message_Builder.POS_AMPLITUDES, MM_Message_Builder.POS_AMPLITUDES + 8)
+
+
+def newBuilder(ramping):
+
+    builder = MM_Message_Builder(calibration=MM_Calibration(TABLE, 'S1'))
+    builder.setRampingOnorOff(ramping)
+    builder.setStimFrequency(50)
+    builder.setRampUpTime([100] * 8)
+    builder.setMaxAmplitudes([10, 20, 30, 40, 50, 60, 70, 80])
+    builder.setActiveChannels([True, True, True, True, False, False, False, False])
+
+    return builder
+
+
+def test_amplitudes_are_compensated_with_and_without_ramping():
+
+    expected = [15, 30, 45, 60, 0, 0, 0, 0]
+
+    builder = newBuilder(0)
+    assert list(builder.getMessage()[AMPLITUDES]) == expected
+
+    # the ramping channels end at the same compensated amplitudes
+    ramping = newBuilder(1)
+    for i in range(10):
+        ramping.getMessage()
+    assert list(ramping.getMessage()[AMPLITUDES]) == expected
+
+    builder.setMaxAmplitudes([100] * 8)
+    assert list(builder.getMessage()[AMPLITUDES]) == [150] * 4 + [0] * 4
+
+    builder.setActiveChannels([False] * 7 + [True])
+    assert list(builder.getMessage()[AMPLITUDES]) == [0] * 7 + [150]
+
+    messages = builder.getMessages(2, activeChannels=[[True] * 8, [False] * 8])
+    assert messages[:, AMPLITUDES].tolist() == [[150] * 8, [0] * 8]
+
+
+def test_decoder_returns_the_requested_amplitudes():
+
+    builder = newBuilder(0)
+    messages = builder.getMessages(3)
+
+    columns = MM_Frame_Decoder.toColumns(messages, builder.getCalibration())
+
+    assert columns['amplitudes'][0].tolist() == [15, 30, 45, 60, 0, 0, 0, 0]
+    assert columns['requestedAmplitudes'][0].tolist() == [10, 20, 30, 40, 0, 0, 0, 0]
+
+
+def test_equal_amplitudes_are_decoded_to_the_smallest_requested_one():
+
+    calibration = MM_Calibration(MM_Message_Builder.AVAL_COMPENSATION)
+
+    assert calibration.compensate([10, 11]).tolist() == [10, 10]
+    assert calibration.decode([10]).tolist() == [10]
+
+
+def test_falling_tables_are_rejected(tmp_path):
+
+    table = np.arange(MM_Calibration.AMPLITUDES)
+    table[50] = 10
+
+    with pytest.raises(ValueError):
+        MM_Calibration(table)
+
+    # a file written by another tool is checked when it is loaded
+    path = tmp_path / 'calibration.bin'
+    MM_Calibration.save(str(path), [MM_Calibration(TABLE, 'S1')])
+    data = bytearray(path.read_bytes())
+    data[len(MM_Calibration.MAGIC) + 16 + 50] = 0
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError):
+        MM_Calibration.load(str(path), 'S1')
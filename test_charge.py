@@ -0,0 +1,97 @@
+import numpy as np
+
+from MM_Charge import MM_Charge_Account
+from MM_Message_Builder import MM_Message_Builder
+
+
+def newBuilder():
+
+    builder = MM_Message_Builder()
+    builder.setRampingOnorOff(0)
+    builder.setStimFrequency(50)
+    builder.setMaxAmplitudes([100] * 8)
+    builder.setPhasewidths([200] * 8)
+    builder.setIntensity(50)
+    builder.setActiveChannels([True] * 8)
+
+    return builder
+
+
+def test_charge_follows_intensity_doublets_and_prescalers():
+
+    builder = newBuilder()
+    builder.setDoublets([True] + [False] * 7)
+    builder.setPreScalers([1, 2, 3, 1, 1, 1, 1, 1])
+
+    account = MM_Charge_Account()
+    builder.setChargeAccount(account)
+
+    for i in range(6):
+        builder.getMessage()
+
+    totals = account.read()
+
+    # 100 mA * 50 % * 200 µs, the prescaled channels 2 and 3 don't fire in the 6th message
+    assert totals['charge'] == [10000, 0, 0, 10000, 10000, 10000, 10000, 10000]
+    assert totals['peak'] == [10000] * 8
+    assert totals['messages'] == 6
+    assert totals['pulses'] == [12, 3, 2, 6, 6, 6, 6, 6]
+    assert totals['cumulative'] == [pulses * 10000 for pulses in totals['pulses']]
+
+    # both phases of the charge balanced pulses
+    assert totals['balanced'] == [pulses * 20000 for pulses in totals['pulses']]
+
+
+def test_batches_are_accounted_like_single_messages():
+
+    single = newBuilder()
+    batch = newBuilder()
+    for builder in [single, batch]:
+        builder.setPreScalers([1, 2, 3, 4, 5, 6, 7, 8])
+        builder.setChargeAccount(MM_Charge_Account())
+
+    for i in range(25):
+        single.getMessage()
+
+    batch.getMessages(10)
+    batch.getMessages(15)
+
+    assert single.getChargeAccount().read() == batch.getChargeAccount().read()
+
+    charge, pulses = MM_Charge_Account.getPulses(batch.getMessages(8))
+    assert (pulses[:, 7] == np.array([1, 0, 0, 0, 0, 0, 0, 0])).all()
+
+
+def test_prescalers_count_from_the_messages_of_the_builder_also_when_changed_during_a_ramp():
+
+    builders = [newBuilder(), newBuilder()]
+    for builder in builders:
+        builder.setRampingOnorOff(1)
+        builder.setRampUpTime([400] * 8)
+        builder.setActiveChannels([False] * 8)
+        builder.getMessages(3)
+        builder.setActiveChannels([True] * 8)
+
+    builder, unchanged = builders
+    messages = [builder.getMessage() for i in range(5)]
+
+    # the account starts in the middle of the session, the phase of the prescalers is taken from the builder
+    account = MM_Charge_Account()
+    builder.setChargeAccount(account)
+    builder.setPreScalers([1, 2, 3, 4, 5, 6, 7, 8])
+    messages += [builder.getMessage() for i in range(20)]
+
+    assert builder.getMessageCounter() == 28
+    assert account.read()['messages'] == 20
+
+    # channel i fires in the messages 8 .. 27 of the builder whose number is a multiple of its prescaler
+    fired = [[message[MM_Message_Builder.POS_AMPLITUDES + i] > 0 and number % (i + 1) == 0
+              for number, message in zip(range(8, 28), messages[5:])] for i in range(8)]
+    assert account.read()['pulses'] == [sum(channel) for channel in fired]
+    assert [channel[0] for channel in fired] == [True, True, False, True, False, False, False, True]
+
+    # the running ramp keeps the length it has started with
+    amplitudes = slice(MM_Message_Builder.POS_AMPLITUDES, MM_Message_Builder.POS_AMPLITUDES + 8)
+    assert messages[5][amplitudes] < messages[-1][amplitudes]
+    for i, message in enumerate(messages):
+        assert message[amplitudes] == unchanged.getMessage()[amplitudes], 'message ' + str(i)
@@ -0,0 +1,48 @@
+import pytest
+
+from MM_Charge import MM_Charge_Account
+from MM_Device_Manager import MM_Device_Manager
+from MM_Message_Builder import MM_Message_Builder
+
+
+def test_device_builders_receive_the_messages_of_the_manager():
+
+    manager = MM_Device_Manager(2)
+    manager.apply([{'StimFrequency': 50, 'ActiveChannels': [True] * 8}, {'StimFrequency': 50, 'ActiveChannels': [True] * 8}])
+
+    accounts = [MM_Charge_Account(), MM_Charge_Account()]
+    for device in range(2):
+        manager.getBuilder(device).setChargeAccount(accounts[device])
+
+    messages = [manager.getMessage() for i in range(200)]
+
+    # the ramps have finished long before, the last messages are reused
+    assert (messages[-1] == messages[-2]).all()
+
+    for device in range(2):
+
+        assert accounts[device].read()['messages'] == 200
+
+        first, records = manager.getBuilder(device).getTelemetry().read()
+        amplitudes = messages[-1][device, MM_Message_Builder.POS_AMPLITUDES:MM_Message_Builder.POS_AMPLITUDES + 8]
+        assert (records['amplitudes'][-1] == amplitudes).all()
+
+
+def test_steady_messages_follow_new_parameters():
+
+    manager = MM_Device_Manager(2)
+    manager.apply([{'StimFrequency': 50, 'ActiveChannels': [True] * 8}, {'StimFrequency': 50}])
+
+    for i in range(200):
+        manager.getMessage()
+
+    manager.getBuilder(1).setIntensity(42)
+    assert manager.getMessage()[1, MM_Message_Builder.POS_INTENSITY] == 42
+
+
+def test_envelopes_are_refused_by_device_builders():
+
+    manager = MM_Device_Manager(2)
+
+    with pytest.raises(ValueError):
+        manager.getBuilder(0).setEnvelope(0, [0, 50, 100])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from MM_Frame_Decoder import MM_Frame_Decoder
+from MM_Message_Builder import MM_Message_Builder
+
+
+def capture(count):
+
+    builder = MM_Message_Builder()
+    builder.setStimFrequency(40)
+    builder.setPhasewidths([100 + 10 * i for i in range(8)])
+    builder.setMaxAmplitudes([10 * i for i in range(8)])
+    builder.setActiveChannels([True] * 8)
+
+    return [bytes(builder.getMessage()) for i in range(count)]
+
+
+def test_decoded_columns_match_the_built_messages():
+
+    messages = capture(3)
+    columns = MM_Frame_Decoder.toColumns(MM_Frame_Decoder.decode(b''.join(messages)))
+
+    assert columns['valid'].tolist() == [True] * 3
+    assert columns['periode'].tolist() == [25] * 3
+    assert columns['phasewidths'].tolist() == [[100 + 10 * i for i in range(8)]] * 3
+    assert columns['amplitudes'].tolist() == [list(message[MM_Message_Builder.POS_AMPLITUDES:MM_Message_Builder.POS_AMPLITUDES + 8])
+                                              for message in messages]
+    assert columns['checksum'].tolist() == [message[MM_Message_Builder.POS_CHECKSUM] for message in messages]
+
+
+def test_corrupted_messages_are_invalid():
+
+    data = bytearray(b''.join(capture(3)))
+    data[MM_Message_Builder.MSG_LENGTH + MM_Message_Builder.POS_AMPLITUDES] ^= 1
+    data[2 * MM_Message_Builder.MSG_LENGTH] = 0
+
+    assert MM_Frame_Decoder.validate(MM_Frame_Decoder.decode(data)).tolist() == [True, False, False]
+
+    with pytest.raises(ValueError):
+        MM_Frame_Decoder.decode(data[1:])
+
+
+def test_synchronize_finds_the_messages_between_other_bytes():
+
+    messages = capture(3)
+    data = b'\x00\xff\x22' + messages[0] + messages[1][:10] + b'\x17' + messages[2] + messages[0][:5]
+
+    offsets = MM_Frame_Decoder.synchronize(data)
+
+    assert offsets.tolist() == [3, 3 + MM_Message_Builder.MSG_LENGTH + 11]
+    assert MM_Frame_Decoder.extract(data, offsets).tobytes() == messages[0] + messages[2]
+    assert np.array_equal(MM_Frame_Decoder.synchronize(b'\xff\x22\x08'), [])
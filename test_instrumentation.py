@@ -0,0 +1,76 @@
+import multiprocessing
+
+import MM_Instrumentation
+from MM_Instrumentation import MM_Stage_Timer
+from MM_Message_Builder import MM_Message_Builder
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def perf_counter_ns(self):
+        return self.now
+
+
+def test_durations_are_binned_by_their_bit_length(monkeypatch):
+
+    clock = Clock()
+    monkeypatch.setattr(MM_Instrumentation, 'time', clock)
+    timer = MM_Stage_Timer(['a', 'b'])
+
+    for duration in [1000, 1000, 1000, 3000]:
+        timer.start()
+        clock.now += duration
+        timer.mark('a')
+        clock.now += 100
+        timer.mark('b')
+        timer.finish()
+
+    statistics = timer.getStatistics()
+
+    # 1000 ns has 10 bits and is counted below 1.024 µs, 3000 ns has 12 bits and is counted below 4.096 µs
+    assert statistics['a']['count'] == 4
+    assert statistics['a']['histogram'] == [(1.024, 3), (4.096, 1)]
+    assert statistics['a']['mean'] == 1.5
+    assert statistics['a']['max'] == 3.0
+    assert statistics['a']['p50'] == 1.024
+    assert statistics['a']['p99'] == 4.096
+    assert statistics['b']['histogram'] == [(0.128, 4)]
+    assert statistics['total']['max'] == 3.1
+
+    timer.reset()
+    assert timer.getStatistics()['total']['count'] == 0
+
+
+def build(builder):
+
+    for i in range(3):
+        builder.getMessage()
+
+
+def test_builder_times_its_messages_only_while_switched_on():
+
+    builder = MM_Message_Builder()
+    assert builder.getStageTimings() is None
+
+    builder.setInstrumentation(True)
+    for i in range(5):
+        builder.getMessage()
+
+    timings = builder.getStageTimings()
+    assert timings['total']['count'] == 5
+    assert timings['snapshot']['count'] == 5
+    assert timings['telemetry']['count'] == 5
+
+    builder.setInstrumentation(False)
+    builder.getMessage()
+    assert builder.getStageTimings()['total']['count'] == 5
+
+    # the histograms are kept in shared memory, so they can be queried here while another process builds the messages
+    builder.setInstrumentation(True)
+    process = multiprocessing.Process(target=build, args=(builder,))
+    process.start()
+    process.join()
+    assert builder.getStageTimings()['total']['count'] == 8
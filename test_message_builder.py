@@ -0,0 +1,123 @@
+import pytest
+
+from MM_Message_Builder import MM_Message_Builder
+
+
+def test_preset_keeps_the_current_envelopes():
+
+    builder = MM_Message_Builder()
+    builder.setStimFrequency(30)
+    builder.setEnvelope(0, [10] * 4)
+    builder.compilePreset('warm-up', {'Intensity': 50})
+
+    builder.setEnvelope(0, [40] * 4)
+    builder.setEnvelope(0, [70] * 4)
+    builder.setPreset('warm-up')
+
+    assert builder.getIntensity() == 50
+    assert builder.getEnvelope(0) == [70.0] * 4
+
+
+def test_failed_transaction_restores_the_envelopes():
+
+    builder = MM_Message_Builder()
+    builder.setEnvelope(0, [10] * 4)
+
+    with pytest.raises(RuntimeError):
+        with builder.transaction():
+            builder.setEnvelope(0, [40] * 4)
+            builder.setEnvelope(0, [70] * 4)
+            raise RuntimeError()
+
+    assert builder.getEnvelope(0) == [10.0] * 4
+
+
+def test_envelope_duration_follows_the_frequency_of_the_current_mode():
+
+    builder = MM_Message_Builder()
+
+    with pytest.raises(ValueError):
+        builder.setEnvelope(0, [0, 100], duration=1000)
+
+    builder.setStimFrequency(20)
+    builder.setEnvelope(0, [0, 100], duration=1000)
+    assert len(builder.getEnvelope(0)) == 20
+
+    builder.setBOOST_Mode(1)
+    with pytest.raises(ValueError):
+        builder.setEnvelope(0, [0, 100], duration=1000)
+
+    builder.setStimFrequency_BOOST(50)
+    builder.setEnvelope(0, [0, 100], duration=1000)
+    assert len(builder.getEnvelope(0)) == 50
+
+
+def configure():
+
+    builder = MM_Message_Builder()
+    builder.setStimFrequency(40)
+    builder.setPhasewidths([200] * 8)
+    builder.setMaxAmplitudes([60] * 8)
+    builder.setActiveChannels([True] * 8)
+    return builder
+
+
+def test_preset_builds_the_same_messages_as_applying_its_parameters():
+
+    parameters = {'StimFrequency': 25, 'Intensity': 70, 'MaxAmplitudes': [20 + 5 * i for i in range(8)],
+                  'ActiveChannels': [True, False] * 4}
+
+    applied = configure()
+    preset = configure()
+    preset.compilePreset('cycling', parameters)
+
+    # compiling does not change the current configuration
+    assert [bytes(preset.getMessage()) for i in range(3)] == [bytes(applied.getMessage()) for i in range(3)]
+
+    applied.apply(parameters)
+    preset.setPreset('cycling')
+
+    assert [bytes(preset.getMessage()) for i in range(5)] == [bytes(applied.getMessage()) for i in range(5)]
+
+
+def test_preset_without_active_channels_keeps_the_current_ones():
+
+    applied = configure()
+    preset = configure()
+    preset.compilePreset('cool-down', {'Intensity': 30})
+
+    applied.setActiveChannels([False, True] * 4)
+    preset.setActiveChannels([False, True] * 4)
+    applied.apply({'Intensity': 30})
+    preset.setPreset('cool-down')
+
+    messages = [bytes(preset.getMessage()) for i in range(3)]
+    assert messages == [bytes(applied.getMessage()) for i in range(3)]
+    assert [messages[-1][MM_Message_Builder.POS_AMPLITUDES + i] > 0 for i in range(8)] == [False, True] * 4
+
+
+def test_envelopes_replace_the_amplitudes_and_restart_with_the_channel():
+
+    builder = configure()
+    builder.setRampingOnorOff(0)
+    builder.setMaxAmplitudes([60, 60, 30, 0, 0, 0, 0, 0])
+    builder.setEnvelope(0, [0, 50, 100])
+    builder.setEnvelope(1, [100, 50], loop=True)
+    builder.setActiveChannels([True, True, True] + [False] * 5)
+
+    amplitudes = [list(builder.getMessage()[MM_Message_Builder.POS_AMPLITUDES:MM_Message_Builder.POS_AMPLITUDES + 3])
+                  for i in range(5)]
+
+    # CH3 has no envelope, it is sent at 30 mA which is the compensated half of 60 mA
+    full, half = amplitudes[0][1], amplitudes[0][2]
+    assert amplitudes == [[0, full, half], [half, half, half], [full, full, half], [full, half, half], [full, full, half]]
+
+    builder.setActiveChannels([False] * 8)
+    builder.getMessage()
+    builder.setActiveChannels([True, True, True] + [False] * 5)
+
+    assert list(builder.getMessage()[MM_Message_Builder.POS_AMPLITUDES:MM_Message_Builder.POS_AMPLITUDES + 3]) == [0, full, half]
+
+    # removing the envelope returns the channel to its configured amplitude
+    builder.setEnvelope(0, None)
+    assert builder.getMessage()[MM_Message_Builder.POS_AMPLITUDES] == full
@@ -0,0 +1,146 @@
+import importlib.util
+import os
+import random
+
+import numpy as np
+import pytest
+
+from MM_Message_Builder import MM_Message_Builder
+from MM_Ramp_Cache import MM_Ramp_Cache
+
+
+# The builder before the ramp engine, with its per-channel rampUpCHn / rampDownCHn methods, as reference
+def loadBaseline():
+
+    path = os.path.join(os.path.dirname(__file__), 'test_fixtures', 'baseline_message_builder.py')
+    spec = importlib.util.spec_from_file_location('baseline_message_builder', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module.MM_Message_Builder
+
+
+# Calls the same setter with a copy of the same values on both builders, the setters clamp lists in place
+def both(builders, name, value):
+
+    for builder in builders:
+        getattr(builder, name)(list(value) if isinstance(value, list) else value)
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_ramp_engine_matches_the_per_channel_ramps(seed, capsys):
+
+    generator = random.Random(seed)
+    builders = [loadBaseline()(), MM_Message_Builder()]
+
+    both(builders, 'setStimFrequency', generator.randint(10, 100))
+    both(builders, 'setStimFrequency_BOOST', generator.randint(10, 100))
+    both(builders, 'setPhasewidths', [generator.randint(0, 1000) for i in range(8)])
+    both(builders, 'setPhasewidths_BOOST', [generator.randint(0, 1000) for i in range(8)])
+    both(builders, 'setMaxAmplitudes', [generator.randint(0, 170) for i in range(8)])
+    both(builders, 'setIntensity', generator.randint(0, 100))
+    # a ramp time of 0 divides by zero in the reference
+    both(builders, 'setRampUpTime', [generator.choice([100, 250, 500, 1000, 2000]) for i in range(8)])
+    both(builders, 'setRampDownTime', [generator.choice([100, 250, 500, 1000, 2000]) for i in range(8)])
+    both(builders, 'setRamUpStart', generator.randint(0, 100))
+    both(builders, 'setRampDownEnd', generator.randint(0, 100))
+
+    active = [False] * 8
+
+    for message in range(600):
+
+        # channels are switched now and then, also while they are still ramping
+        if generator.random() < 0.05:
+            active = [generator.random() < 0.5 for i in range(8)]
+            both(builders, 'setActiveChannels', active)
+
+        if generator.random() < 0.02:
+            both(builders, 'setBOOST_Mode', generator.randint(0, 1))
+
+        reference, actual = [bytes(builder.getMessage()) for builder in builders]
+        assert actual == reference, 'message ' + str(message)
+
+    # the reference prints the ramp values of every message
+    capsys.readouterr()
+
+
+
+# The amplitudes and the ramp values may also change while the channels keep ramping along their cached trajectories
+@pytest.mark.parametrize('seed', range(4))
+def test_ramp_engine_follows_parameter_changes_while_ramping(seed, capsys):
+
+    generator = random.Random(seed)
+    builders = [loadBaseline()(), MM_Message_Builder()]
+
+    both(builders, 'setStimFrequency', 100)
+    both(builders, 'setPhasewidths', [generator.randint(0, 1000) for i in range(8)])
+    both(builders, 'setMaxAmplitudes', [generator.randint(0, 170) for i in range(8)])
+    both(builders, 'setRampUpTime', [generator.choice([1000, 2000, 4000]) for i in range(8)])
+    both(builders, 'setRampDownTime', [generator.choice([1000, 2000, 4000]) for i in range(8)])
+
+    for message in range(800):
+
+        # the channels are switched rarely, so that the messages between follow the trajectories
+        if message % 200 == 0:
+            both(builders, 'setActiveChannels', [generator.random() < 0.5 for i in range(8)])
+
+        if generator.random() < 0.02:
+            both(builders, 'setMaxAmplitudes', [generator.randint(0, 170) for i in range(8)])
+
+        if generator.random() < 0.01:
+            both(builders, 'setRamUpStart', generator.randint(0, 100))
+
+        if generator.random() < 0.01:
+            both(builders, 'setRampDownEnd', generator.randint(0, 100))
+
+        reference, actual = [bytes(builder.getMessage()) for builder in builders]
+        assert actual == reference, 'message ' + str(message)
+
+    capsys.readouterr()
+
+
+# Channels switched in a fixed pattern repeat the same switch messages, which are then remembered instead of calculated
+@pytest.mark.parametrize('seed', range(4))
+def test_ramp_engine_repeats_remembered_switches(seed, capsys):
+
+    generator = random.Random(seed)
+    builders = [loadBaseline()(), MM_Message_Builder()]
+
+    both(builders, 'setStimFrequency', 50)
+    both(builders, 'setMaxAmplitudes', [generator.randint(0, 170) for i in range(8)])
+    both(builders, 'setRampUpTime', [generator.choice([100, 250, 500]) for i in range(8)])
+    both(builders, 'setRampDownTime', [generator.choice([100, 250, 500]) for i in range(8)])
+    patterns = [[generator.random() < 0.5 for i in range(8)] for i in range(3)]
+
+    for message in range(900):
+
+        # the switches interrupt the ramps, an amplitude change in between makes them differ once
+        if message % 10 == 0:
+            both(builders, 'setActiveChannels', patterns[message // 10 % 3])
+
+        if message == 450:
+            both(builders, 'setMaxAmplitudes', [generator.randint(0, 170) for i in range(8)])
+
+        reference, actual = [bytes(builder.getMessage()) for builder in builders]
+        assert actual == reference, 'message ' + str(message)
+
+    capsys.readouterr()
+
+
+def test_ramp_cache_states_match_the_single_lookups():
+
+    cache = MM_Ramp_Cache(MM_Message_Builder.AVAL_COMPENSATION)
+    up, generation = cache.getTrajectory(MM_Ramp_Cache.RAMPING_UP, 25, 10, 120, 0.0, False)
+    down, generation = cache.getTrajectory(MM_Ramp_Cache.RAMPING_DOWN, 40, 20, 80, 100.0, True)
+
+    assert up >= 0 and down >= 0
+
+    rows = np.array([up, down])
+    positions = np.array([3, 7])
+    ramp, counter, amplitudes = cache.getStates(rows, positions, 10)
+
+    for message in range(10):
+        expected = cache.lookup(rows, positions + message)
+        assert np.array_equal(ramp[:, message], expected[0])
+        assert np.array_equal(counter[:, message], expected[1])
+        assert np.array_equal(amplitudes[:, message], expected[4])
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from MM_Message_Builder import MM_Message_Builder
+from MM_Replay import MM_Session_Replay
+from MM_Session_Log import MM_Session_Recorder
+from MM_Transport import MM_Memory_Transport
+
+
+# Records messages which differ in every byte, message i at i ms
+def record(path, count):
+
+    messages = (np.arange(count)[:, None] + np.arange(MM_Message_Builder.MSG_LENGTH)).astype(np.uint8)
+
+    recorder = MM_Session_Recorder(path, chunk=16)
+    recorder.appendMany(messages, np.arange(count) / 1000.0)
+    recorder.close()
+
+    return messages
+
+
+# a small block, so that the replays cross several block boundaries
+@pytest.mark.parametrize('speed', [None, 20.0])
+def test_replay_crosses_the_block_boundaries(tmp_path, monkeypatch, speed):
+
+    monkeypatch.setattr(MM_Session_Replay, 'BLOCK', 16)
+    path = str(tmp_path / 'session.mmlog')
+    messages = record(path, 16 * 3 + 5)
+
+    transport = MM_Memory_Transport()
+    replay = MM_Session_Replay(path, transport, speed=speed)
+    replay.run()
+
+    assert (transport.getMessages(MM_Message_Builder.MSG_LENGTH) == messages).all()
+    assert replay.getStatistics()['messages'] == replay.getStatistics()['total'] == 16 * 3 + 5
+
+
+def test_replay_of_a_part_starts_and_ends_inside_blocks(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(MM_Session_Replay, 'BLOCK', 16)
+    path = str(tmp_path / 'session.mmlog')
+    messages = record(path, 16 * 3 + 5)
+
+    transport = MM_Memory_Transport()
+    replay = MM_Session_Replay(path, transport, speed=None, start=0.010, stop=0.040)
+    replay.run()
+
+    assert (transport.getMessages(MM_Message_Builder.MSG_LENGTH) == messages[10:40]).all()
+    assert replay.getStatistics()['messages'] == 30
@@ -0,0 +1,100 @@
+import pytest
+
+import MM_Scheduler
+from MM_Device_Manager import MM_Device_Manager
+from MM_Message_Builder import MM_Message_Builder
+from MM_Scheduler import MM_Stimulation_Scheduler
+
+
+class Transport(object):
+
+    def __init__(self):
+        self.messages = []
+
+    def write(self, message):
+        self.messages.append(message.copy())
+
+
+# Clock of the scheduler in the tests, sleeping advances it exactly and every reading takes 0.1 ms, so the busy wait ends
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        self.now += 0.0001
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+# Keeps the time of every message, takes delays[i] in [s] to write message i and stops the scheduler after the last one
+class SlowTransport(object):
+
+    def __init__(self, clock, delays):
+        self.clock = clock
+        self.delays = delays
+        self.times = []
+        self.scheduler = None
+
+    def write(self, message):
+
+        self.times.append(self.clock.now)
+        self.clock.sleep(self.delays[len(self.times) - 1])
+
+        if len(self.times) == len(self.delays):
+            self.scheduler.stop()
+
+
+def schedule(monkeypatch, delays):
+
+    clock = Clock()
+    monkeypatch.setattr(MM_Scheduler, 'time', clock)
+
+    builder = MM_Message_Builder()
+    builder.setStimFrequency(100)
+
+    transport = SlowTransport(clock, delays)
+    transport.scheduler = MM_Stimulation_Scheduler(builder, transport)
+    transport.scheduler.run()
+
+    return [t - transport.times[0] for t in transport.times], transport.scheduler.getStatistics()
+
+
+def test_devices_with_different_periodes_are_not_sent():
+
+    manager = MM_Device_Manager(2)
+    manager.apply([{'StimFrequency': 50}, {'StimFrequency': 100}])
+
+    transport = Transport()
+
+    with pytest.raises(ValueError):
+        MM_Stimulation_Scheduler(manager, transport).run()
+
+    assert transport.messages == []
+
+
+def test_slow_writes_do_not_shift_the_following_messages(monkeypatch):
+
+    # a scheduler sleeping one periode after every message would be 3 ms later with every message
+    times, statistics = schedule(monkeypatch, [0.003] * 30)
+
+    assert statistics['messages'] == 30
+    assert statistics['missed'] == 0
+    assert statistics['periode'] == pytest.approx(0.010)
+    assert times[-1] == pytest.approx(29 * 0.010, abs=0.001)
+
+
+def test_passed_deadlines_are_skipped_instead_of_caught_up_with(monkeypatch):
+
+    # the 6th message takes 35 ms, so the 7th is sent at 85 ms instead of 60 ms and the deadlines at 70 and 80 ms are skipped
+    times, statistics = schedule(monkeypatch, [0.0] * 5 + [0.035] + [0.0] * 6)
+
+    assert statistics['messages'] == 12
+    assert statistics['missed'] == 2
+    assert statistics['jitterMax'] == pytest.approx(0.025, abs=0.001)
+
+    # all following messages are back on the 10 ms grid
+    assert times[6] == pytest.approx(0.085, abs=0.001)
+    assert times[7:] == pytest.approx([0.090 + 0.010 * i for i in range(5)], abs=0.001)
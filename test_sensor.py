@@ -0,0 +1,51 @@
+from MM_Message_Builder import MM_Message_Builder
+from MM_Sensor import MM_Linear_Controller, MM_Sensor_Buffer, MM_Sensor_Pipeline
+
+
+def fill(buffer, first, stop):
+
+    for i in range(first, stop):
+        buffer.write([i, -i], float(i))
+
+
+def test_ring_buffer_keeps_the_newest_samples():
+
+    buffer = MM_Sensor_Buffer(capacity=4, channels=2)
+    fill(buffer, 0, 10)
+
+    # the slot of the oldest sample is the next one written, so it is never handed out
+    first, timestamps, values = buffer.read(0)
+    assert first == 7
+    assert timestamps.tolist() == [7.0, 8.0, 9.0]
+    assert values.tolist() == [[7.0, -7.0], [8.0, -8.0], [9.0, -9.0]]
+
+    first, timestamps, values = buffer.read(9)
+    assert first == 9
+    assert timestamps.tolist() == [9.0]
+
+    first, timestamps, values = buffer.read(10)
+    assert first == 10
+    assert len(timestamps) == 0 and values.shape == (0, 2)
+
+
+def test_pipeline_counts_the_overwritten_samples_as_lost():
+
+    buffer = MM_Sensor_Buffer(capacity=4, channels=2)
+    builder = MM_Message_Builder()
+    pipeline = MM_Sensor_Pipeline(buffer, builder, MM_Linear_Controller(channel=0, low=0.0, high=10.0))
+
+    fill(buffer, 0, 10)
+    assert pipeline.step(0) == (10, 3)
+    assert builder.getIntensity() == 90
+
+    fill(buffer, 10, 12)
+    assert pipeline.step(10) == (12, 2)
+    assert builder.getIntensity() == 100
+
+    # nothing new, nothing handled
+    assert pipeline.step(12) == (12, 0)
+
+    statistics = pipeline.getStatistics()
+    assert statistics['samples'] == 5
+    assert statistics['lost'] == 7
+    assert statistics['updates'] == 2
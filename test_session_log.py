@@ -0,0 +1,32 @@
+import numpy as np
+
+from MM_Message_Builder import MM_Message_Builder
+from MM_Session_Log import MM_Session_Log, MM_Session_Recorder
+
+
+def test_log_grows_while_views_are_held(tmp_path):
+
+    path = str(tmp_path / 'session.mmlog')
+    recorder = MM_Session_Recorder(path, chunk=16)
+    message = np.arange(MM_Message_Builder.MSG_LENGTH, dtype=np.uint8)
+
+    for i in range(10):
+        recorder.append(message, float(i))
+
+    log = MM_Session_Log(path)
+    timestamps = log.getTimestamps()
+    messages = log.getMessages()
+
+    # the recorder grows the file several times while the views are still held
+    for i in range(10, 100):
+        recorder.append(message, float(i))
+
+    assert log.getCount() == 100
+    assert log.getTimestamps().tolist() == [float(i) for i in range(100)]
+    assert timestamps.tolist() == [float(i) for i in range(10)]
+    assert (messages == message).all()
+    assert log.seek(50.0) == 50
+
+    del timestamps, messages
+    log.close()
+    recorder.close()
@@ -0,0 +1,135 @@
+import multiprocessing
+import random
+import time
+
+import numpy as np
+import pytest
+
+from MM_Message_Builder import MM_Message_Builder
+from MM_Shared_State import MM_Shared_State, MM_SeqLock
+
+
+# Every write sets all channels of a field to one value, so a torn read shows up as a field with different values
+def write(builder, seed, stop):
+
+    generator = random.Random(seed)
+
+    while not stop.is_set():
+
+        value = generator.randint(1, 100)
+        setter = generator.randrange(3)
+
+        if setter == 0:
+            builder.apply({'Phasewidths': [value * 10] * 8, 'MaxAmplitudes': [value] * 8, 'Intensity': value})
+        elif setter == 1:
+            builder.setPhasewidths([value * 10] * 8)
+        else:
+            builder.setMaxAmplitudes([value] * 8)
+
+
+def test_concurrent_writers_never_tear_a_message():
+
+    builder = MM_Message_Builder()
+    builder.setRampingOnorOff(0)
+    builder.setActiveChannels([True] * 8)
+
+    stop = multiprocessing.Event()
+    writers = [multiprocessing.Process(target=write, args=(builder, seed, stop), daemon=True) for seed in range(4)]
+    for writer in writers:
+        writer.start()
+
+    amplitudes = slice(MM_Message_Builder.POS_AMPLITUDES, MM_Message_Builder.POS_AMPLITUDES + 8)
+    phasewidths = slice(MM_Message_Builder.POS_PHASEWIDTHS, MM_Message_Builder.POS_PHASEWIDTHS + 8)
+    epochs = set()
+
+    try:
+        for i in range(5000):
+
+            message = np.frombuffer(builder.getMessageView(), dtype=np.uint8)
+            epochs.add(builder.getEpoch())
+
+            assert len(set(message[amplitudes].tolist())) == 1
+            assert len(set(message[phasewidths].tolist())) == 1
+            assert message[MM_Message_Builder.POS_CHECKSUM] == int(message[1:MM_Message_Builder.POS_CHECKSUM].sum()) & 0x7F
+
+    finally:
+        stop.set()
+        for writer in writers:
+            writer.join()
+
+    # the writers have actually been running meanwhile
+    assert len(epochs) > 1
+
+
+def test_seqlock_read_copies_a_consistent_region():
+
+    state = MM_Shared_State([('sequence', 'i8', 1), ('values', 'i4', 64)])
+    seqlock = MM_SeqLock(state, 'sequence', 'values', 'values')
+    values = state.getField('values')
+
+    with seqlock:
+        values[:] = 7
+
+    target = np.empty(values.nbytes, dtype=np.uint8)
+    sequence = seqlock.read(target)
+
+    assert sequence == seqlock.getSequence()
+    assert sequence % 2 == 0
+    assert (target.view(np.int32) == 7).all()
+
+
+# The writer is inside a write almost all the time, each write takes 1 ms
+def writeSlowly(seqlock, state, stop):
+
+    values = state.getField('values')
+
+    while not stop.is_set():
+        with seqlock:
+            end = time.perf_counter() + 0.001
+            while time.perf_counter() < end:
+                values[:] = values[0] + 1
+
+
+def test_seqlock_read_waits_for_one_write_only_however_busy_the_writer_is():
+
+    state = MM_Shared_State([('sequence', 'i8', 1), ('values', 'i4', 64)])
+    seqlock = MM_SeqLock(state, 'sequence', 'values', 'values')
+
+    stop = multiprocessing.Event()
+    writer = multiprocessing.Process(target=writeSlowly, args=(seqlock, state, stop), daemon=True)
+    writer.start()
+
+    target = np.empty(state.getField('values').nbytes, dtype=np.uint8)
+    latencies = []
+
+    try:
+        time.sleep(0.1)
+
+        # the reads start at arbitrary points of the writes
+        for i in range(50):
+            time.sleep(0.001)
+            start = time.perf_counter()
+            seqlock.read(target)
+            latencies.append(time.perf_counter() - start)
+
+            assert len(set(target.view(np.int32).tolist())) == 1
+
+    finally:
+        stop.set()
+        writer.join()
+
+    # a reader retrying until the writer happens to be outside a write waits for hundreds of writes here
+    assert max(latencies) < 0.05
+
+
+def test_seqlock_read_inside_a_write_of_the_same_thread_raises():
+
+    state = MM_Shared_State([('sequence', 'i8', 1), ('values', 'i4', 4)])
+    seqlock = MM_SeqLock(state, 'sequence', 'values', 'values')
+    target = np.empty(16, dtype=np.uint8)
+
+    with seqlock:
+        with pytest.raises(RuntimeError):
+            seqlock.read(target)
+
+    assert seqlock.read(target) == seqlock.getSequence()
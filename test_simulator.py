@@ -0,0 +1,35 @@
+import numpy as np
+
+from MM_Charge import MM_Charge_Account
+from MM_Message_Builder import MM_Message_Builder
+from MM_Simulator import MM_Session_Simulator
+
+
+TIMELINE = [(0, {'StimFrequency': 100, 'RampUpTime': [8000, 4000, 2000, 1000] * 2, 'RampDownTime': [6000] * 8,
+                 'PreScalers': [1, 2, 1, 3, 1, 1, 1, 1], 'Intensity': 80}),
+            (0.5, {'ActiveChannels': [True] * 8}),
+            (5, {'BOOST_Mode': 1, 'StimFrequency_BOOST': 50}),
+            (7, {'ActiveChannels': [False, True] * 4}),
+            (12, {'BOOST_Mode': 0, 'ActiveChannels': [True] * 8}),
+            (20, {'ActiveChannels': [False] * 8})]
+
+
+def test_simulation_matches_message_by_message_generation():
+
+    columns = MM_Session_Simulator().simulate(TIMELINE, 30)
+
+    # the same session message by message, every change applied before the first message at or after its time
+    builder = MM_Message_Builder()
+    account = MM_Charge_Account()
+    builder.setChargeAccount(account)
+
+    messages = []
+    i = 0
+    for start in columns['time']:
+        while i < len(TIMELINE) and TIMELINE[i][0] <= start:
+            builder.apply(TIMELINE[i][1])
+            i += 1
+        messages.append(np.frombuffer(builder.getMessage(), dtype=np.uint8))
+
+    assert (columns['messages'] == np.array(messages)).all()
+    assert columns['charge'].sum(axis=0).tolist() == account.read()['cumulative']
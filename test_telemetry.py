@@ -0,0 +1,54 @@
+import numpy as np
+
+from MM_Message_Builder import MM_Message_Builder
+from MM_Telemetry import MM_Telemetry, MM_Telemetry_Monitor
+
+
+def test_every_message_is_recorded_with_its_amplitudes_and_ramp_flags():
+
+    builder = MM_Message_Builder()
+    builder.setStimFrequency(50)
+    builder.setRampUpTime([1000] * 8)
+    builder.setMaxAmplitudes([100] * 8)
+    builder.getMessage()
+    builder.setActiveChannels([True, True] + [False] * 6)
+
+    messages = [builder.getMessage() for i in range(3)]
+
+    first, records = builder.getTelemetry().read(1)
+
+    assert first == 1
+    assert builder.getTelemetry().getHead() == 4
+    assert records['amplitudes'].tolist() == [list(message[MM_Message_Builder.POS_AMPLITUDES:MM_Message_Builder.POS_AMPLITUDES + 8])
+                                              for message in messages]
+    assert records['rampFlags'].tolist() == [[1, 1, 0, 0, 0, 0, 0, 0]] * 3
+    assert (records['duration'] > 0).all()
+    assert (np.diff(records['timestamp']) > 0).all()
+
+
+def write(telemetry, count):
+
+    for i in range(count):
+        telemetry.write(float(i), 0.001, [i] * 8, [0] * 8)
+
+
+def test_monitor_counts_overwritten_records_and_limits_its_output():
+
+    telemetry = MM_Telemetry(capacity=4)
+    outputs = []
+    monitor = MM_Telemetry_Monitor(telemetry, interval=3600.0, output=lambda *record: outputs.append(record[0]))
+
+    write(telemetry, 10)
+    records = monitor.poll()
+
+    # the slot of the oldest record is the next one written, so it is never handed out
+    assert records['timestamp'].tolist() == [7.0, 8.0, 9.0]
+    assert monitor.getLost() == 7
+
+    # nothing new, then new records within the interval are returned but not output
+    assert len(monitor.poll()['timestamp']) == 0
+    telemetry.write(10.0, 0.001, [10] * 8, [0] * 8)
+    assert monitor.poll()['timestamp'].tolist() == [10.0]
+
+    assert outputs == [9.0]
+    assert monitor.getLost() == 7
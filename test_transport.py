@@ -0,0 +1,95 @@
+import pytest
+
+import MM_Transport as transports
+from MM_Message_Builder import MM_Message_Builder
+from MM_Transport import MM_Memory_Transport, MM_Transport
+
+
+# Clock of the transports in the tests, set by the test
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_transport_without_send_can_not_be_created():
+
+    class Incomplete(MM_Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_coalesced_messages_are_written_together():
+
+    transport = MM_Memory_Transport(coalesce=3)
+
+    for message in [b'ab', b'cd', b'ef', b'gh']:
+        transport.write(message)
+
+    assert transport.getData() == b'abcdef'
+
+    transport.flush()
+    assert transport.getData() == b'abcdefgh'
+    assert transport.getStatistics()['messages'] == 4
+
+
+def test_identical_messages_are_only_repeated_after_the_repeat_time(monkeypatch):
+
+    clock = Clock()
+    monkeypatch.setattr(transports, 'time', clock)
+    transport = MM_Memory_Transport(repeat=0.1)
+
+    # time in [s] and message
+    for now, message in [(0.0, b'ab'), (0.05, b'ab'), (0.1, b'ab'), (0.15, b'ab'), (0.16, b'cd'), (0.17, b'ab'), (0.2, b'ab')]:
+        clock.now = now
+        transport.write(message)
+
+    # the repeat time is counted from the last message written, a changed message is always written
+    assert transport.getData() == b'ab' + b'ab' + b'cd' + b'ab'
+    assert transport.getStatistics()['messages'] == 4
+    assert transport.getStatistics()['skipped'] == 3
+
+
+def test_a_message_changed_in_place_is_not_skipped(monkeypatch):
+
+    monkeypatch.setattr(transports, 'time', Clock())
+    transport = MM_Memory_Transport(repeat=float('inf'))
+
+    # like the view of MM_Message_Builder.getMessageView(), the buffer is patched between the writes
+    message = bytearray(b'ab')
+    transport.write(message)
+    transport.write(message)
+    message[1:2] = b'x'
+    transport.write(message)
+    transport.write(message)
+
+    assert transport.getData() == b'abax'
+    assert transport.getStatistics()['skipped'] == 2
+
+
+def test_steady_builder_reuses_its_message_until_a_parameter_is_set():
+
+    builder = MM_Message_Builder()
+    builder.setRampingOnorOff(0)
+    builder.setStimFrequency(50)
+    builder.setMaxAmplitudes([20] * 8)
+    builder.setActiveChannels([True] * 8)
+    transport = MM_Memory_Transport(repeat=float('inf'))
+
+    for i in range(5):
+        transport.write(builder.getMessageView())
+
+    builder.setIntensity(50)
+    changed = builder.getMessage()
+    transport.write(changed)
+
+    # the message of the new intensity is written, the identical ones before are skipped
+    assert changed[MM_Message_Builder.POS_INTENSITY] == 50
+    assert transport.getStatistics()['messages'] == 2
+    assert transport.getStatistics()['skipped'] == 4
+    assert transport.getData()[MM_Message_Builder.MSG_LENGTH:] == bytes(changed)